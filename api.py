@@ -3,18 +3,78 @@
 Execute com: uvicorn api:app --reload
 """
 
-from fastapi import FastAPI, HTTPException
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, copy_context
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from pydantic_core import from_json
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
+import asyncio
+import bisect
+import csv
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
 import numpy as np
+import pandas as pd
 from pathlib import Path
 import sys
 
+try:
+    import pyarrow as pa
+except ImportError:  # Opcional: payloads Arrow em /predict/batch
+    pa = None
+
+try:
+    import msgpack
+except ImportError:  # Opcional: payloads msgpack em /predict/batch
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # Opcional: respostas JSON rápidas (API_CONFIG['fast_json'])
+    orjson = None
+
 # Adiciona src ao path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from spotify_analysis.config import config
+from spotify_analysis.config import config  # noqa: E402
+from spotify_analysis.models.classification import categorize_popularity  # noqa: E402
+from spotify_analysis.models.contributions import (  # noqa: E402
+    explain_batch, supports_contributions
+)
+from spotify_analysis.models.quantization import FeatureQuantizer  # noqa: E402
+from spotify_analysis.models.registry import get_registry  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carregar o modelo uma vez por worker antes de aceitar tráfego.
+    
+    O carregamento e o aquecimento rodam em uma thread, fora do loop de
+    eventos. O servidor só começa a atender quando terminam, e a prontidão
+    só é reportada se ambos tiverem sucesso.
+    """
+    if config.api_config['fast_json'] and orjson is None:
+        logger.warning("fast_json ativado, mas orjson não está instalado; usando o JSON padrão")
+    await asyncio.to_thread(load_model)
+    executor.start()
+    if config.api_config['micro_batching']:
+        batcher.start()
+    yield
+    await batcher.stop()
+    executor.stop()
+
 
 # Cria aplicação FastAPI
 app = FastAPI(
@@ -22,7 +82,8 @@ app = FastAPI(
     description="API REST para predizer popularidade de músicas baseado em características de áudio",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Adiciona middleware CORS
@@ -77,7 +138,12 @@ class PredictionResponse(BaseModel):
     predicted_popularity: float = Field(..., description="Pontuação de popularidade predita (0-100)")
     category: str = Field(..., description="Categoria de popularidade (Baixa/Média/Alta)")
     confidence: float = Field(..., description="Confiança da predição (0-1)")
-    top_features: Dict[str, float] = Field(..., description="Principais características contribuintes")
+    top_features: Optional[Dict[str, float]] = Field(
+        None, description="Principais características contribuintes (ausente se explain=false)"
+    )
+    timings: Optional[Dict[str, float]] = Field(
+        None, description="Tempo por etapa em ms (apenas com debug=true)"
+    )
 
 
 class HealthResponse(BaseModel):
@@ -85,6 +151,16 @@ class HealthResponse(BaseModel):
     status: str
     version: str
     model_loaded: bool
+    model: Optional[str] = Field(None, description="Modelo servido por este worker")
+    load_time_s: Optional[float] = Field(None, description="Tempo de carregamento do modelo (s)")
+    warmup_latency_s: Optional[float] = Field(
+        None, description="Latência do lote de aquecimento (s)"
+    )
+    error: Optional[str] = Field(None, description="Erro de carregamento, se houver")
+    inference: Optional[Dict[str, Any]] = Field(
+        None, description="Ocupação do executor de inferência e tempo de espera na fila"
+    )
+    cache: Optional[Dict[str, Any]] = Field(None, description="Contadores do cache de predições")
 
 
 class ModelInfo(BaseModel):
@@ -95,6 +171,1363 @@ class ModelInfo(BaseModel):
     metrics: Dict[str, float]
 
 
+# Modelo ativo
+class DemoWeightedModel:
+    """Modelo linear de demonstração com pesos fixos.
+    
+    Usado enquanto nenhum modelo treinado é carregado. Expõe ``coef_`` e
+    ``intercept_`` para que as contribuições sejam calculadas pelo mesmo
+    mecanismo usado nos modelos reais.
+    """
+    feature_names = [
+        'loudness', 'energy', 'danceability', 'valence', 'acousticness',
+        'tempo', 'speechiness', 'instrumentalness', 'liveness'
+    ]
+    input_features = feature_names
+    coef_ = np.array([0.285, 19.8, 15.6, 12.4, 8.9, 0.067, 4.5, 2.1, 1.5])
+    intercept_ = np.array([0.0])
+    
+    def __init__(self):
+        self.model = self
+    
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        return X[self.feature_names].to_numpy(dtype=float)
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.coef_ + self.intercept_[0]
+
+
+class ModelState:
+    """Modelo carregado por este worker e o resultado da inicialização."""
+    
+    def __init__(self):
+        self.model = None
+        self.entry: Optional[Dict[str, Any]] = None
+        self.ready = False
+        self.error: Optional[str] = None
+        self.load_time_s: Optional[float] = None
+        self.warmup_latency_s: Optional[float] = None
+    
+    @property
+    def name(self) -> Optional[str]:
+        if self.model is None:
+            return None
+        if self.entry is None:
+            return "demo"
+        return f"{self.entry['name']} v{self.entry['version']}"
+
+
+registry = get_registry()
+demo_model = DemoWeightedModel()
+model_state = ModelState()
+RAW_FEATURES = config.numerical_features + config.categorical_features
+CATEGORY_LABELS = np.asarray(config.popularity_categories['labels'], dtype=object)
+TOP_K_FEATURES = 3
+
+
+def warm_up(active, n_rows: int) -> float:
+    """Executar um lote de aquecimento completo e retornar sua latência em segundos.
+    
+    Passa pelo mesmo caminho de uma requisição real (montagem do DataFrame,
+    pré-processamento, predição e contribuições) para inicializar caches e
+    alocações antes do primeiro cliente. Qualquer erro é propagado, para que
+    o worker não se declare pronto com um modelo que falharia nas requisições.
+    """
+    example = TrackFeatures(**TrackFeatures.model_config['json_schema_extra']['example'])
+    start = time.perf_counter()
+    X = active.transform(tracks_to_frame([example] * max(1, n_rows), input_features(active)))
+    active.predict(X)
+    if supports_contributions(active.model):
+        top_contributions(active, X)
+    else:
+        logger.info(
+            f"{type(active.model).__name__} não suporta contribuições; "
+            "top_features será nulo"
+        )
+    return time.perf_counter() - start
+
+
+def load_model() -> None:
+    """Carregar o modelo padrão do registro e aquecê-lo.
+    
+    Só são consideradas versões registradas com o pré-processador (que
+    recebem features brutas). Sem modelos registrados, usa o modelo de
+    demonstração (se permitido por ``config.api_config['allow_demo_model']``).
+    Falhas são registradas em ``model_state.error`` e deixam o worker vivo,
+    porém não pronto.
+    """
+    name = config.registry_config['default_model']
+    model_state.ready = False
+    try:
+        start = time.perf_counter()
+        try:
+            entry = registry.get_entry(name, servable=True)
+            active = registry.load(name, entry['version'])
+        except KeyError:
+            if not config.api_config['allow_demo_model']:
+                raise
+            entry, active = None, demo_model
+        load_time = time.perf_counter() - start
+        warmup_latency = warm_up(active, config.api_config['warmup_rows'])
+    except Exception as e:
+        model_state.error = f"{type(e).__name__}: {e}"
+        logger.exception(f"Falha ao carregar o modelo '{name}'")
+        return
+    
+    model_state.model, model_state.entry = active, entry
+    model_state.load_time_s, model_state.warmup_latency_s = load_time, warmup_latency
+    model_state.error = None
+    cache.reset(active, model_state.name)
+    model_state.ready = True
+    logger.info(
+        f"Modelo {model_state.name} pronto (carregamento {load_time:.3f}s, "
+        f"aquecimento {warmup_latency * 1000:.1f}ms)"
+    )
+
+
+def get_active_model():
+    """Obter o modelo carregado na inicialização deste worker.
+    
+    Raises:
+        HTTPException: 503 se o modelo ainda não estiver pronto.
+    """
+    if not model_state.ready:
+        raise HTTPException(status_code=503, detail="Modelo não está pronto")
+    return model_state.model
+
+
+def health_payload() -> Dict[str, Any]:
+    """Estado de saúde do worker, com tempos de carregamento e aquecimento."""
+    if model_state.ready:
+        status = "healthy"
+    else:
+        status = "unhealthy" if model_state.error else "loading"
+    return {
+        "status": status,
+        "version": "1.0.0",
+        "model_loaded": model_state.ready,
+        "model": model_state.name,
+        "load_time_s": model_state.load_time_s,
+        "warmup_latency_s": model_state.warmup_latency_s,
+        "error": model_state.error,
+        "inference": executor.stats(),
+        "cache": cache.stats()
+    }
+
+
+def input_features(active) -> List[str]:
+    """Características brutas lidas pelo modelo (apenas as selecionadas, se houver seleção)."""
+    return getattr(active, 'input_features', None) or RAW_FEATURES
+
+
+def tracks_to_frame(
+    tracks: List[TrackFeatures],
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Converter faixas validadas em um DataFrame de características brutas.
+    
+    Apenas as colunas ``columns`` são extraídas, para que modelos treinados
+    com seleção de características não calculem colunas descartadas.
+    """
+    columns = columns or RAW_FEATURES
+    return pd.DataFrame(
+        {name: [getattr(track, name) for track in tracks] for name in columns}, columns=columns
+    )
+
+
+def top_contributions(active, X: np.ndarray, k: int = TOP_K_FEATURES) -> List[Dict[str, float]]:
+    """Principais contribuições por faixa, agregadas nas características brutas."""
+    if active.feature_names is None:
+        names = [f"feature_{i}" for i in range(X.shape[1])]
+        return explain_batch(active.model, X, names, k=k)
+    return explain_batch(active.model, X, active.feature_names, k=k, groups=input_features(active))
+
+
+def score_frame(active, frame: pd.DataFrame, explain: bool = True) -> List[Dict[str, Any]]:
+    """Pontuar um lote inteiro de faixas.
+    
+    O lote passa por uma única chamada do pré-processador e uma única
+    chamada de ``predict``; categorias, confiança e contribuições são
+    calculadas com operações vetorizadas sobre o lote.
+    """
+    with timed_stage('preprocess'):
+        X = active.transform(frame)
+    with timed_stage('predict'):
+        # Normalizar para intervalo 0-100
+        predicted = np.clip(np.asarray(active.predict(X), dtype=float).ravel(), 0, 100)
+        categories = CATEGORY_LABELS[categorize_popularity(predicted)]
+        
+        # Calcular confiança (simplificado para demo)
+        confidence = np.clip(0.75 + np.random.uniform(-0.1, 0.1, len(predicted)), 0, 1)
+    
+    # Principais características contribuintes, calculadas a partir do modelo;
+    # modelos sem suporte a contribuições respondem com top_features nulo
+    with timed_stage('contributions'):
+        if explain and supports_contributions(active.model):
+            top_features = top_contributions(active, X)
+        else:
+            top_features = [None] * len(predicted)
+    
+    with timed_stage('serialize'):
+        return [
+            {
+                "predicted_popularity": popularity,
+                "category": category,
+                "confidence": conf,
+                "top_features": features
+            }
+            for popularity, category, conf, features in zip(
+                np.round(predicted, 2).tolist(), categories.tolist(),
+                np.round(confidence, 3).tolist(), top_features
+            )
+        ]
+
+
+queue_wait: ContextVar[float] = ContextVar('queue_wait', default=0.0)
+
+
+class RequestTimer:
+    """Tempo por etapa de uma requisição (ou de um micro-lote), em segundos.
+    
+    Etapas: ``parse`` (leitura e validação), ``queue``, ``cache``,
+    ``preprocess``, ``predict``, ``contributions`` e ``serialize``. Cada
+    etapa custa duas leituras de ``time.perf_counter``, então a medição fica
+    sempre ligada. As etapas das threads de inferência chegam aqui porque
+    ``InferenceExecutor.run`` executa a tarefa em uma cópia do contexto da
+    requisição; enquanto isso a requisição só aguarda, então nunca há duas
+    threads escrevendo no mesmo temporizador.
+    """
+    
+    STAGES = ('parse', 'queue', 'cache', 'preprocess', 'predict', 'contributions', 'serialize')
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+    
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def mark(self, stage: str) -> float:
+        """Atribuir a ``stage`` o tempo decorrido ainda não atribuído a nenhuma etapa."""
+        seconds = max(0.0, time.perf_counter() - self.start - sum(self.stages.values()))
+        self.add(stage, seconds)
+        return seconds
+    
+    def timings_ms(self) -> Dict[str, float]:
+        return {
+            stage: round(self.stages[stage] * 1000, 3)
+            for stage in self.STAGES if stage in self.stages
+        }
+    
+    def server_timing(self) -> str:
+        """Valor do cabeçalho ``Server-Timing`` (durações em ms)."""
+        entries = [f"{stage};dur={ms:.3f}" for stage, ms in self.timings_ms().items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+
+request_timer: ContextVar[Optional[RequestTimer]] = ContextVar('request_timer', default=None)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Somar a duração de uma etapa à requisição atual (se medida)."""
+    timer = request_timer.get()
+    if timer is not None:
+        timer.add(stage, seconds)
+
+
+def mark_stage(stage: str) -> None:
+    """Atribuir a ``stage`` o tempo da requisição atual ainda não atribuído."""
+    timer = request_timer.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Medir o bloco como uma etapa da requisição atual."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+class Counter:
+    """Contador Prometheus com rótulos.
+    
+    Os coletores não usam locks: só são atualizados no loop de eventos
+    (middleware, continuação de ``InferenceExecutor.run`` e do
+    ``MicroBatcher``), e as threads de inferência devolvem os seus tempos
+    junto com o resultado.
+    """
+    
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Histograma Prometheus com rótulos e limites fixos (sem locks, ver ``Counter``)."""
+    
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Por série: contagem por limite (+Inf no fim) e a soma das observações
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+    
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                bucket_labels = format_labels(self.labels + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {series[-1]:.6g}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple[Any, ...]) -> str:
+    """Rótulos no formato de exposição Prometheus (``{a="1",b="2"}``)."""
+    if not names:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = tuple(float(2 ** i) for i in range(17))
+
+request_count = Counter(
+    "spotify_api_requests_total", "Requisições HTTP atendidas.", ("route", "method", "status")
+)
+request_latency = Histogram(
+    "spotify_api_request_duration_seconds", "Latência das requisições HTTP.",
+    ("route", "method"), LATENCY_BUCKETS
+)
+stage_latency = Histogram(
+    "spotify_api_stage_duration_seconds",
+    "Tempo por etapa das requisições de predição (parse, queue, cache, preprocess, "
+    "predict, contributions, serialize).",
+    ("route", "stage"), LATENCY_BUCKETS
+)
+batch_size = Histogram(
+    "spotify_api_batch_size", "Faixas por chamada ao modelo, por origem.",
+    ("source",), BATCH_SIZE_BUCKETS
+)
+
+
+def overloaded() -> HTTPException:
+    """Resposta de rejeição rápida quando a fila de inferência está cheia."""
+    executor.rejected += 1
+    return HTTPException(
+        status_code=503,
+        detail="Servidor sobrecarregado, tente novamente",
+        headers={"Retry-After": "1"}
+    )
+
+
+class InferenceExecutor:
+    """Executar a inferência em um pool de threads limitado.
+    
+    Até ``workers`` tarefas rodam ao mesmo tempo e até ``queue_depth``
+    aguardam na fila; além disso, novas tarefas são rejeitadas de imediato
+    em vez de acumular latência. O loop de eventos fica livre para as
+    verificações de saúde. O tempo de espera na fila da última tarefa
+    executada pela requisição fica em ``queue_wait`` e na etapa ``queue``.
+    """
+    
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total_s = 0.0
+        self.queue_wait_max_s = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._released = asyncio.Event()
+    
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='inference')
+    
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _release(self, wait: Optional[float]) -> None:
+        self.pending -= 1
+        self._released.set()
+        if wait is not None:
+            self.completed += 1
+            self.queue_wait_total_s += wait
+            self.queue_wait_max_s = max(self.queue_wait_max_s, wait)
+    
+    async def run(self, fn, *args, wait: bool = False):
+        """Executar ``fn(*args)`` no pool.
+        
+        Com ``wait``, aguarda uma vaga em vez de rejeitar (usado por
+        streams, que não podem mudar o status depois de começar).
+        
+        Raises:
+            HTTPException: 503 se o pool e a fila estiverem cheios.
+        """
+        while self.pending >= self.workers + self.queue_depth:
+            if not wait:
+                raise overloaded()
+            self._released.clear()
+            await self._released.wait()
+        self.start()
+        
+        loop = asyncio.get_running_loop()
+        context = copy_context()
+        submitted = time.perf_counter()
+        timing: Dict[str, float] = {}
+        
+        def call():
+            timing['wait'] = time.perf_counter() - submitted
+            # No contexto da requisição, para que as etapas cheguem ao seu temporizador
+            return context.run(fn, *args)
+        
+        self.pending += 1
+        future = self._executor.submit(call)
+        # A vaga só é liberada quando a thread termina, mesmo se o cliente desistir
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release, timing.get('wait'))
+        )
+        result = await asyncio.wrap_future(future)
+        queue_wait.set(timing['wait'])
+        record_stage('queue', timing['wait'])
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": min(self.pending, self.workers),
+            "queued": max(0, self.pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_ms_avg": 1000 * self.queue_wait_total_s / max(1, self.completed),
+            "queue_wait_ms_max": 1000 * self.queue_wait_max_s
+        }
+
+
+executor = InferenceExecutor(
+    config.api_config['inference_workers'], config.api_config['inference_queue_depth']
+)
+
+
+class MicroBatcher:
+    """Agrupar predições unitárias concorrentes em lotes.
+    
+    As requisições de ``/predict`` entram em uma fila; o lote é enviado ao
+    modelo quando atinge ``max_batch_size`` ou quando a primeira requisição
+    espera ``max_wait_ms``. Cada requisição recebe o seu resultado por um
+    ``Future``. A fila aceita no máximo ``max_pending`` requisições; além
+    disso, novas requisições são rejeitadas de imediato.
+    
+    Cada lote é pontuado em uma tarefa própria, com até ``max_in_flight``
+    lotes em andamento (a capacidade do executor); com todos ocupados, as
+    requisições se acumulam na fila e formam lotes maiores.
+    """
+    
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_pending: int,
+        max_in_flight: int = 1
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.items = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: 'set[asyncio.Task]' = set()
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        """Iniciar o coletor no loop de eventos atual."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._collect())
+    
+    async def stop(self) -> None:
+        """Parar o coletor e cancelar as requisições na fila ou em lotes em andamento."""
+        tasks = [task for task in (self._task, *self._flushing) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait()[2].cancel()
+    
+    async def submit(self, features: TrackFeatures, explain: bool) -> Dict[str, Any]:
+        """Enfileirar uma faixa e aguardar a sua predição.
+        
+        Raises:
+            HTTPException: 503 se a fila estiver cheia.
+        """
+        if self._queue.qsize() >= self.max_pending:
+            raise overloaded()
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.perf_counter()
+        self._queue.put_nowait((features, explain, future))
+        result, stages = await future
+        # A espera inclui a janela de formação do lote, não só a fila do pool
+        wait = time.perf_counter() - enqueued
+        for stage, seconds in stages.items():
+            if stage != 'queue':
+                record_stage(stage, seconds)
+                wait -= seconds
+        queue_wait.set(wait)
+        record_stage('queue', wait)
+        return result
+    
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        while True:
+            # Só forma o próximo lote quando há uma vaga para pontuá-lo
+            await slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self._flush(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+            task.add_done_callback(lambda _: slots.release())
+    
+    async def _flush(self, batch: List[tuple]) -> None:
+        # Requisições canceladas (cliente desconectado) não são pontuadas
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        batch_size.observe(len(batch), "micro_batch")
+        # Os tempos do lote valem para cada requisição do lote
+        timer = RequestTimer()
+        request_timer.set(timer)
+        try:
+            # Pontua fora do loop de eventos para que novas requisições
+            # continuem chegando
+            results = await executor.run(
+                score_micro_batch, [item[0] for item in batch], [item[1] for item in batch]
+            )
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result((result, timer.stages))
+
+
+batcher = MicroBatcher(
+    config.api_config['batch_max_size'],
+    config.api_config['batch_max_wait_ms'],
+    config.api_config['batch_max_size'] * config.api_config['inference_queue_depth'],
+    executor.workers
+)
+
+
+class PredictionCache:
+    """Cache LRU/TTL de predições por faixa, na frente do modelo.
+    
+    As chaves são os vetores de características quantizados na resolução
+    efetiva do modelo (``FeatureQuantizer``), prefixados pelo modelo e sua
+    versão: carregar outro modelo invalida todas as entradas. Com ``store``,
+    as entradas também são gravadas em um arquivo SQLite local lido pelos
+    demais workers da máquina.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        store: Optional[str] = None,
+        decimals: int = 4
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.store = store
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.quantizer: Optional[FeatureQuantizer] = None
+        self.explainable = True
+        self._prefix = b""
+        self._entries: 'OrderedDict[bytes, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.quantizer is not None
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Conexão SQLite desta thread com o armazenamento compartilhado."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            Path(self.store).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.store, timeout=1.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key BLOB PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+    
+    def reset(self, active, version: str) -> None:
+        """Associar o cache ao modelo carregado, descartando as entradas anteriores."""
+        with self._lock:
+            self._entries.clear()
+            self._prefix = version.encode() + b"\0"
+            self.quantizer = FeatureQuantizer(active, input_features(active), self.decimals)
+            self.explainable = supports_contributions(active.model)
+        if self.store:
+            with self._connection() as connection:
+                connection.execute("DELETE FROM predictions WHERE expires < ?", (time.time(),))
+    
+    def keys(self, frame: pd.DataFrame) -> List[bytes]:
+        return [self._prefix + key for key in self.quantizer.keys(frame)]
+    
+    def get_many(self, keys: List[bytes], explain: bool) -> List[Optional[Dict[str, Any]]]:
+        """Resultados em cache por chave (None quando ausente ou expirado).
+        
+        Entradas sem contribuições não atendem requisições com ``explain``,
+        exceto quando o modelo não suporta contribuições.
+        """
+        now = time.time()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                item = self._entries.get(key)
+                if item is None:
+                    continue
+                if item[0] < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                results[i] = item[1]
+        
+        store_hits = 0
+        if self.store:
+            missing = list({keys[i] for i, result in enumerate(results) if result is None})
+            found = self._load(missing, now)
+            if found:
+                self._insert(found)
+                for i, key in enumerate(keys):
+                    if results[i] is None and key in found:
+                        results[i] = found[key][1]
+                        store_hits += 1
+        
+        for i, result in enumerate(results):
+            if (
+                result is not None and explain and self.explainable
+                and result["top_features"] is None
+            ):
+                results[i] = None
+            elif result is not None:
+                results[i] = {**result, "top_features": result["top_features"] if explain else None}
+        hits = sum(result is not None for result in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+            self.store_hits += store_hits
+        return results
+    
+    def put_many(self, keys: List[bytes], results: List[Dict[str, Any]]) -> None:
+        """Guardar resultados recém-calculados."""
+        expires = time.time() + self.ttl_s
+        entries = {key: (expires, dict(result)) for key, result in zip(keys, results)}
+        self._insert(entries)
+        if self.store:
+            with self._connection() as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                    [(key, json.dumps(value), expires) for key, (expires, value) in entries.items()]
+                )
+    
+    def _insert(self, entries: Dict[bytes, Tuple[float, Dict[str, Any]]]) -> None:
+        with self._lock:
+            self._entries.update(entries)
+            for key in entries:
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _load(self, keys: List[bytes], now: float) -> Dict[bytes, Tuple[float, Dict[str, Any]]]:
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = connection.execute(
+                f"SELECT key, value, expires FROM predictions WHERE key IN ({placeholders}) "
+                "AND expires >= ?",
+                (*chunk, now)
+            )
+            for key, value, expires in rows:
+                found[key] = (expires, json.loads(value))
+        return found
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "store_hits": self.store_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "shared": bool(self.store)
+        }
+
+
+cache = PredictionCache(
+    config.api_config['cache_max_entries'],
+    config.api_config['cache_ttl_s'],
+    config.api_config['cache_store'],
+    config.api_config['cache_decimals']
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede contagem e latência por rota.
+    
+    O rótulo de rota é o modelo do caminho (``/predict/batch``), não a URL,
+    para manter a cardinalidade fixa. Cada requisição ganha um
+    ``RequestTimer``; se alguma etapa foi medida até o início da resposta,
+    o tempo restante vai para ``serialize`` e as etapas seguem no
+    cabeçalho ``Server-Timing`` e no histograma por etapa.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        timer = RequestTimer()
+        request_timer.set(timer)
+        status = 500
+        
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if timer.stages:
+                    timer.mark('serialize')
+                    message['headers'] = list(message.get('headers', [])) + [
+                        (b'server-timing', timer.server_timing().encode())
+                    ]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - timer.start
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            request_count.inc(route, scope['method'], str(status))
+            request_latency.observe(elapsed, route, scope['method'])
+            for stage, seconds in timer.stages.items():
+                stage_latency.observe(seconds, route, stage)
+
+
+app.add_middleware(MetricsMiddleware)
+
+
+def render_metrics() -> str:
+    """Métricas do worker no formato de texto Prometheus."""
+    lines = []
+    for collector in (request_count, request_latency, stage_latency, batch_size):
+        lines.extend(collector.render())
+    
+    def gauge(name: str, help: str, value: float, kind: str = "gauge", labels: str = "") -> None:
+        lines.extend([
+            f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name}{labels} {value:g}"
+        ])
+    
+    inference = executor.stats()
+    gauge(
+        "spotify_api_inference_in_flight", "Tarefas de inferência em execução.",
+        inference['in_flight']
+    )
+    gauge(
+        "spotify_api_inference_queued", "Tarefas de inferência aguardando uma thread.",
+        inference['queued']
+    )
+    gauge(
+        "spotify_api_micro_batch_queued", "Predições unitárias aguardando um micro-lote.",
+        batcher._queue.qsize() if batcher.running else 0
+    )
+    gauge(
+        "spotify_api_rejected_total", "Requisições rejeitadas por sobrecarga.",
+        inference['rejected'], kind="counter"
+    )
+    
+    cache_stats = cache.stats()
+    gauge("spotify_api_cache_entries", "Predições no cache em memória.", cache_stats['entries'])
+    gauge(
+        "spotify_api_cache_hits_total", "Acertos do cache de predições.",
+        cache_stats['hits'], kind="counter"
+    )
+    gauge(
+        "spotify_api_cache_misses_total", "Faltas do cache de predições.",
+        cache_stats['misses'], kind="counter"
+    )
+    gauge(
+        "spotify_api_cache_hit_ratio", "Fração de consultas atendidas pelo cache.",
+        cache_stats['hit_ratio']
+    )
+    
+    entry = model_state.entry or {}
+    gauge(
+        "spotify_api_model_ready", "1 se o modelo está carregado e aquecido.",
+        int(model_state.ready)
+    )
+    if model_state.model is not None:
+        gauge(
+            "spotify_api_model_info", "Modelo servido por este worker.", 1,
+            labels=format_labels(
+                ("model", "version"), (entry.get('name', 'demo'), entry.get('version', ''))
+            )
+        )
+    return "\n".join(lines) + "\n"
+
+
+def score_tracks(tracks: List[TrackFeatures], explain: bool = True) -> List[Dict[str, Any]]:
+    """Pontuar faixas validadas com o modelo ativo."""
+    with timed_stage('preprocess'):
+        frame = tracks_to_frame(tracks, input_features(get_active_model()))
+    return score_rows(frame, explain)
+
+
+def score_micro_batch(tracks: List[TrackFeatures], explain: List[bool]) -> List[Any]:
+    """Pontuar um micro-lote, calculando contribuições só para quem as pediu.
+    
+    As faixas com e sem ``explain`` são pontuadas em sublotes separados; uma
+    falha em um sublote vira o resultado (a exceção) apenas das suas faixas.
+    """
+    results: List[Any] = [None] * len(tracks)
+    for wanted in (False, True):
+        indices = [i for i, flag in enumerate(explain) if flag == wanted]
+        if not indices:
+            continue
+        try:
+            scored = score_tracks([tracks[i] for i in indices], wanted)
+        except Exception as e:
+            scored = [e] * len(indices)
+        for i, result in zip(indices, scored):
+            results[i] = result
+    return results
+
+
+def score_rows(frame: pd.DataFrame, explain: bool = True) -> List[Dict[str, Any]]:
+    """Pontuar um DataFrame de características brutas já validadas.
+    
+    Linhas presentes no cache não passam pelo modelo; as demais são
+    pontuadas em um único lote e guardadas no cache.
+    """
+    active = get_active_model()
+    frame = frame[input_features(active)]
+    if not cache.enabled:
+        return score_frame(active, frame, explain)
+    
+    with timed_stage('cache'):
+        keys = cache.keys(frame)
+        results = cache.get_many(keys, explain)
+        missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        scored = score_frame(active, frame.iloc[missing], explain)
+        with timed_stage('cache'):
+            cache.put_many([keys[i] for i in missing], scored)
+        for i, result in zip(missing, scored):
+            results[i] = result
+    return results
+
+
+def _field_bounds(field) -> Tuple[float, float]:
+    low, high = -np.inf, np.inf
+    for constraint in field.metadata:
+        low = getattr(constraint, 'ge', low)
+        high = getattr(constraint, 'le', high)
+    return low, high
+
+
+def validate_columns(frame: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Validar colunas de características sem criar um ``TrackFeatures`` por linha.
+    
+    Aplica as mesmas regras do modelo ``TrackFeatures`` (campos obrigatórios,
+    limites e inteiros) com operações vetorizadas; campos opcionais ausentes
+    recebem o valor padrão.
+    
+    Returns:
+        Tupla (características, erro por linha ou None para linhas válidas).
+    """
+    n_rows = len(frame)
+    errors = np.full(n_rows, None, dtype=object)
+    columns = {}
+    for name, field in TrackFeatures.model_fields.items():
+        if name in frame:
+            values = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=float)
+        else:
+            values = np.full(n_rows, np.nan)
+        if not field.is_required():
+            values = np.where(np.isnan(values), field.default, values)
+        
+        low, high = _field_bounds(field)
+        invalid = np.isnan(values) | (values < low) | (values > high)
+        is_integer = int in getattr(field.annotation, '__args__', (field.annotation,))
+        if is_integer:
+            invalid |= values != np.round(values)
+        errors[invalid & pd.isna(errors)] = f"valor ausente ou inválido para '{name}'"
+        
+        values = np.where(invalid, 0 if field.is_required() else field.default, values)
+        columns[name] = values.astype(int) if is_integer else values
+    return pd.DataFrame(columns), errors
+
+
+STREAM_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+STREAM_MEDIA_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+STREAM_CSV_COLUMNS = [
+    'row', 'predicted_popularity', 'category', 'confidence', 'top_features', 'error'
+]
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """Resposta em streaming que lê o corpo da requisição enquanto responde.
+    
+    A ``StreamingResponse`` padrão pode consumir mensagens do corpo ao
+    aguardar a desconexão do cliente; aqui a desconexão é detectada pela
+    própria leitura do corpo e pelo envio da resposta.
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+async def iter_line_chunks(
+    request: Request, chunk_rows: int, quoted: bool = False
+) -> AsyncIterator[List[bytes]]:
+    """Ler o corpo da requisição em blocos de até ``chunk_rows`` registros não vazios.
+    
+    Cada registro é uma linha; com ``quoted`` (CSV), uma quebra de linha
+    dentro de um campo entre aspas não encerra o registro, que segue até a
+    linha em que as aspas se fecham.
+    """
+    buffer = b""
+    lines: List[bytes] = []
+    record: List[bytes] = []
+    in_quotes = False
+    async for data in request.stream():
+        buffer += data
+        *complete, buffer = buffer.split(b"\n")
+        for line in complete:
+            if not record and not line.strip():
+                continue
+            record.append(line)
+            if quoted:
+                in_quotes ^= line.count(b'"') % 2 == 1
+            if not in_quotes:
+                lines.append(b"\n".join(record))
+                record = []
+        while len(lines) >= chunk_rows:
+            yield lines[:chunk_rows]
+            lines = lines[chunk_rows:]
+    if buffer.strip() or record:
+        # Aspas não fechadas no fim do corpo: o registro segue inválido para o parser
+        record.append(buffer)
+        lines.append(b"\n".join(record))
+    if lines:
+        yield lines
+
+
+def parse_csv_lines(lines: List[bytes], header: bytes) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Converter registros CSV um a um, marcando como inválidos só os malformados."""
+    errors = np.full(len(lines), None, dtype=object)
+    columns = next(csv.reader([header.decode('utf-8', 'replace')]))
+    records = []
+    for i, line in enumerate(lines):
+        try:
+            values = next(csv.reader([line.decode('utf-8')], strict=True))
+        except (UnicodeDecodeError, csv.Error, StopIteration):
+            values = None
+        if values is None or len(values) != len(columns):
+            errors[i] = "linha CSV inválida"
+            values = []
+        records.append(dict(zip(columns, values)))
+    return pd.DataFrame.from_records(records, index=range(len(lines))), errors
+
+
+def parse_chunk(
+    lines: List[bytes],
+    input_format: str,
+    header: Optional[bytes]
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Converter um bloco de linhas CSV ou NDJSON em DataFrame e erros por linha.
+    
+    Blocos CSV são lidos de uma vez com ``pd.read_csv``; se o bloco tiver
+    alguma linha malformada, ele é relido linha a linha para que só essas
+    linhas recebam erro.
+    """
+    errors = np.full(len(lines), None, dtype=object)
+    if input_format == 'csv':
+        try:
+            frame = pd.read_csv(io.BytesIO(b"\n".join([header, *lines])))
+        except (ValueError, pd.errors.ParserError):
+            frame = None
+        if frame is None or len(frame) != len(lines):
+            return parse_csv_lines(lines, header)
+        return frame, errors
+    
+    records = []
+    for i, line in enumerate(lines):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            errors[i] = "linha JSON inválida"
+            record = {}
+        records.append(record)
+    return pd.DataFrame.from_records(records, index=range(len(lines))), errors
+
+
+def format_chunk(
+    start: int,
+    results: List[Optional[Dict[str, Any]]],
+    errors: np.ndarray,
+    output_format: str,
+    header: bool
+) -> bytes:
+    """Serializar os resultados de um bloco como NDJSON ou CSV."""
+    if output_format == 'ndjson':
+        return "".join(
+            json.dumps(
+                {"row": start + i, "error": error} if error else {"row": start + i, **result},
+                ensure_ascii=False
+            ) + "\n"
+            for i, (result, error) in enumerate(zip(results, errors))
+        ).encode()
+    
+    frame = pd.DataFrame.from_records(
+        [result or {} for result in results], columns=STREAM_CSV_COLUMNS[1:-1]
+    )
+    frame.insert(0, 'row', np.arange(start, start + len(results)))
+    frame['top_features'] = [
+        json.dumps(features, ensure_ascii=False) if isinstance(features, dict) else ""
+        for features in frame['top_features']
+    ]
+    frame['error'] = [error or "" for error in errors]
+    return frame.to_csv(index=False, header=header, lineterminator="\n").encode()
+
+
+async def stream_predictions(
+    request: Request,
+    input_format: str,
+    output_format: str,
+    explain: bool
+) -> AsyncIterator[bytes]:
+    """Ler, validar, pontuar e serializar o corpo bloco a bloco."""
+    header: Optional[bytes] = None
+    row = 0
+    chunk_rows = config.api_config['stream_chunk_rows']
+    async for lines in iter_line_chunks(request, chunk_rows, quoted=input_format == 'csv'):
+        if input_format == 'csv' and header is None:
+            header, lines = lines[0], lines[1:]
+            if not lines:
+                continue
+        
+        with timed_stage('parse'):
+            frame, errors = parse_chunk(lines, input_format, header)
+            features, invalid = validate_columns(frame)
+            errors = np.where(pd.isna(errors), invalid, errors)
+            valid = np.flatnonzero(pd.isna(errors))
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(lines)
+        if len(valid):
+            batch_size.observe(len(valid), "stream")
+            scored = await executor.run(score_rows, features.iloc[valid], explain, wait=True)
+            for i, result in zip(valid, scored):
+                results[i] = result
+        
+        with timed_stage('serialize'):
+            chunk = format_chunk(row, results, errors, output_format, header=row == 0)
+        yield chunk
+        row += len(lines)
+
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON codificada com orjson, incluindo arrays e escalares NumPy."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+FAST_JSON = bool(config.api_config['fast_json']) and orjson is not None
+
+
+def fast_json_response(payload: Any, headers: Dict[str, str]) -> Response:
+    """Resposta para saída interna já no formato final.
+    
+    Não passa por ``jsonable_encoder`` nem revalida com ``response_model``:
+    as predições são montadas por ``score_frame`` com tipos nativos (ou
+    NumPy) e não precisam ser verificadas de novo a cada item.
+    """
+    return FastJSONResponse(payload, headers=headers)
+
+
+TRACK_LIST = TypeAdapter(List[TrackFeatures])
+BATCH_FORMATS = {
+    'application/json': 'json',
+    'application/vnd.apache.arrow.stream': 'arrow',
+    'application/msgpack': 'msgpack',
+    'application/x-msgpack': 'msgpack'
+}
+BATCH_MEDIA_TYPES = {
+    'json': 'application/json',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'msgpack': 'application/msgpack'
+}
+BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/TrackFeatures"}}
+            },
+            "application/vnd.apache.arrow.stream": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+            "application/msgpack": {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+
+def available_formats() -> List[str]:
+    """Formatos de lote suportados com as dependências instaladas."""
+    formats = ['json']
+    if pa is not None:
+        formats.append('arrow')
+    if msgpack is not None:
+        formats.append('msgpack')
+    return formats
+
+
+def request_format(request: Request) -> str:
+    """Formato do corpo da requisição, pelo ``Content-Type`` (JSON se ausente).
+    
+    Raises:
+        HTTPException: 415 para formatos não suportados.
+    """
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    fmt = BATCH_FORMATS.get(content_type or 'application/json')
+    if fmt not in available_formats():
+        supported = [
+            media_type for media_type, f in BATCH_FORMATS.items() if f in available_formats()
+        ]
+        raise HTTPException(
+            status_code=415, detail=f"Formato não suportado; use um de {supported}"
+        )
+    return fmt
+
+
+def negotiate_format(accept: str, default: str) -> str:
+    """Primeiro formato suportado do cabeçalho ``Accept`` (ou ``default``)."""
+    for media_type in accept.split(','):
+        fmt = BATCH_FORMATS.get(media_type.split(';')[0].strip().lower())
+        if fmt in available_formats():
+            return fmt
+    return default
+
+
+def decode_columns(body: bytes, fmt: str) -> pd.DataFrame:
+    """Decodificar um payload colunar (Arrow IPC ou msgpack) em DataFrame."""
+    if fmt == 'arrow':
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    columns = msgpack.unpackb(body)
+    if not isinstance(columns, dict):
+        raise ValueError("esperado um mapa de característica para lista de valores")
+    return pd.DataFrame({name: np.asarray(values) for name, values in columns.items()})
+
+
+def encode_columns(predictions: List[Dict[str, Any]], fmt: str, explain: bool) -> bytes:
+    """Codificar predições como colunas (Arrow IPC ou msgpack)."""
+    n_rows = len(predictions)
+    popularity = np.fromiter((p["predicted_popularity"] for p in predictions), float, n_rows)
+    confidence = np.fromiter((p["confidence"] for p in predictions), float, n_rows)
+    categories = [p["category"] for p in predictions]
+    top_features = [p["top_features"] or {} for p in predictions] if explain else None
+    
+    if fmt == 'msgpack':
+        return msgpack.packb({
+            "count": n_rows,
+            "predicted_popularity": popularity.tolist(),
+            "category": categories,
+            "confidence": confidence.tolist(),
+            "top_features": top_features
+        })
+    
+    columns = {
+        "predicted_popularity": pa.array(popularity),
+        "category": pa.array(categories, pa.string()).dictionary_encode(),
+        "confidence": pa.array(confidence)
+    }
+    if explain:
+        columns["top_features"] = pa.array(
+            [list(features.items()) for features in top_features],
+            pa.map_(pa.string(), pa.float64())
+        )
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+async def read_batch_body(request: Request) -> bytes:
+    """Ler o corpo de ``/predict/batch`` até ``max_batch_bytes``.
+    
+    Rejeita pelo ``Content-Length`` antes de ler qualquer byte e, sem ele,
+    assim que o corpo recebido passa do limite.
+    
+    Raises:
+        HTTPException: 413 se o corpo passar de ``max_batch_bytes``.
+    """
+    max_bytes = config.api_config['max_batch_bytes']
+    too_large = HTTPException(
+        status_code=413, detail=f"Corpo maior que {max_bytes} bytes por requisição em lote"
+    )
+    content_length = request.headers.get('content-length', '')
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+    
+    body = bytearray()
+    async for piece in request.stream():
+        body += piece
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def score_batch(
+    body: bytes, input_format: str, output_format: str, explain: bool
+) -> Any:
+    """Decodificar, validar, pontuar e (se colunar) codificar um lote.
+    
+    Roda inteira na thread de inferência. O número de faixas é verificado
+    logo após a decodificação, antes de criar qualquer ``TrackFeatures``.
+    
+    Returns:
+        Lista de predições (saída JSON) ou bytes no formato ``output_format``.
+    
+    Raises:
+        HTTPException: 400 para payload inválido ou grande demais, 422 com
+            os erros por linha de colunas inválidas.
+        RequestValidationError: Faixas JSON inválidas.
+    """
+    max_batch_size = config.api_config['max_batch_size']
+    with timed_stage('parse'):
+        try:
+            if input_format == 'json':
+                rows = from_json(body)
+            else:
+                rows = decode_columns(body, input_format)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400, detail=f"Payload {input_format} inválido: {str(e)}"
+            )
+        if isinstance(rows, (list, pd.DataFrame)) and len(rows) > max_batch_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Máximo de {max_batch_size} faixas por requisição em lote"
+            )
+        
+        if input_format == 'json':
+            try:
+                tracks = TRACK_LIST.validate_python(rows)
+            except ValidationError as e:
+                raise RequestValidationError(e.errors())
+        else:
+            features, errors = validate_columns(rows)
+            invalid = np.flatnonzero(~pd.isna(errors))
+            if len(invalid):
+                raise HTTPException(
+                    status_code=422,
+                    detail=[{"row": int(i), "error": errors[i]} for i in invalid[:20]]
+                )
+    
+    batch_size.observe(len(rows), "batch")
+    if input_format == 'json':
+        predictions = score_tracks(tracks, explain)
+    else:
+        predictions = score_rows(features, explain)
+    if output_format == 'json':
+        return predictions
+    with timed_stage('serialize'):
+        return encode_columns(predictions, output_format, explain)
+
+
 # Rotas
 @app.get("/", tags=["Geral"])
 async def root():
@@ -109,119 +1542,188 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse, tags=["Geral"])
 async def health_check():
-    """Endpoint de verificação de saúde."""
-    return {
-        "status": "healthy",
-        "version": "1.0.0",
-        "model_loaded": True  # Em produção, verificar modelo real
-    }
+    """Endpoint de verificação de saúde (modelo carregado e tempos de inicialização)."""
+    return health_payload()
+
+
+@app.get("/health/live", tags=["Geral"])
+async def liveness():
+    """Liveness: o processo está de pé e o loop de eventos responde."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", response_model=HealthResponse, tags=["Geral"])
+async def readiness():
+    """Readiness: 200 somente após o modelo ser carregado e aquecido; 503 caso contrário."""
+    payload = health_payload()
+    if not model_state.ready:
+        return JSONResponse(status_code=503, content=payload)
+    return payload
+
+
+@app.get("/metrics", tags=["Geral"])
+async def metrics():
+    """Métricas Prometheus: requisições, latência, lotes, filas, cache e modelo."""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/model/info", response_model=ModelInfo, tags=["Modelo"])
 async def get_model_info():
     """Obter informações sobre o modelo carregado."""
-    return {
-        "model_name": "XGBoost Regressor",
-        "model_type": "Gradient Boosting",
-        "features": config.numerical_features + config.categorical_features,
-        "metrics": {
-            "r2_score": 0.254,
-            "mae": 12.48,
-            "rmse": 16.92
+    active = get_active_model()
+    entry = model_state.entry
+    if entry is None:
+        return {
+            "model_name": "Demo Weighted Sum",
+            "model_type": "Linear (pesos fixos)",
+            "features": active.feature_names,
+            "metrics": {}
         }
+    
+    return {
+        "model_name": f"{entry['name']} v{entry['version']}",
+        "model_type": entry.get('model_type', entry['name']),
+        "features": entry.get('input_features') or RAW_FEATURES,
+        "metrics": entry.get('metrics', {})
     }
 
 
-@app.post("/predict", response_model=PredictionResponse, tags=["Predição"])
-async def predict_popularity(features: TrackFeatures):
+@app.post(
+    "/predict", response_model=PredictionResponse, response_model_exclude_unset=True,
+    tags=["Predição"]
+)
+async def predict_popularity(
+    features: TrackFeatures,
+    response: Response,
+    explain: bool = Query(True, description="Incluir as principais características contribuintes"),
+    debug: bool = Query(False, description="Incluir o tempo por etapa (ms) na resposta")
+):
     """
     Predizer a popularidade de uma faixa baseado em suas características de áudio.
     
     Este endpoint recebe características musicais de uma faixa e retorna uma pontuação
     de popularidade predita (0-100) junto com insights adicionais.
+    
+    O tempo por etapa (parse, queue, cache, preprocess, predict,
+    contributions, serialize) vem no cabeçalho ``Server-Timing`` e, com
+    ``debug=true``, também no campo ``timings`` (sem a serialização final).
     """
+    mark_stage('parse')
+    get_active_model()
     try:
-        # Em produção, usar modelo treinado real
-        # Para demo, usar aproximação de soma ponderada
-        
-        # Calcular predição ponderada
-        predicted_value = (
-            features.loudness * 0.285 +
-            features.energy * 0.198 * 100 +
-            features.danceability * 0.156 * 100 +
-            features.valence * 0.124 * 100 +
-            features.acousticness * 0.089 * 100 +
-            features.tempo * 0.067 +
-            features.speechiness * 0.045 * 100 +
-            features.instrumentalness * 0.021 * 100 +
-            features.liveness * 0.015 * 100
-        )
-        
-        # Normalizar para intervalo 0-100
-        predicted_popularity = max(0, min(100, predicted_value))
-        
-        # Determinar categoria
-        if predicted_popularity >= 70:
-            category = "Alta"
-        elif predicted_popularity >= 40:
-            category = "Média"
+        if batcher.running:
+            result = await batcher.submit(features, explain)
         else:
-            category = "Baixa"
-        
-        # Calcular confiança (simplificado para demo)
-        confidence = 0.75 + np.random.uniform(-0.1, 0.1)
-        confidence = max(0, min(1, confidence))
-        
-        # Principais características contribuintes
-        feature_contributions = {
-            "loudness": abs(features.loudness * 0.285),
-            "energy": features.energy * 0.198,
-            "danceability": features.danceability * 0.156,
-            "valence": features.valence * 0.124,
-            "acousticness": features.acousticness * 0.089
-        }
-        
-        # Ordenar e pegar top 3
-        top_features = dict(sorted(
-            feature_contributions.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:3])
-        
-        return {
-            "predicted_popularity": round(predicted_popularity, 2),
-            "category": category,
-            "confidence": round(confidence, 3),
-            "top_features": top_features
-        }
-    
+            batch_size.observe(1, "single")
+            result = (await executor.run(score_tracks, [features], explain))[0]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro de predição: {str(e)}")
+    
+    queue_wait_header = f"{queue_wait.get() * 1000:.2f}"
+    timer = request_timer.get()
+    if debug and timer is not None:
+        result = {**result, "timings": timer.timings_ms()}
+    if FAST_JSON:
+        return fast_json_response(result, {"X-Queue-Wait-Ms": queue_wait_header})
+    
+    response.headers["X-Queue-Wait-Ms"] = queue_wait_header
+    return result
 
 
-@app.post("/predict/batch", tags=["Predição"])
-async def predict_batch(tracks: List[TrackFeatures]):
+@app.post("/predict/batch", tags=["Predição"], openapi_extra=BATCH_OPENAPI)
+async def predict_batch(
+    request: Request,
+    response: Response,
+    explain: bool = Query(True, description="Incluir as principais características contribuintes"),
+    debug: bool = Query(False, description="Incluir o tempo por etapa (ms) na resposta JSON")
+):
     """
     Predizer popularidade para múltiplas faixas de uma vez.
     
     Este endpoint aceita uma lista de características de faixas e retorna predições
     para todas as faixas em uma única requisição.
+    
+    Além de JSON, aceita formatos colunares (uma coluna por característica):
+    Arrow IPC (``application/vnd.apache.arrow.stream``) ou msgpack
+    (``application/msgpack``, um mapa de característica para lista de
+    valores). As colunas são validadas de forma vetorizada, sem criar um
+    ``TrackFeatures`` por faixa. O formato da resposta segue o cabeçalho
+    ``Accept`` (por padrão, o formato da requisição). Corpos acima de
+    ``max_batch_bytes`` são recusados com 413 antes da leitura; a
+    decodificação e a validação rodam no pool de inferência.
+    
+    O tempo por etapa vem no cabeçalho ``Server-Timing`` e, com
+    ``debug=true`` e resposta JSON, também no campo ``timings``.
     """
-    if len(tracks) > 100:
-        raise HTTPException(
-            status_code=400,
-            detail="Máximo de 100 faixas por requisição em lote"
-        )
+    input_format = request_format(request)
+    output_format = negotiate_format(request.headers.get('accept', ''), input_format)
+    body = await read_batch_body(request)
+    mark_stage('parse')
     
-    predictions = []
-    for track in tracks:
-        result = await predict_popularity(track)
-        predictions.append(result)
+    get_active_model()
+    try:
+        result = await executor.run(score_batch, body, input_format, output_format, explain)
+    except (HTTPException, RequestValidationError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro de predição: {str(e)}")
     
-    return {
-        "count": len(predictions),
-        "predictions": predictions
+    queue_wait_header = f"{queue_wait.get() * 1000:.2f}"
+    if output_format != 'json':
+        return Response(
+            content=result,
+            media_type=BATCH_MEDIA_TYPES[output_format],
+            headers={"X-Queue-Wait-Ms": queue_wait_header}
+        )
+    
+    payload = {
+        "count": len(result),
+        "predictions": result
     }
+    timer = request_timer.get()
+    if debug and timer is not None:
+        payload["timings"] = timer.timings_ms()
+    if FAST_JSON:
+        return fast_json_response(payload, {"X-Queue-Wait-Ms": queue_wait_header})
+    
+    response.headers["X-Queue-Wait-Ms"] = queue_wait_header
+    return payload
+
+
+@app.post("/predict/stream", tags=["Predição"])
+async def predict_stream(
+    request: Request,
+    explain: bool = Query(False, description="Incluir as principais características contribuintes")
+):
+    """
+    Pontuar um arquivo grande de faixas em streaming.
+    
+    Aceita um corpo CSV (``text/csv``, com cabeçalho) ou NDJSON
+    (``application/x-ndjson``), lido e pontuado em blocos de
+    ``stream_chunk_rows`` linhas. Os resultados são devolvidos em streaming
+    como NDJSON ou CSV, conforme o cabeçalho ``Accept`` (por padrão, o
+    formato de entrada), um por linha de entrada, com o número da linha e,
+    para linhas inválidas, o erro.
+    """
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    input_format = STREAM_FORMATS.get(content_type)
+    if input_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Formato não suportado; use um de {sorted(STREAM_FORMATS)}"
+        )
+    accept = request.headers.get('accept', '')
+    output_format = next(
+        (fmt for media_type, fmt in STREAM_FORMATS.items() if media_type in accept), input_format
+    )
+    get_active_model()
+    
+    return BodyStreamingResponse(
+        stream_predictions(request, input_format, output_format, explain),
+        media_type=STREAM_MEDIA_TYPES[output_format]
+    )
 
 
 @app.get("/features", tags=["Information"])
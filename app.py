@@ -17,6 +17,8 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 from spotify_analysis.config import config
 from spotify_analysis.data import DataLoader
 from spotify_analysis.models import ModelTrainer
+from spotify_analysis.models.importance import load_cached_importance
+from spotify_analysis.models.registry import get_registry
 from spotify_analysis.visualization import (
     plot_distribution,
     plot_correlation_heatmap,
@@ -71,6 +73,21 @@ page = st.sidebar.radio("Ir para", [
     "🎯 Fazer Predições"
 ])
 
+# Modelos registrados com pré-processador (indexados sem carregar; carregados sob demanda)
+@st.cache_resource
+def get_model_registry():
+    """Registro de modelos compartilhado entre sessões."""
+    return get_registry()
+
+registry = get_model_registry()
+registered_models = registry.list_models(servable=True)
+selected_model = None
+if registered_models:
+    selected_model = st.sidebar.selectbox(
+        "Modelo",
+        [f"{entry['name']}:{entry['version']}" for entry in reversed(registered_models)]
+    )
+
 st.sidebar.markdown("---")
 st.sidebar.info(
     "**Sobre:** Este dashboard fornece uma interface interativa para explorar "
@@ -153,7 +170,7 @@ if page == "📊 Visão Geral":
     st.plotly_chart(fig, use_container_width=True)
 
 # PAGE: Data Explorer
-elif page == "🔍 Data Explorer":
+elif page == "🔍 Explorador de Dados":
     st.markdown('<h2 class="sub-header">Data Explorer</h2>', unsafe_allow_html=True)
     
     tab1, tab2, tab3 = st.tabs(["📋 Dataset", "📊 Statistics", "🔗 Correlations"])
@@ -203,18 +220,30 @@ elif page == "🔍 Data Explorer":
         st.plotly_chart(fig, use_container_width=True)
 
 # PAGE: Model Performance
-elif page == "🤖 Model Performance":
+elif page == "🤖 Desempenho do Modelo":
     st.markdown('<h2 class="sub-header">Model Performance Comparison</h2>', unsafe_allow_html=True)
     
-    # Sample model results
-    models_data = {
-        'Model': ['XGBoost', 'Gradient Boosting', 'Random Forest', 'Ridge', 'Lasso', 'ElasticNet'],
-        'R² Score': [0.254, 0.241, 0.228, 0.182, 0.179, 0.185],
-        'MAE': [12.48, 12.73, 13.02, 14.35, 14.48, 14.21],
-        'RMSE': [16.92, 17.15, 17.48, 19.01, 19.12, 18.92]
-    }
-    
-    models_df = pd.DataFrame(models_data)
+    evaluated_models = [e for e in registered_models if 'test_r2' in e.get('metrics', {})]
+    if evaluated_models:
+        # Métricas lidas dos metadados do registro (sem carregar os modelos)
+        models_df = pd.DataFrame({
+            'Model': [f"{e['name']}:{e['version']}" for e in evaluated_models],
+            'R² Score': [e['metrics']['test_r2'] for e in evaluated_models],
+            'MAE': [e['metrics'].get('test_mae') for e in evaluated_models],
+            'RMSE': [e['metrics'].get('test_rmse') for e in evaluated_models]
+        })
+    else:
+        # Sample model results
+        models_data = {
+            'Model': [
+                'XGBoost', 'Gradient Boosting', 'Random Forest', 'Ridge', 'Lasso', 'ElasticNet'
+            ],
+            'R² Score': [0.254, 0.241, 0.228, 0.182, 0.179, 0.185],
+            'MAE': [12.48, 12.73, 13.02, 14.35, 14.48, 14.21],
+            'RMSE': [16.92, 17.15, 17.48, 19.01, 19.12, 18.92]
+        }
+        
+        models_df = pd.DataFrame(models_data)
     
     col1, col2 = st.columns(2)
     
@@ -249,17 +278,36 @@ elif page == "🤖 Model Performance":
     st.dataframe(models_df, use_container_width=True)
 
 # PAGE: Feature Analysis
-elif page == "📈 Feature Analysis":
+elif page == "📈 Análise de Features":
     st.markdown('<h2 class="sub-header">Feature Importance Analysis</h2>', unsafe_allow_html=True)
     
-    # Sample feature importance
-    importance_data = {
-        'Feature': ['loudness', 'energy', 'danceability', 'valence', 'acousticness',
-                   'tempo', 'speechiness', 'instrumentalness', 'liveness'],
-        'Importance': [0.285, 0.198, 0.156, 0.124, 0.089, 0.067, 0.045, 0.021, 0.015]
-    }
-    
-    importance_df = pd.DataFrame(importance_data)
+    # Importância por permutação do modelo selecionado, lida do cache em disco
+    # (chaveado pela identidade estável do modelo); sem cache, usa a do próprio
+    # modelo quando houver e, por fim, os dados de exemplo
+    importance_df = None
+    if selected_model is not None:
+        trainer = registry.resolve(selected_model, servable=True)
+        importance_title = f'{selected_model} Feature Importance'
+        if trainer.model_key is not None:
+            importance_df = load_cached_importance(trainer.model_key)
+        if importance_df is None:
+            importance_df = trainer.get_feature_importance(
+                trainer.feature_names, method='impurity'
+            )
+        if importance_df is not None:
+            importance_df = importance_df.rename(
+                columns={'feature': 'Feature', 'importance': 'Importance'}
+            ).head(15)
+    
+    if importance_df is None:
+        # Sample feature importance
+        importance_data = {
+            'Feature': ['loudness', 'energy', 'danceability', 'valence', 'acousticness',
+                       'tempo', 'speechiness', 'instrumentalness', 'liveness'],
+            'Importance': [0.285, 0.198, 0.156, 0.124, 0.089, 0.067, 0.045, 0.021, 0.015]
+        }
+        importance_df = pd.DataFrame(importance_data)
+        importance_title = 'XGBoost Feature Importance'
     
     fig = px.bar(
         importance_df,
@@ -268,7 +316,7 @@ elif page == "📈 Feature Analysis":
         orientation='h',
         color='Importance',
         color_continuous_scale='Viridis',
-        title='XGBoost Feature Importance'
+        title=importance_title
     )
     fig.update_layout(showlegend=False, height=500)
     st.plotly_chart(fig, use_container_width=True)
@@ -296,7 +344,7 @@ elif page == "📈 Feature Analysis":
     st.plotly_chart(fig, use_container_width=True)
 
 # PAGE: Make Predictions
-elif page == "🎯 Make Predictions":
+elif page == "🎯 Fazer Predições":
     st.markdown('<h2 class="sub-header">Predict Track Popularity</h2>', unsafe_allow_html=True)
     
     st.markdown("""
@@ -319,20 +367,31 @@ elif page == "🎯 Make Predictions":
         valence = st.slider("Valence", 0.0, 1.0, 0.5, 0.01)
         tempo = st.slider("Tempo (BPM)", 60.0, 200.0, 120.0, 1.0)
     
-    # Simple prediction simulation (in production, use trained model)
     if st.button("🎯 Predict Popularity", type="primary"):
-        # Weighted sum for demo purposes
-        predicted_popularity = (
-            loudness * 0.285 +
-            energy * 0.198 * 100 +
-            danceability * 0.156 * 100 +
-            valence * 0.124 * 100 +
-            acousticness * 0.089 * 100 +
-            tempo * 0.067 +
-            speechiness * 0.045 * 100 +
-            instrumentalness * 0.021 * 100 +
-            liveness * 0.015 * 100
-        )
+        if selected_model is not None:
+            # Modelo resolvido pelo registro (carregado uma vez e mantido no LRU)
+            trainer = registry.resolve(selected_model, servable=True)
+            track = pd.DataFrame([{
+                'danceability': danceability, 'energy': energy, 'loudness': loudness,
+                'speechiness': speechiness, 'acousticness': acousticness,
+                'instrumentalness': instrumentalness, 'liveness': liveness,
+                'valence': valence, 'tempo': tempo, 'duration_ms': 200000,
+                'key': 0, 'mode': 1, 'time_signature': 4
+            }])
+            predicted_popularity = float(trainer.predict(trainer.transform(track))[0])
+        else:
+            # Weighted sum for demo purposes
+            predicted_popularity = (
+                loudness * 0.285 +
+                energy * 0.198 * 100 +
+                danceability * 0.156 * 100 +
+                valence * 0.124 * 100 +
+                acousticness * 0.089 * 100 +
+                tempo * 0.067 +
+                speechiness * 0.045 * 100 +
+                instrumentalness * 0.021 * 100 +
+                liveness * 0.015 * 100
+            )
         
         # Normalize to 0-100
         predicted_popularity = max(0, min(100, predicted_popularity))
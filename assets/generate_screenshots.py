@@ -117,7 +117,7 @@ def create_api_preview():
         ('GET', '/health', 'Health check endpoint', '#4CAF50'),
         ('GET', '/model/info', 'Get model information', '#2196F3'),
         ('POST', '/predict', 'Single track prediction', '#FF9800'),
-        ('POST', '/predict/batch', 'Batch predictions (max 100)', '#FF9800'),
+        ('POST', '/predict/batch', 'Batch predictions (vectorised)', '#FF9800'),
         ('GET', '/features', 'Feature descriptions', '#2196F3'),
     ]
     
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark das respostas JSON de /predict/batch: caminho padrão vs fast_json.
+
+Mede, para lotes de 1k e 10k faixas, a latência da requisição e a etapa
+``serialize`` do cabeçalho ``Server-Timing``. O cache de predições é
+aquecido antes de medir, para que o custo do modelo não esconda o da
+resposta. Requer orjson.
+
+Uso:
+    python examples/benchmark_api_responses.py [--sizes 1000 10000] [--repeats 7]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import api  # noqa: E402
+from spotify_analysis.benchmarks import make_synthetic_data  # noqa: E402
+
+
+def server_timing(header: str) -> dict:
+    """Converter ``Server-Timing`` em ``{etapa: ms}``."""
+    timings = {}
+    for entry in header.split(','):
+        name, _, duration = entry.strip().partition(';dur=')
+        timings[name] = float(duration)
+    return timings
+
+
+def run(client: TestClient, tracks: list, explain: bool, repeats: int) -> dict:
+    """Mediana da latência total e da serialização, em ms."""
+    url = f"/predict/batch?explain={str(explain).lower()}"
+    client.post(url, json=tracks)  # aquece o cache
+    totals, serialize = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.post(url, json=tracks)
+        totals.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        serialize.append(server_timing(response.headers['server-timing'])['serialize'])
+    return {'total_ms': statistics.median(totals), 'serialize_ms': statistics.median(serialize)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+
+    if api.orjson is None:
+        sys.exit("orjson não está instalado")
+    features = api.RAW_FEATURES
+
+    print(f"{'faixas':>7} {'explain':>7} {'modo':>8} {'total (ms)':>11} {'serialize (ms)':>15}")
+    with TestClient(api.app) as client:
+        for size in args.sizes:
+            tracks = make_synthetic_data(size, random_state=size)[features].to_dict('records')
+            for explain in (False, True):
+                results = {}
+                for mode, fast in (('padrão', False), ('orjson', True)):
+                    api.FAST_JSON = fast
+                    results[mode] = run(client, tracks, explain, args.repeats)
+                    print(
+                        f"{size:>7} {str(explain):>7} {mode:>8} "
+                        f"{results[mode]['total_ms']:>11.1f} {results[mode]['serialize_ms']:>15.1f}"
+                    )
+                speedup = results['padrão']['serialize_ms'] / results['orjson']['serialize_ms']
+                print(f"{'':>7} {'':>7} {'':>8} serialização {speedup:.1f}x mais rápida")
+
+
+if __name__ == "__main__":
+    main()
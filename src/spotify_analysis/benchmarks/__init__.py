@@ -0,0 +1,297 @@
+"""Data-size scaling benchmarks for the registered models."""
+
+import json
+import logging
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from spotify_analysis.config import config
+from spotify_analysis.data import DataPreprocessor, split_data
+from spotify_analysis.models import ModelTrainer
+from spotify_analysis.utils.instrumentation import RunProfiler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10_000, 31_623, 100_000, 316_228, 1_000_000]
+
+
+def geometric_sizes(start: int = 10_000, stop: int = 1_000_000, steps: int = 5) -> List[int]:
+    """Geometrically spaced sample sizes between ``start`` and ``stop``.
+
+    Args:
+        start: Smallest sample size.
+        stop: Largest sample size.
+        steps: Number of sizes.
+
+    Returns:
+        List of integer sample sizes.
+    """
+    return [int(round(n)) for n in np.geomspace(start, stop, steps)]
+
+
+def make_synthetic_data(n_samples: int, random_state: Optional[int] = None) -> pd.DataFrame:
+    """Generate synthetic tracks with the dataset's schema and value ranges.
+
+    The target depends non-linearly on a few audio features plus noise, so
+    tree models and linear models behave roughly as on the real data.
+
+    Args:
+        n_samples: Number of rows.
+        random_state: Random seed for reproducibility.
+
+    Returns:
+        DataFrame with all configured features and the target column.
+    """
+    rng = np.random.default_rng(random_state if random_state is not None else config.random_state)
+    df = pd.DataFrame({
+        'danceability': rng.beta(5, 3, n_samples),
+        'energy': rng.beta(4, 2, n_samples),
+        'loudness': -rng.gamma(2.0, 3.5, n_samples).clip(0, 60),
+        'speechiness': rng.beta(1, 8, n_samples),
+        'acousticness': rng.beta(1, 4, n_samples),
+        'instrumentalness': rng.beta(0.3, 4, n_samples),
+        'liveness': rng.beta(1.5, 6, n_samples),
+        'valence': rng.beta(2.5, 2.5, n_samples),
+        'tempo': rng.normal(120, 28, n_samples).clip(40, 220),
+        'duration_ms': rng.normal(225000, 45000, n_samples).clip(60000, 600000),
+        'key': rng.integers(0, 12, n_samples),
+        'mode': rng.integers(0, 2, n_samples),
+        'time_signature': rng.choice([3, 4, 5], n_samples, p=[0.1, 0.85, 0.05])
+    })
+
+    signal = (
+        30 * df['danceability'] * df['energy']
+        + 0.8 * (df['loudness'] + 10)
+        - 15 * df['instrumentalness']
+        + 8 * np.sin(df['valence'] * np.pi)
+        + 4 * (df['mode'] == 1)
+    )
+    noise = rng.normal(0, 15, n_samples)
+    df[config.target_variable] = (signal + noise + 40).clip(0, 100).round()
+    return df
+
+
+def resample_data(
+    df: pd.DataFrame,
+    n_samples: int,
+    random_state: Optional[int] = None
+) -> pd.DataFrame:
+    """Resample a real dataset (with replacement) to a given size.
+
+    Args:
+        df: Source DataFrame.
+        n_samples: Number of rows to draw.
+        random_state: Random seed for reproducibility.
+
+    Returns:
+        Resampled DataFrame.
+    """
+    return df.sample(
+        n=n_samples, replace=n_samples > len(df),
+        random_state=random_state if random_state is not None else config.random_state
+    ).reset_index(drop=True)
+
+
+def benchmark_model(
+    model_name: str,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    trace_memory: bool = False,
+    categorical_features: Optional[Sequence[bool]] = None
+) -> Dict[str, Any]:
+    """Fit and score one model, recording time, throughput and memory.
+
+    Times are always measured without ``tracemalloc``, whose per-allocation
+    bookkeeping slows fitting down considerably. With ``trace_memory`` the
+    model is fitted once more, in a separate pass, to record the
+    allocation peak.
+
+    Args:
+        model_name: Name of the model.
+        X_train: Training features.
+        y_train: Training target.
+        X_test: Test features.
+        y_test: Test target.
+        trace_memory: Whether to run the extra pass measuring allocation
+            peaks (``fit_peak_mb`` is None otherwise).
+        categorical_features: Mask of ordinal-encoded categorical columns for
+            models with native categorical support.
+
+    Returns:
+        Dictionary with fit time, predict throughput, peak memory and test R².
+    """
+    def fit(run: RunProfiler) -> ModelTrainer:
+        trainer = ModelTrainer(model_name)
+        with run.stage('fit'):
+            # Checkpoint writes (or resuming a leftover one) would skew the timings
+            trainer.fit(
+                X_train, y_train, checkpoint=False, categorical_features=categorical_features
+            )
+        return trainer
+
+    run = RunProfiler().enable(trace_memory=False)
+    try:
+        trainer = fit(run)
+        with run.stage('predict'):
+            y_pred = trainer.predict(X_test)
+    finally:
+        run.disable()
+    fit_record, predict_record = run.records
+
+    fit_peak_mb = None
+    if trace_memory:
+        memory_run = RunProfiler().enable(trace_memory=True)
+        try:
+            fit(memory_run)
+        finally:
+            memory_run.disable()
+        fit_peak_mb = memory_run.records[0].get('peak_alloc_mb')
+
+    accumulator = trainer.create_metrics_accumulator()
+    test_metrics = accumulator.update(y_test, y_pred).compute('test')
+
+    return {
+        'model': model_name,
+        'n_train': len(y_train),
+        'n_test': len(y_test),
+        'n_features': X_train.shape[1],
+        'fit_time_s': fit_record['wall_s'],
+        'fit_cpu_s': fit_record['cpu_s'],
+        'predict_time_s': predict_record['wall_s'],
+        'predict_rows_per_s': len(y_test) / max(predict_record['wall_s'], 1e-9),
+        'fit_peak_mb': fit_peak_mb,
+        'max_rss_mb': fit_record['max_rss_mb'],
+        'test_r2': test_metrics['test_r2']
+    }
+
+
+def run_scaling_benchmark(
+    model_names: Optional[Sequence[str]] = None,
+    sizes: Optional[Sequence[int]] = None,
+    data: Optional[pd.DataFrame] = None,
+    max_fit_seconds: Optional[float] = 600.0,
+    trace_memory: bool = False,
+    random_state: Optional[int] = None
+) -> Dict[str, Any]:
+    """Benchmark every model on geometrically increasing sample sizes.
+
+    For each size the data is generated (or resampled from ``data``), split
+    and preprocessed once per categorical encoding, then every model is
+    fitted and scored on the matrices for its encoding (one-hot, or ordinal
+    for models with native categorical support). A model whose fit exceeds
+    ``max_fit_seconds`` is skipped for larger sizes.
+
+    Args:
+        model_names: Models to benchmark. If None, uses all configured models.
+        sizes: Total sample sizes (train + test). If None, uses 10k to 1M.
+        data: Real dataset to resample from. If None, uses synthetic data.
+        max_fit_seconds: Fit time after which a model is dropped from larger
+            sizes. None to never drop.
+        trace_memory: Whether to measure allocation peaks, in a separate fit
+            pass per model so the timings are not affected.
+        random_state: Random seed for reproducibility.
+
+    Returns:
+        Report dictionary with environment info and one result per run.
+    """
+    model_names = list(model_names or config.model_configs.keys())
+    sizes = list(sizes or DEFAULT_SIZES)
+    random_state = random_state if random_state is not None else config.random_state
+
+    results: List[Dict[str, Any]] = []
+    active = list(model_names)
+
+    for n_samples in sizes:
+        if not active:
+            break
+
+        if data is None:
+            df = make_synthetic_data(n_samples, random_state)
+        else:
+            df = resample_data(data, n_samples, random_state)
+        X_train_df, X_test_df, y_train, y_test = split_data(
+            df, test_size=config.train_test_split_config['test_size'], random_state=random_state
+        )
+        y_train, y_test = y_train.to_numpy(), y_test.to_numpy()
+        matrices: Dict[str, Any] = {}
+
+        for model_name in list(active):
+            encoding = config.get_categorical_encoding(model_name)
+            if encoding not in matrices:
+                preprocessor = DataPreprocessor(categorical_encoding=encoding)
+                matrices[encoding] = (
+                    preprocessor.fit_transform(X_train_df),
+                    preprocessor.transform(X_test_df),
+                    preprocessor.get_categorical_mask()
+                )
+            X_train, X_test, categorical_mask = matrices[encoding]
+
+            logger.info(f"Benchmarking {model_name} on {n_samples:,} samples")
+            result = benchmark_model(
+                model_name, X_train, y_train, X_test, y_test,
+                trace_memory=trace_memory, categorical_features=categorical_mask
+            )
+            result['categorical_encoding'] = encoding
+            result['n_samples'] = n_samples
+            results.append(result)
+
+            if max_fit_seconds is not None and result['fit_time_s'] > max_fit_seconds:
+                logger.warning(
+                    f"{model_name} took {result['fit_time_s']:.1f}s on {n_samples:,} samples; "
+                    "skipping larger sizes"
+                )
+                active.remove(model_name)
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'data_source': 'synthetic' if data is None else 'resampled',
+        'sizes': sizes,
+        'models': model_names,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor()
+        },
+        'results': results
+    }
+
+
+def results_frame(report: Dict[str, Any]) -> pd.DataFrame:
+    """Benchmark results as a tidy DataFrame.
+
+    Args:
+        report: Report returned by ``run_scaling_benchmark``.
+
+    Returns:
+        DataFrame with one row per (model, size) run.
+    """
+    return pd.DataFrame(report['results'])
+
+
+def save_report(report: Dict[str, Any], filepath: Optional[Path] = None) -> Path:
+    """Write a benchmark report as JSON.
+
+    Args:
+        report: Report returned by a benchmark run.
+        filepath: Output path. If None, writes to the logs directory.
+
+    Returns:
+        Path of the written report.
+    """
+    if filepath is None:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filepath = config.logs_dir / f"benchmark_{timestamp}.json"
+
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    logger.info(f"Benchmark report saved to {filepath}")
+    return filepath
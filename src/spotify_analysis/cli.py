@@ -27,10 +27,35 @@ def main():
     
     # Predict command
     predict_parser = subparsers.add_parser("predict", help="Make predictions")
-    predict_parser.add_argument("--model", type=str, required=True, help="Path to model")
+    predict_parser.add_argument(
+        "--model", type=str, required=True,
+        help="Registered model (name or name:version) or path to a .pkl file"
+    )
     predict_parser.add_argument("--data", type=str, required=True, help="Path to data")
     predict_parser.add_argument("--output", type=str, help="Output file path")
     
+    # Models command
+    models_parser = subparsers.add_parser("models", help="List registered models")
+    models_parser.add_argument("--name", type=str, help="Only list versions of this model")
+    
+    # Benchmark command
+    benchmark_parser = subparsers.add_parser("benchmark", help="Run data-size scaling benchmark")
+    benchmark_parser.add_argument(
+        "--models", type=str, nargs="+", help="Models to benchmark (default: all)"
+    )
+    benchmark_parser.add_argument(
+        "--sizes", type=int, nargs="+", help="Sample sizes (default: 10k to 1M)"
+    )
+    benchmark_parser.add_argument(
+        "--data", type=str, help="Resample this CSV instead of using synthetic data"
+    )
+    benchmark_parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="Also measure allocation peaks (one extra fit per model, untimed)"
+    )
+    benchmark_parser.add_argument("--output", type=str, help="Output JSON report path")
+    benchmark_parser.add_argument("--plot", type=str, help="Output path for scaling plots")
+    
     # API command
     api_parser = subparsers.add_parser("api", help="Start API server")
     api_parser.add_argument("--host", type=str, default="0.0.0.0", help="Host address")
@@ -46,9 +71,58 @@ def main():
         print("For detailed training, please use the Python API or Jupyter notebook.")
     
     elif args.command == "predict":
+        import pandas as pd
+        from spotify_analysis.models.registry import get_registry
+        
         print(f"Loading model from {args.model}...")
+        try:
+            trainer = get_registry().resolve(args.model)
+        except KeyError as e:
+            print(f"Error: {e}")
+            return 1
+        
         print(f"Making predictions on {args.data}...")
-        print("For detailed predictions, please use the Python API or REST API.")
+        df = pd.read_csv(args.data)
+        df['predicted_popularity'] = trainer.predict(trainer.transform(df))
+        
+        if args.output:
+            df.to_csv(args.output, index=False)
+            print(f"Predictions saved to {args.output}")
+        else:
+            print(df['predicted_popularity'].describe().to_string())
+    
+    elif args.command == "models":
+        from spotify_analysis.models.registry import get_registry
+        
+        entries = get_registry().list_models(args.name)
+        if not entries:
+            print("No registered models found.")
+        for entry in entries:
+            r2 = entry.get('metrics', {}).get('test_r2')
+            r2_text = f"  test_r2={r2:.4f}" if r2 is not None else ""
+            print(f"{entry['name']}:{entry['version']}  {entry.get('model_type', '-')}{r2_text}")
+    
+    elif args.command == "benchmark":
+        from spotify_analysis import benchmarks
+        
+        data = None
+        if args.data:
+            from spotify_analysis.data import DataLoader, clean_data
+            data = clean_data(DataLoader(args.data).load_data())
+        
+        report = benchmarks.run_scaling_benchmark(
+            args.models, args.sizes, data=data, trace_memory=args.trace_memory
+        )
+        output = benchmarks.save_report(report, args.output)
+        print(f"Benchmark report saved to {output}")
+        print(benchmarks.results_frame(report)[
+            ['model', 'n_samples', 'fit_time_s', 'predict_rows_per_s', 'fit_peak_mb', 'test_r2']
+        ].to_string(index=False))
+        
+        if args.plot:
+            from spotify_analysis.visualization import plot_scaling_benchmark
+            plot_scaling_benchmark(benchmarks.results_frame(report), save_path=args.plot)
+            print(f"Scaling plots saved to {args.plot}")
     
     elif args.command == "api":
         print(f"Starting API server on {args.host}:{args.port}...")
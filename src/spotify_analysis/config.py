@@ -10,9 +10,10 @@ DATA_DIR = PROJECT_ROOT / "data"
 MODELS_DIR = PROJECT_ROOT / "models"
 NOTEBOOKS_DIR = PROJECT_ROOT / "notebooks"
 LOGS_DIR = PROJECT_ROOT / "logs"
+CACHE_DIR = MODELS_DIR / "cache"
 
 # Create directories if they don't exist
-for directory in [DATA_DIR, MODELS_DIR, LOGS_DIR]:
+for directory in [DATA_DIR, MODELS_DIR, LOGS_DIR, CACHE_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
 # Random seed for reproducibility
@@ -40,6 +41,12 @@ CATEGORICAL_FEATURES: List[str] = [
 
 TARGET_VARIABLE = 'track_popularity'
 
+# Popularity categories (Baixa < 40 <= Média < 70 <= Alta)
+POPULARITY_CATEGORIES: Dict[str, Any] = {
+    'edges': [40, 70],
+    'labels': ['Baixa', 'Média', 'Alta']
+}
+
 # Model configurations
 MODEL_CONFIGS: Dict[str, Dict[str, Any]] = {
     'ridge': {
@@ -73,9 +80,83 @@ MODEL_CONFIGS: Dict[str, Dict[str, Any]] = {
         'max_depth': 5,
         'random_state': RANDOM_STATE,
         'n_jobs': -1
+    },
+    'hist_gradient_boosting': {
+        'max_iter': 100,
+        'learning_rate': 0.1,
+        'max_leaf_nodes': 31,
+        'early_stopping': False,
+        'random_state': RANDOM_STATE
     }
 }
 
+# Categorical encoding per model ('onehot' unless the model handles
+# ordinal-coded categories natively)
+CATEGORICAL_ENCODING: Dict[str, str] = {
+    'hist_gradient_boosting': 'ordinal'
+}
+
+# Popularity category classifier (histogram gradient boosting)
+CLASSIFIER_CONFIG = {
+    'max_iter': 200,
+    'learning_rate': 0.1,
+    'max_leaf_nodes': 31,
+    'early_stopping': False,
+    'random_state': RANDOM_STATE
+}
+
+# Permutation importance configuration
+IMPORTANCE_CONFIG = {
+    'n_repeats': 5,
+    'max_samples': 10000,
+    'n_jobs': -1,
+    'random_state': RANDOM_STATE
+}
+
+# Bootstrap confidence intervals for model comparison metrics
+BOOTSTRAP_CONFIG = {
+    'n_boot': 1000,
+    'confidence': 0.95,
+    'max_elements': 5_000_000,
+    'parallel_threshold': 50_000,
+    'n_jobs': -1,
+    'random_state': RANDOM_STATE
+}
+
+# Feature selection (max allowed drop in validation R²)
+FEATURE_SELECTION_CONFIG = {
+    'model_name': 'xgboost',
+    'method': 'importance',
+    'tolerance': 0.005,
+    'min_features': 1
+}
+
+# Model registry configuration
+REGISTRY_CONFIG = {
+    'max_memory_mb': 1024,
+    'default_model': 'xgboost'
+}
+
+# Out-of-core (external memory) training configuration
+EXTERNAL_MEMORY_CONFIG = {
+    'chunksize': 100000,
+    'cache_dir': CACHE_DIR / "xgb_external"
+}
+
+# Training time budgets (seconds; None means unlimited) and checkpointing
+# - checkpoint: opt-in; when True, iterative fits (boosting, random forests)
+#   write their partial state to checkpoint_dir every checkpoint_interval_s
+#   and a later fit on the same estimator and data resumes from it
+TRAINING_CONFIG = {
+    'time_budget_s': None,
+    'total_time_budget_s': None,
+    'forest_step': 10,
+    'cancel_grace_s': 5.0,
+    'checkpoint': False,
+    'checkpoint_interval_s': 60.0,
+    'checkpoint_dir': MODELS_DIR / "checkpoints"
+}
+
 # Train-test split configuration
 TRAIN_TEST_SPLIT_CONFIG = {
     'test_size': 0.2,
@@ -109,10 +190,40 @@ PLOT_CONFIG = {
 }
 
 # API configuration
+# - warmup_rows: rows scored at startup before the worker reports readiness
+# - allow_demo_model: serve the demo model when nothing is registered
+# - max_batch_size: tracks per /predict/batch request
+# - max_batch_bytes: /predict/batch body size; larger bodies get 413 before
+#   they are read
+# - stream_chunk_rows: rows parsed and scored at a time by /predict/stream
+# - micro_batching: score concurrent /predict calls together once
+#   batch_max_size requests are queued or batch_max_wait_ms has elapsed
+# - inference_workers / inference_queue_depth: inference threads and jobs
+#   allowed to wait for them; further requests are rejected with 503
+# - cache_*: per-worker LRU/TTL prediction cache (0 entries disables it),
+#   optionally shared between workers through the SQLite file cache_store,
+#   e.g. str(CACHE_DIR / 'predictions.sqlite')
+# - fast_json: encode /predict and /predict/batch JSON responses with orjson,
+#   skipping response-model re-validation (requires orjson)
 API_CONFIG = {
     'host': '0.0.0.0',
     'port': 8000,
-    'reload': True
+    'reload': True,
+    'warmup_rows': 64,
+    'allow_demo_model': True,
+    'max_batch_size': 50_000,
+    'max_batch_bytes': 64 * 1024 * 1024,
+    'stream_chunk_rows': 10_000,
+    'micro_batching': True,
+    'batch_max_size': 64,
+    'batch_max_wait_ms': 2.0,
+    'inference_workers': 2,
+    'inference_queue_depth': 16,
+    'cache_max_entries': 100_000,
+    'cache_ttl_s': 3600.0,
+    'cache_store': None,
+    'cache_decimals': 4,
+    'fast_json': False
 }
 
 # Streamlit configuration
@@ -132,11 +243,21 @@ class Config:
         self.models_dir = MODELS_DIR
         self.notebooks_dir = NOTEBOOKS_DIR
         self.logs_dir = LOGS_DIR
+        self.cache_dir = CACHE_DIR
         self.random_state = RANDOM_STATE
         self.numerical_features = NUMERICAL_FEATURES
         self.categorical_features = CATEGORICAL_FEATURES
         self.target_variable = TARGET_VARIABLE
+        self.popularity_categories = POPULARITY_CATEGORIES
         self.model_configs = MODEL_CONFIGS
+        self.categorical_encoding = CATEGORICAL_ENCODING
+        self.classifier_config = CLASSIFIER_CONFIG
+        self.importance_config = IMPORTANCE_CONFIG
+        self.bootstrap_config = BOOTSTRAP_CONFIG
+        self.feature_selection_config = FEATURE_SELECTION_CONFIG
+        self.registry_config = REGISTRY_CONFIG
+        self.external_memory_config = EXTERNAL_MEMORY_CONFIG
+        self.training_config = TRAINING_CONFIG
         self.train_test_split_config = TRAIN_TEST_SPLIT_CONFIG
         self.cv_config = CV_CONFIG
         self.clustering_config = CLUSTERING_CONFIG
@@ -147,6 +268,10 @@ class Config:
     def get_model_config(self, model_name: str) -> Dict[str, Any]:
         """Get configuration for a specific model."""
         return self.model_configs.get(model_name, {})
+    
+    def get_categorical_encoding(self, model_name: str) -> str:
+        """Get the categorical encoding ('onehot' or 'ordinal') for a model."""
+        return self.categorical_encoding.get(model_name, 'onehot')
 
 
 # Global config instance
@@ -2,16 +2,17 @@
 
 import logging
 from pathlib import Path
-from typing import Tuple, Optional, Union
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
 from spotify_analysis.config import config
+from spotify_analysis.utils.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +20,34 @@ logger = logging.getLogger(__name__)
 class DataLoader:
     """Handle data loading operations."""
     
-    def __init__(self, data_path: Optional[Union[str, Path]] = None):
+    def __init__(self, data_path: Optional[Union[str, Path, Sequence[Union[str, Path]]]] = None):
         """Initialize DataLoader.
         
         Args:
-            data_path: Path to the data file. If None, uses default path.
+            data_path: Path to the data file, or a list of CSV files with the
+                same columns. If None, uses default path.
         """
         self.data_path = data_path or config.data_dir / "spotify_songs.csv"
         self.df: Optional[pd.DataFrame] = None
     
+    @property
+    def data_paths(self) -> List[Path]:
+        """List of source files."""
+        if isinstance(self.data_path, (str, Path)):
+            return [Path(self.data_path)]
+        return [Path(path) for path in self.data_path]
+    
+    def _check_paths(self):
+        """Raise FileNotFoundError if any source file is missing."""
+        for path in self.data_paths:
+            if not path.exists():
+                logger.error(f"Data file not found: {path}")
+                raise FileNotFoundError(
+                    f"Data file not found: {path}. "
+                    "Please download the dataset from Kaggle."
+                )
+    
+    @instrument('DataLoader.load_data')
     def load_data(self) -> pd.DataFrame:
         """Load Spotify dataset from CSV.
         
@@ -37,18 +57,70 @@ class DataLoader:
         Raises:
             FileNotFoundError: If data file doesn't exist.
         """
-        if not Path(self.data_path).exists():
-            logger.error(f"Data file not found: {self.data_path}")
-            raise FileNotFoundError(
-                f"Data file not found: {self.data_path}. "
-                "Please download the dataset from Kaggle."
-            )
+        self._check_paths()
         
         logger.info(f"Loading data from {self.data_path}")
-        self.df = pd.read_csv(self.data_path)
+        frames = [pd.read_csv(path) for path in self.data_paths]
+        self.df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
         logger.info(f"Loaded {len(self.df)} records")
         return self.df
     
+    def iter_chunks(
+        self,
+        chunksize: Optional[int] = None,
+        usecols: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Read the source files in chunks without loading them fully.
+        
+        Args:
+            chunksize: Rows per chunk. If None, uses
+                ``config.external_memory_config['chunksize']``.
+            usecols: Columns to read. If None, reads all columns.
+            
+        Yields:
+            DataFrames with at most ``chunksize`` rows.
+        """
+        self._check_paths()
+        chunksize = chunksize or config.external_memory_config['chunksize']
+        for path in self.data_paths:
+            with pd.read_csv(path, chunksize=chunksize, usecols=usecols) as reader:
+                for chunk in reader:
+                    yield chunk
+    
+    def sample(
+        self,
+        n_rows: int,
+        chunksize: Optional[int] = None,
+        random_state: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Draw a uniform random sample of rows in a single chunked pass.
+        
+        Uses reservoir sampling with random keys, so memory is bounded by
+        ``n_rows + chunksize`` regardless of the size of the source files.
+        Useful for fitting a ``DataPreprocessor`` on data larger than RAM.
+        
+        Args:
+            n_rows: Number of rows to sample.
+            chunksize: Rows per chunk read.
+            random_state: Random seed for reproducibility.
+            
+        Returns:
+            DataFrame with at most ``n_rows`` rows.
+        """
+        rng = np.random.default_rng(
+            random_state if random_state is not None else config.random_state
+        )
+        reservoir: Optional[pd.DataFrame] = None
+        for chunk in self.iter_chunks(chunksize):
+            chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+            if reservoir is not None:
+                chunk = pd.concat([reservoir, chunk], ignore_index=True)
+            reservoir = chunk.nsmallest(n_rows, '_sample_key')
+        
+        if reservoir is None:
+            raise ValueError("No data to sample.")
+        return reservoir.drop(columns='_sample_key').reset_index(drop=True)
+    
     def get_basic_info(self) -> dict:
         """Get basic information about the dataset.
         
@@ -71,15 +143,34 @@ class DataLoader:
 class DataPreprocessor:
     """Handle data preprocessing and feature engineering."""
     
-    def __init__(self, numerical_features=None, categorical_features=None):
+    def __init__(
+        self,
+        numerical_features=None,
+        categorical_features=None,
+        categorical_encoding: str = 'onehot'
+    ):
         """Initialize DataPreprocessor.
         
         Args:
             numerical_features: List of numerical feature names.
             categorical_features: List of categorical feature names.
+            categorical_encoding: 'onehot' for one-hot columns, or 'ordinal' to
+                keep one integer-coded column per categorical feature for
+                models with native categorical support. Unknown categories
+                are coded as -1, which such models treat as missing.
         """
-        self.numerical_features = numerical_features or config.numerical_features
-        self.categorical_features = categorical_features or config.categorical_features
+        if categorical_encoding not in ('onehot', 'ordinal'):
+            raise ValueError(
+                f"Unknown categorical encoding: {categorical_encoding}. "
+                "Choose from ['onehot', 'ordinal']"
+            )
+        self.numerical_features = (
+            numerical_features if numerical_features is not None else config.numerical_features
+        )
+        if categorical_features is None:
+            categorical_features = config.categorical_features
+        self.categorical_features = categorical_features
+        self.categorical_encoding = categorical_encoding
         self.preprocessor: Optional[ColumnTransformer] = None
         self.feature_names_: Optional[list] = None
     
@@ -93,9 +184,16 @@ class DataPreprocessor:
             ('scaler', StandardScaler())
         ])
         
-        categorical_transformer = Pipeline(steps=[
-            ('onehot', OneHotEncoder(drop='first', sparse_output=False, handle_unknown='ignore'))
-        ])
+        if self.categorical_encoding == 'ordinal':
+            categorical_transformer = Pipeline(steps=[
+                ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1))
+            ])
+        else:
+            categorical_transformer = Pipeline(steps=[
+                ('onehot', OneHotEncoder(
+                    drop='first', sparse_output=False, handle_unknown='ignore'
+                ))
+            ])
         
         self.preprocessor = ColumnTransformer(
             transformers=[
@@ -106,6 +204,7 @@ class DataPreprocessor:
         
         return self.preprocessor
     
+    @instrument('DataPreprocessor.fit_transform')
     def fit_transform(self, X: pd.DataFrame) -> np.ndarray:
         """Fit preprocessor and transform data.
         
@@ -143,8 +242,12 @@ class DataPreprocessor:
         # Numerical features
         feature_names.extend(self.numerical_features)
         
+        # Categorical features (one column each when ordinal encoded)
+        if self.categorical_encoding == 'ordinal':
+            feature_names.extend(self.categorical_features)
+        
         # Categorical features (one-hot encoded)
-        if 'cat' in self.preprocessor.named_transformers_:
+        elif self.categorical_features and 'cat' in self.preprocessor.named_transformers_:
             cat_transformer = self.preprocessor.named_transformers_['cat']
             onehot = cat_transformer.named_steps['onehot']
             for i, cat_feature in enumerate(self.categorical_features):
@@ -162,8 +265,21 @@ class DataPreprocessor:
         if self.feature_names_ is None:
             raise ValueError("Feature names not available. Fit preprocessor first.")
         return self.feature_names_
+    
+    def get_categorical_mask(self) -> List[bool]:
+        """Get a boolean mask of the ordinal-encoded categorical columns.
+        
+        Returns:
+            One flag per transformed column, True for categorical columns.
+        """
+        feature_names = self.get_feature_names()
+        if self.categorical_encoding != 'ordinal':
+            return [False] * len(feature_names)
+        categorical = set(self.categorical_features)
+        return [name in categorical for name in feature_names]
 
 
+@instrument('split_data')
 def split_data(
     df: pd.DataFrame,
     target_col: str = None,
@@ -199,6 +315,7 @@ def split_data(
     return X_train, X_test, y_train, y_test
 
 
+@instrument('clean_data')
 def clean_data(df: pd.DataFrame, drop_na: bool = True) -> pd.DataFrame:
     """Clean the dataset.
     
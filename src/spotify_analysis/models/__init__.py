@@ -1,19 +1,34 @@
 """Machine learning models for Spotify popularity prediction."""
 
 import logging
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Iterable, Optional, Sequence, Tuple, List
 import joblib
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import sklearn
+import xgboost
 from sklearn.linear_model import Ridge, Lasso, ElasticNet
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.ensemble import (
+    RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+)
 from sklearn.model_selection import cross_val_score
 from xgboost import XGBRegressor
 
 from spotify_analysis.config import config
+from spotify_analysis.data import DataPreprocessor
+from spotify_analysis.models.external import train_xgboost_external
+from spotify_analysis.models.importance import permutation_importance
+from spotify_analysis.models.metrics import (
+    StreamingRegressionMetrics, bootstrap_confidence_intervals, iter_batches
+)
+from spotify_analysis.models.training import (
+    Checkpointer, Deadline, fit_with_budget, fitted_iterations, is_iterative, iterative_fit
+)
+from spotify_analysis.models.validation import run_nested_cv, run_repeated_cv
+from spotify_analysis.utils.fingerprint import fingerprint_data, fingerprint_model
+from spotify_analysis.utils.instrumentation import instrument
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +45,13 @@ class ModelTrainer:
         self.model_name = model_name
         self.model = self._create_model(model_name)
         self.is_fitted = False
+        self.timed_out = False
+        self.resumed_from: Optional[int] = None
         self.metrics: Dict[str, float] = {}
+        self.preprocessor = None
+        self.feature_names: Optional[List[str]] = None
+        self.selected_features: Optional[List[str]] = None
+        self._model_key: Optional[str] = None
     
     def _create_model(self, model_name: str):
         """Create a model instance.
@@ -49,7 +70,8 @@ class ModelTrainer:
             'elasticnet': ElasticNet,
             'random_forest': RandomForestRegressor,
             'gradient_boosting': GradientBoostingRegressor,
-            'xgboost': XGBRegressor
+            'xgboost': XGBRegressor,
+            'hist_gradient_boosting': HistGradientBoostingRegressor
         }
         
         if model_name not in models:
@@ -57,22 +79,215 @@ class ModelTrainer:
         
         return models[model_name](**model_config)
     
-    def fit(self, X: np.ndarray, y: np.ndarray) -> 'ModelTrainer':
+    @instrument('ModelTrainer.fit[{self.model_name}]')
+    def fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        time_budget: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        checkpoint: Optional[bool] = None,
+        categorical_features: Optional[Sequence[bool]] = None
+    ) -> 'ModelTrainer':
         """Fit the model.
         
+        With a time budget, the fit runs in a worker thread. Boosting models
+        and random forests are stopped at the budget and keep the rounds or
+        trees fitted so far (``timed_out`` is then True).
+        
+        With checkpointing (off by default), boosting models and random
+        forests periodically save their partial state under
+        ``config.training_config['checkpoint_dir']``, keyed by the estimator
+        parameters, library versions and training data. A later fit on
+        the same inputs resumes from the last checkpoint (``resumed_from`` is
+        then the number of iterations restored).
+        
         Args:
             X: Training features.
             y: Training target.
+            time_budget: Wall-clock budget in seconds. If None, uses
+                ``config.training_config['time_budget_s']``.
+            deadline: Enclosing deadline (e.g. a global budget) that also applies.
+            checkpoint: Whether to checkpoint and resume. If None, uses
+                ``config.training_config['checkpoint']``.
+            categorical_features: Boolean mask of ordinal-encoded categorical
+                columns in ``X``, used by models with native categorical
+                support and ignored by the others.
             
         Returns:
             Self for method chaining.
+            
+        Raises:
+            TimeoutError: If the budget ran out before a usable model existed.
         """
+        if time_budget is None:
+            time_budget = config.training_config['time_budget_s']
+        if checkpoint is None:
+            checkpoint = config.training_config['checkpoint']
+        if categorical_features is not None and self.native_categorical:
+            mask = list(categorical_features)
+            self.model.set_params(categorical_features=mask if any(mask) else None)
+        
+        checkpointer = None
+        if checkpoint and is_iterative(self.model):
+            checkpointer = Checkpointer.for_fit(self.model_name, self.model, X, y)
+        
         logger.info(f"Training {self.model_name} model...")
-        self.model.fit(X, y)
+        self.timed_out = False
+        self._model_key = None
+        if time_budget is None and deadline is None:
+            if checkpointer is None:
+                self.model.fit(X, y)
+            else:
+                iterative_fit(self.model, X, y, lambda n_done: False, checkpointer=checkpointer)
+        else:
+            try:
+                _, self.timed_out = fit_with_budget(
+                    self.model, X, y, Deadline(time_budget, parent=deadline),
+                    checkpointer=checkpointer
+                )
+            except TimeoutError:
+                # The abandoned worker may still write to the old instance
+                self.model = self._create_model(self.model_name)
+                self.is_fitted = False
+                raise
+        
+        self.resumed_from = checkpointer.resumed_from if checkpointer is not None else None
+        self.is_fitted = True
+        if self.timed_out:
+            logger.warning(
+                f"{self.model_name} model timed out; kept partial model with "
+                f"{fitted_iterations(self.model)} iterations"
+            )
+        else:
+            logger.info(f"{self.model_name} model trained successfully")
+        return self
+    
+    @property
+    def native_categorical(self) -> bool:
+        """Whether the model is configured for ordinal-coded categorical features."""
+        return config.get_categorical_encoding(self.model_name) == 'ordinal'
+    
+    def create_preprocessor(self, features: Optional[Sequence[str]] = None) -> DataPreprocessor:
+        """Create a DataPreprocessor with the encoding this model expects.
+        
+        Args:
+            features: Raw features to keep. If None, uses all configured features.
+        
+        Returns:
+            Unfitted DataPreprocessor; categorical features are one-hot encoded
+            unless the model handles them natively.
+        """
+        numerical, categorical = config.numerical_features, config.categorical_features
+        if features is not None:
+            numerical = [f for f in numerical if f in features]
+            categorical = [f for f in categorical if f in features]
+        return DataPreprocessor(
+            numerical_features=numerical,
+            categorical_features=categorical,
+            categorical_encoding=config.get_categorical_encoding(self.model_name)
+        )
+    
+    def fit_frame(
+        self,
+        X: pd.DataFrame,
+        y: np.ndarray,
+        features: Optional[Sequence[str]] = None,
+        **kwargs
+    ) -> 'ModelTrainer':
+        """Fit a model-specific preprocessor and the model on raw features.
+        
+        Models with native categorical support skip one-hot encoding and
+        receive the categorical mask. The fitted preprocessor is kept, so
+        ``transform`` and saved bundles work on raw features.
+        
+        Args:
+            X: Raw features DataFrame.
+            y: Training target.
+            features: Raw features to train on (e.g. from a FeatureSelector).
+                If None, uses all configured features.
+            **kwargs: Extra arguments for ``fit``.
+            
+        Returns:
+            Self for method chaining.
+        """
+        preprocessor = self.create_preprocessor(features)
+        X_transformed = preprocessor.fit_transform(X)
+        self.preprocessor = preprocessor
+        self.feature_names = preprocessor.get_feature_names()
+        self.selected_features = list(features) if features is not None else None
+        return self.fit(
+            X_transformed, y,
+            categorical_features=preprocessor.get_categorical_mask(), **kwargs
+        )
+    
+    @property
+    def model_key(self) -> Optional[str]:
+        """Stable identity of the fitted model, or None if it is not fitted.
+        
+        Fingerprint of the fitted model's state and feature names, unchanged
+        when the model is saved and reloaded. Computed on first use (not
+        during ``fit``) and used to key the permutation importance cache.
+        """
+        if not self.is_fitted:
+            return None
+        if self._model_key is None:
+            self._model_key = fingerprint_model(self.model, self.feature_names)
+        return self._model_key
+    
+    @property
+    def input_features(self) -> Optional[List[str]]:
+        """Raw features the bundled preprocessor reads, if known."""
+        if self.preprocessor is None:
+            return self.selected_features
+        return (
+            list(self.preprocessor.numerical_features)
+            + list(self.preprocessor.categorical_features)
+        )
+    
+    @instrument('ModelTrainer.fit_external[{self.model_name}]')
+    def fit_external(
+        self,
+        loader,
+        preprocessor,
+        target_col: Optional[str] = None,
+        chunksize: Optional[int] = None,
+        cache_dir: Optional[Path] = None
+    ) -> 'ModelTrainer':
+        """Fit XGBoost out of core from chunked reads of the source files.
+        
+        The preprocessor must already be fitted (e.g. on ``loader.sample()``);
+        each chunk is transformed and streamed into an external-memory
+        DMatrix, so the full feature matrix is never materialised.
+        
+        Args:
+            loader: DataLoader over one or more source files.
+            preprocessor: Fitted DataPreprocessor.
+            target_col: Name of target column.
+            chunksize: Rows per chunk; bounds peak host memory.
+            cache_dir: Directory for XGBoost's on-disk cache pages.
+            
+        Returns:
+            Self for method chaining.
+        """
+        if self.model_name != 'xgboost':
+            raise ValueError(
+                f"Out-of-core training is only supported for xgboost, not {self.model_name}"
+            )
+        
+        logger.info(f"Training {self.model_name} model out of core...")
+        train_xgboost_external(
+            self.model, loader, preprocessor,
+            target_col=target_col, chunksize=chunksize, cache_dir=cache_dir
+        )
+        self.preprocessor = preprocessor
+        self.feature_names = preprocessor.feature_names_
+        self._model_key = None
         self.is_fitted = True
         logger.info(f"{self.model_name} model trained successfully")
         return self
     
+    @instrument('ModelTrainer.predict[{self.model_name}]')
     def predict(self, X: np.ndarray) -> np.ndarray:
         """Make predictions.
         
@@ -91,7 +306,10 @@ class ModelTrainer:
         self, 
         X: np.ndarray, 
         y: np.ndarray, 
-        dataset_name: str = 'test'
+        dataset_name: str = 'test',
+        batch_size: Optional[int] = None,
+        quantiles: Optional[Sequence[float]] = None,
+        by_category: bool = False
     ) -> Dict[str, float]:
         """Evaluate model performance.
         
@@ -99,18 +317,48 @@ class ModelTrainer:
             X: Features.
             y: True target values.
             dataset_name: Name of the dataset (for logging).
+            batch_size: Predict in batches of this many rows. If None,
+                predicts on the whole input at once.
+            quantiles: Absolute-error quantiles to report (e.g. ``[0.5, 0.9]``).
+            by_category: Whether to report errors per popularity category.
             
         Returns:
             Dictionary of metrics.
         """
-        y_pred = self.predict(X)
+        return self.evaluate_stream(
+            iter_batches(X, y, batch_size),
+            dataset_name=dataset_name,
+            quantiles=quantiles,
+            by_category=by_category
+        )
+    
+    @instrument('ModelTrainer.evaluate[{self.model_name}]')
+    def evaluate_stream(
+        self,
+        batches: Iterable[Tuple[Any, Any]],
+        dataset_name: str = 'test',
+        quantiles: Optional[Sequence[float]] = None,
+        by_category: bool = False
+    ) -> Dict[str, float]:
+        """Evaluate model performance over an iterable of ``(X, y)`` batches.
         
-        metrics = {
-            f'{dataset_name}_mae': mean_absolute_error(y, y_pred),
-            f'{dataset_name}_mse': mean_squared_error(y, y_pred),
-            f'{dataset_name}_rmse': np.sqrt(mean_squared_error(y, y_pred)),
-            f'{dataset_name}_r2': r2_score(y, y_pred)
-        }
+        Metrics are accumulated in a single pass, so memory use is bounded by
+        the batch size rather than the dataset size.
+        
+        Args:
+            batches: Iterable of ``(X_batch, y_batch)`` pairs.
+            dataset_name: Name of the dataset (for logging).
+            quantiles: Absolute-error quantiles to report.
+            by_category: Whether to report errors per popularity category.
+            
+        Returns:
+            Dictionary of metrics.
+        """
+        accumulator = self.create_metrics_accumulator(quantiles, by_category)
+        for X_batch, y_batch in batches:
+            accumulator.update(y_batch, self.predict(X_batch))
+        
+        metrics = accumulator.compute(prefix=dataset_name)
         
         self.metrics.update(metrics)
         
@@ -120,6 +368,30 @@ class ModelTrainer:
         
         return metrics
     
+    @staticmethod
+    def create_metrics_accumulator(
+        quantiles: Optional[Sequence[float]] = None,
+        by_category: bool = False
+    ) -> StreamingRegressionMetrics:
+        """Create an empty metrics accumulator.
+        
+        Accumulators filled on separate workers can be combined with
+        ``StreamingRegressionMetrics.merge``.
+        
+        Args:
+            quantiles: Absolute-error quantiles to report.
+            by_category: Whether to report errors per popularity category.
+            
+        Returns:
+            StreamingRegressionMetrics instance.
+        """
+        categories = config.popularity_categories
+        return StreamingRegressionMetrics(
+            quantiles=quantiles,
+            bucket_edges=categories['edges'] if by_category else None,
+            bucket_labels=categories['labels'] if by_category else None
+        )
+    
     def cross_validate(
         self, 
         X: np.ndarray, 
@@ -162,14 +434,110 @@ class ModelTrainer:
         
         return cv_results
     
+    def repeated_cross_validate(
+        self,
+        X: pd.DataFrame,
+        y: np.ndarray,
+        n_splits: Optional[int] = None,
+        n_repeats: int = 3,
+        n_jobs: int = -1,
+        use_cache: bool = True,
+        cache_dir: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """Perform repeated K-fold cross-validation on raw features.
+        
+        A preprocessor with this model's categorical encoding is fitted per
+        fold and cached with the transformed matrices, so other models and
+        later runs on the same folds skip preprocessing. Fits run on
+        parallel worker processes.
+        
+        Args:
+            X: Raw features DataFrame (or an already transformed matrix).
+            y: Target.
+            n_splits: Folds per repeat. If None, uses ``config.cv_config``.
+            n_repeats: Number of repeats with different shuffles.
+            n_jobs: Worker processes.
+            use_cache: Whether to cache fold preprocessing on disk.
+            cache_dir: Base cache directory. If None, uses ``config.cache_dir``.
+            
+        Returns:
+            Dictionary with CV results and per-fold scores.
+        """
+        logger.info(f"Performing repeated cross-validation for {self.model_name}...")
+        results = run_repeated_cv(
+            self.model, X, y, n_splits=n_splits, n_repeats=n_repeats,
+            categorical_encoding=config.get_categorical_encoding(self.model_name),
+            n_jobs=n_jobs, use_cache=use_cache, cache_dir=cache_dir
+        )
+        logger.info(
+            f"CV results for {self.model_name}: "
+            f"R² {results['cv_r2_mean']:.4f} ± {results['cv_r2_std']:.4f}"
+        )
+        return results
+    
+    def nested_cross_validate(
+        self,
+        X: pd.DataFrame,
+        y: np.ndarray,
+        param_grid: Dict[str, Sequence],
+        n_splits: Optional[int] = None,
+        inner_splits: int = 3,
+        n_repeats: int = 1,
+        scoring: str = 'r2',
+        n_jobs: int = -1,
+        use_cache: bool = True,
+        cache_dir: Optional[Path] = None
+    ) -> Dict[str, Any]:
+        """Perform nested cross-validation with an inner grid search.
+        
+        Args:
+            X: Raw features DataFrame (or an already transformed matrix).
+            y: Target.
+            param_grid: Parameter grid searched in the inner folds.
+            n_splits: Outer folds per repeat. If None, uses ``config.cv_config``.
+            inner_splits: Inner folds.
+            n_repeats: Number of outer repeats.
+            scoring: Metric used to select parameters.
+            n_jobs: Worker processes.
+            use_cache: Whether to cache fold preprocessing on disk.
+            cache_dir: Base cache directory. If None, uses ``config.cache_dir``.
+            
+        Returns:
+            Dictionary with outer CV results, selected parameters per outer
+            fold and per-fold scores.
+        """
+        logger.info(f"Performing nested cross-validation for {self.model_name}...")
+        results = run_nested_cv(
+            self.model, X, y, param_grid, n_splits=n_splits, inner_splits=inner_splits,
+            n_repeats=n_repeats, scoring=scoring,
+            categorical_encoding=config.get_categorical_encoding(self.model_name),
+            n_jobs=n_jobs, use_cache=use_cache, cache_dir=cache_dir
+        )
+        logger.info(
+            f"Nested CV results for {self.model_name}: "
+            f"R² {results['cv_r2_mean']:.4f} ± {results['cv_r2_std']:.4f}"
+        )
+        return results
+    
     def get_feature_importance(
         self, 
-        feature_names: Optional[List[str]] = None
+        feature_names: Optional[List[str]] = None,
+        X: Optional[np.ndarray] = None,
+        y: Optional[np.ndarray] = None,
+        method: str = 'auto',
+        **kwargs
     ) -> Optional[pd.DataFrame]:
         """Get feature importance if available.
         
         Args:
             feature_names: List of feature names.
+            X: Features used for permutation importance.
+            y: Target used for permutation importance.
+            method: ``'impurity'`` for the model's built-in importances,
+                ``'permutation'`` for permutation importance on ``(X, y)``,
+                or ``'auto'`` to use permutation importance when data is given.
+            **kwargs: Extra arguments for ``permutation_importance``
+                (``n_repeats``, ``max_samples``, ``n_jobs``, ``use_cache``...).
             
         Returns:
             DataFrame with feature importance or None if not available.
@@ -177,9 +545,21 @@ class ModelTrainer:
         if not self.is_fitted:
             raise ValueError("Model not fitted. Call fit() first.")
         
+        if method not in ('auto', 'impurity', 'permutation'):
+            raise ValueError(f"Unknown importance method: {method}")
+        
+        if method == 'permutation' or (method == 'auto' and X is not None):
+            if X is None or y is None:
+                raise ValueError("Permutation importance requires X and y.")
+            kwargs.setdefault('model_key', self.model_key)
+            return permutation_importance(self.model, X, y, feature_names=feature_names, **kwargs)
+        
         # Check if model has feature_importances_ attribute
         if not hasattr(self.model, 'feature_importances_'):
-            logger.warning(f"{self.model_name} doesn't support feature importance")
+            logger.warning(
+                f"{self.model_name} doesn't support impurity-based feature importance; "
+                "pass X and y for permutation importance"
+            )
             return None
         
         importance = self.model.feature_importances_
@@ -212,20 +592,75 @@ class ModelTrainer:
         joblib.dump(self.model, filepath)
         logger.info(f"Model saved to {filepath}")
     
+    def to_bundle(self) -> Dict[str, Any]:
+        """Package the fitted model with its preprocessing state.
+        
+        Returns:
+            Dictionary with the model, preprocessor, feature names, selected
+            raw features and metrics.
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted. Nothing to bundle.")
+        
+        return {
+            'model_name': self.model_name,
+            'model': self.model,
+            'preprocessor': self.preprocessor,
+            'feature_names': self.feature_names,
+            'selected_features': self.selected_features,
+            'metrics': dict(self.metrics)
+        }
+    
+    @classmethod
+    def from_bundle(cls, bundle: Dict[str, Any]) -> 'ModelTrainer':
+        """Rebuild a trainer from a bundle created by ``to_bundle``.
+        
+        Args:
+            bundle: Model bundle dictionary.
+            
+        Returns:
+            ModelTrainer instance with the bundled model.
+        """
+        trainer = cls(bundle['model_name'])
+        trainer.model = bundle['model']
+        trainer.preprocessor = bundle.get('preprocessor')
+        trainer.feature_names = bundle.get('feature_names')
+        trainer.selected_features = bundle.get('selected_features')
+        trainer.metrics = dict(bundle.get('metrics') or {})
+        trainer.is_fitted = True
+        return trainer
+    
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        """Apply the bundled preprocessor, if any, to raw features.
+        
+        Args:
+            X: Raw features DataFrame.
+            
+        Returns:
+            Model input matrix.
+        """
+        if self.preprocessor is None:
+            return X
+        return self.preprocessor.transform(X)
+    
     @classmethod
     def load(cls, filepath: Path, model_name: str = 'xgboost') -> 'ModelTrainer':
         """Load a trained model.
         
         Args:
-            filepath: Path to the saved model.
-            model_name: Name of the model.
+            filepath: Path to the saved model or model bundle.
+            model_name: Name of the model (ignored for bundles).
             
         Returns:
             ModelTrainer instance with loaded model.
         """
-        trainer = cls(model_name)
-        trainer.model = joblib.load(filepath)
-        trainer.is_fitted = True
+        obj = joblib.load(filepath)
+        if isinstance(obj, dict) and 'model' in obj:
+            trainer = cls.from_bundle(obj)
+        else:
+            trainer = cls(model_name)
+            trainer.model = obj
+            trainer.is_fitted = True
         logger.info(f"Model loaded from {filepath}")
         return trainer
 
@@ -233,38 +668,162 @@ class ModelTrainer:
 class ModelComparison:
     """Compare multiple models."""
     
-    def __init__(self, model_names: Optional[List[str]] = None):
+    def __init__(self, model_names: Optional[List[str]] = None, registry=None):
         """Initialize ModelComparison.
         
         Args:
             model_names: List of model names to compare.
+            registry: ModelRegistry used to reuse and store fitted models when
+                training with ``skip_unchanged=True``. If None, uses the
+                default registry over ``config.models_dir``.
         """
         self.model_names = model_names or list(config.model_configs.keys())
         self.trainers: Dict[str, ModelTrainer] = {}
         self.results: Dict[str, Dict[str, float]] = {}
+        self.registry = registry
+        self.reused: List[str] = []
+        self.timed_out: List[str] = []
+        self.test_predictions: Dict[str, np.ndarray] = {}
+        self.y_test: Optional[np.ndarray] = None
     
+    @staticmethod
+    def data_fingerprint(
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_test: np.ndarray,
+        y_test: np.ndarray
+    ) -> str:
+        """Fingerprint of the train/test data and the feature configuration.
+        
+        Returns:
+            Hex digest.
+        """
+        feature_config = {
+            'numerical': config.numerical_features,
+            'categorical': config.categorical_features,
+            'target': config.target_variable
+        }
+        return fingerprint_data(X_train, y_train, X_test, y_test, feature_config)
+    
+    @staticmethod
+    def config_fingerprint(model_name: str) -> str:
+        """Fingerprint of a model's configuration and the library versions.
+        
+        Args:
+            model_name: Name of the model.
+            
+        Returns:
+            Hex digest.
+        """
+        return fingerprint_data({
+            'model': model_name,
+            'params': config.get_model_config(model_name),
+            'sklearn': sklearn.__version__,
+            'xgboost': xgboost.__version__
+        })
+    
+    @staticmethod
+    def registry_name(model_name: str) -> str:
+        """Registry name under which comparison runs of a model are stored.
+        
+        Comparison models are fitted on preprocessed arrays and bundled
+        without a preprocessor, so they are kept apart from the servable
+        versions registered under the plain model name.
+        
+        Args:
+            model_name: Name of the model.
+            
+        Returns:
+            Registry name.
+        """
+        return f"comparison-{model_name}"
+    
+    def _find_unchanged(self, model_name: str, data_fp: str) -> Optional[ModelTrainer]:
+        """Load a registered model with identical data and config fingerprints."""
+        name = self.registry_name(model_name)
+        config_fp = self.config_fingerprint(model_name)
+        for entry in reversed(self.registry.find(data_fp, name=name)):
+            if entry.get('config_fingerprint') == config_fp and entry.get('metrics'):
+                logger.info(
+                    f"{model_name} unchanged since v{entry['version']}; loading instead of training"
+                )
+                return self.registry.load(name, entry['version'])
+        return None
+    
+    @instrument('ModelComparison.train_all')
     def train_all(
         self, 
         X_train: np.ndarray, 
         y_train: np.ndarray,
         X_test: np.ndarray,
-        y_test: np.ndarray
+        y_test: np.ndarray,
+        skip_unchanged: bool = False,
+        time_budget: Optional[float] = None,
+        total_time_budget: Optional[float] = None
     ):
         """Train all models and evaluate them.
         
+        Models that exceed their budget are listed in ``timed_out``. Boosting
+        models and forests stopped early are still evaluated on their partial
+        state; models without usable state, or not started before the total
+        budget ran out, have no results.
+        
         Args:
             X_train: Training features.
             y_train: Training target.
             X_test: Test features.
             y_test: Test target.
+            skip_unchanged: Reuse models from the registry whose training data,
+                feature configuration and model configuration are unchanged,
+                and register newly trained models for future runs (under
+                ``registry_name(model_name)``, apart from servable models).
+            time_budget: Wall-clock budget per model in seconds. If None, uses
+                ``config.training_config['time_budget_s']``.
+            total_time_budget: Wall-clock budget for the whole comparison. If
+                None, uses ``config.training_config['total_time_budget_s']``.
         """
+        if total_time_budget is None:
+            total_time_budget = config.training_config['total_time_budget_s']
+        deadline = Deadline(total_time_budget) if total_time_budget is not None else None
+        
+        data_fp = None
+        if skip_unchanged:
+            if self.registry is None:
+                from spotify_analysis.models.registry import get_registry
+                self.registry = get_registry()
+            data_fp = self.data_fingerprint(X_train, y_train, X_test, y_test)
+        self.reused = []
+        self.timed_out = []
+        self.y_test = np.asarray(y_test)
+        
         for model_name in self.model_names:
             logger.info(f"\n{'='*60}")
             logger.info(f"Training {model_name.upper()}")
             logger.info(f"{'='*60}")
             
+            if skip_unchanged:
+                trainer = self._find_unchanged(model_name, data_fp)
+                if trainer is not None:
+                    self.trainers[model_name] = trainer
+                    self.results[model_name] = dict(trainer.metrics)
+                    self.test_predictions[model_name] = trainer.predict(X_test)
+                    self.reused.append(model_name)
+                    continue
+            
+            if deadline is not None and deadline.expired:
+                logger.warning(f"Total time budget exhausted; skipping {model_name}")
+                self.timed_out.append(model_name)
+                continue
+            
             trainer = ModelTrainer(model_name)
-            trainer.fit(X_train, y_train)
+            try:
+                trainer.fit(X_train, y_train, time_budget=time_budget, deadline=deadline)
+            except TimeoutError as e:
+                logger.warning(f"{model_name} timed out without a usable model: {e}")
+                self.timed_out.append(model_name)
+                continue
+            if trainer.timed_out:
+                self.timed_out.append(model_name)
             
             # Evaluate on both train and test
             train_metrics = trainer.evaluate(X_train, y_train, 'train')
@@ -272,10 +831,32 @@ class ModelComparison:
             
             self.trainers[model_name] = trainer
             self.results[model_name] = {**train_metrics, **test_metrics}
+            self.test_predictions[model_name] = trainer.predict(X_test)
+            
+            # Partial models must not be reused as if they were complete
+            if skip_unchanged and not trainer.timed_out:
+                self.registry.register(
+                    trainer,
+                    name=self.registry_name(model_name),
+                    data_fingerprint=data_fp,
+                    extra={'config_fingerprint': self.config_fingerprint(model_name)}
+                )
     
-    def get_comparison_df(self) -> pd.DataFrame:
+    def get_comparison_df(
+        self,
+        confidence_intervals: bool = False,
+        **bootstrap_kwargs
+    ) -> pd.DataFrame:
         """Get comparison results as DataFrame.
         
+        Args:
+            confidence_intervals: Add bootstrap confidence intervals
+                (``test_<metric>_ci_low``/``_ci_high``) for the test MAE, MSE,
+                RMSE and R², computed from the stored test predictions without
+                refitting any model.
+            **bootstrap_kwargs: Extra arguments for
+                ``bootstrap_confidence_intervals`` (``n_boot``, ``confidence``...).
+            
         Returns:
             DataFrame with comparison results.
         """
@@ -283,6 +864,15 @@ class ModelComparison:
             raise ValueError("No results available. Train models first.")
         
         df = pd.DataFrame(self.results).T
+        
+        if confidence_intervals:
+            if not self.test_predictions:
+                raise ValueError("No stored test predictions. Train models first.")
+            intervals = bootstrap_confidence_intervals(
+                self.y_test, self.test_predictions, prefix='test', **bootstrap_kwargs
+            )
+            df = df.join(pd.DataFrame(intervals).T)
+        
         df.index.name = 'model'
         return df.reset_index()
     
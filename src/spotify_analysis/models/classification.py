@@ -0,0 +1,162 @@
+"""Popularity category classification (Baixa/Média/Alta)."""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score, balanced_accuracy_score, f1_score
+
+from spotify_analysis.config import config
+from spotify_analysis.data import DataPreprocessor
+
+logger = logging.getLogger(__name__)
+
+
+def categorize_popularity(y: Sequence[float]) -> np.ndarray:
+    """Map popularity scores to category codes.
+
+    Args:
+        y: Popularity scores (0-100).
+
+    Returns:
+        Integer codes indexing ``config.popularity_categories['labels']``.
+    """
+    return np.digitize(np.asarray(y, dtype=float), config.popularity_categories['edges'])
+
+
+class PopularityClassifier:
+    """Classify tracks into popularity categories with histogram gradient boosting.
+
+    Categorical features are passed to the model natively (ordinal coded),
+    so no one-hot step is needed.
+    """
+
+    def __init__(self, **params: Any):
+        """Initialize PopularityClassifier.
+
+        Args:
+            **params: Overrides for ``config.classifier_config``.
+        """
+        self.params = {**config.classifier_config, **params}
+        self.model = HistGradientBoostingClassifier(**self.params)
+        self.labels: List[str] = list(config.popularity_categories['labels'])
+        self.preprocessor: Optional[DataPreprocessor] = None
+        self.is_fitted = False
+        self.metrics: Dict[str, float] = {}
+
+    def _codes(self, y: Sequence) -> np.ndarray:
+        """Category codes from popularity scores or category labels."""
+        y = np.asarray(y)
+        if y.dtype.kind in 'OUS':
+            lookup = {label: i for i, label in enumerate(self.labels)}
+            return np.array([lookup[label] for label in y])
+        return categorize_popularity(y)
+
+    def fit(
+        self,
+        X: np.ndarray,
+        y: Sequence,
+        categorical_features: Optional[Sequence[bool]] = None
+    ) -> 'PopularityClassifier':
+        """Fit the classifier.
+
+        Args:
+            X: Training features.
+            y: Popularity scores or category labels.
+            categorical_features: Boolean mask of ordinal-encoded categorical
+                columns in ``X``.
+
+        Returns:
+            Self for method chaining.
+        """
+        if categorical_features is not None:
+            mask = list(categorical_features)
+            self.model.set_params(categorical_features=mask if any(mask) else None)
+        logger.info("Training popularity category classifier...")
+        self.model.fit(X, self._codes(y))
+        self.is_fitted = True
+        return self
+
+    def fit_frame(self, X: pd.DataFrame, y: Sequence) -> 'PopularityClassifier':
+        """Fit an ordinal-encoding preprocessor and the classifier on raw features.
+
+        Args:
+            X: Raw features DataFrame.
+            y: Popularity scores or category labels.
+
+        Returns:
+            Self for method chaining.
+        """
+        self.preprocessor = DataPreprocessor(categorical_encoding='ordinal')
+        X_transformed = self.preprocessor.fit_transform(X)
+        return self.fit(X_transformed, y, self.preprocessor.get_categorical_mask())
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        """Apply the fitted preprocessor to raw features, if one is attached.
+
+        Args:
+            X: Raw features DataFrame.
+
+        Returns:
+            Feature matrix for ``predict``.
+        """
+        if self.preprocessor is None:
+            return X
+        return self.preprocessor.transform(X)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Predict category probabilities.
+
+        Args:
+            X: Features.
+
+        Returns:
+            Array with shape ``(n_samples, n_categories)``, columns in
+            ``labels`` order.
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted. Call fit() first.")
+        proba = np.zeros((len(X), len(self.labels)))
+        proba[:, self.model.classes_] = self.model.predict_proba(X)
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict category labels.
+
+        Args:
+            X: Features.
+
+        Returns:
+            Array of category labels.
+        """
+        return np.asarray(self.labels, dtype=object)[self.predict_proba(X).argmax(axis=1)]
+
+    def evaluate(self, X: np.ndarray, y: Sequence, dataset_name: str = 'test') -> Dict[str, float]:
+        """Evaluate the classifier.
+
+        Args:
+            X: Features.
+            y: True popularity scores or category labels.
+            dataset_name: Name of the dataset (prefix for metric names).
+
+        Returns:
+            Dictionary with accuracy, balanced accuracy and macro F1.
+        """
+        y_true = self._codes(y)
+        y_pred = self.predict_proba(X).argmax(axis=1)
+        metrics = {
+            f'{dataset_name}_accuracy': accuracy_score(y_true, y_pred),
+            f'{dataset_name}_balanced_accuracy': balanced_accuracy_score(y_true, y_pred),
+            f'{dataset_name}_f1_macro': f1_score(
+                y_true, y_pred, labels=range(len(self.labels)), average='macro', zero_division=0
+            )
+        }
+        self.metrics.update(metrics)
+        logger.info(
+            f"Popularity classifier - {dataset_name.upper()} - "
+            f"Accuracy: {metrics[f'{dataset_name}_accuracy']:.4f}, "
+            f"F1 (macro): {metrics[f'{dataset_name}_f1_macro']:.4f}"
+        )
+        return metrics
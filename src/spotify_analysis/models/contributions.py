@@ -0,0 +1,263 @@
+"""Per-prediction feature contributions for linear, tree and XGBoost models."""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def _as_matrix(X) -> np.ndarray:
+    """Convert features to a dense float matrix."""
+    if isinstance(X, pd.DataFrame):
+        X = X.to_numpy()
+    return np.asarray(X, dtype=float)
+
+
+def linear_contributions(model, X) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact coefficient x value attribution for linear models.
+
+    Args:
+        model: Fitted model with ``coef_`` and ``intercept_``.
+        X: Features.
+
+    Returns:
+        Tuple of (contributions with shape ``(n_samples, n_features)``, bias).
+    """
+    X = _as_matrix(X)
+    coef = np.asarray(model.coef_, dtype=float).ravel()
+    contributions = X * coef
+    bias = np.full(len(X), float(np.ravel(model.intercept_)[0]))
+    return contributions, bias
+
+
+def xgboost_contributions(model, X) -> Tuple[np.ndarray, np.ndarray]:
+    """TreeSHAP contributions from XGBoost's ``pred_contribs``.
+
+    Models fitted on a DataFrame keep their feature names in the booster;
+    the matrix is built with those names (and a DataFrame's columns are put
+    in the booster's order) so XGBoost's feature validation passes.
+
+    Args:
+        model: Fitted XGBoost sklearn estimator.
+        X: Features.
+
+    Returns:
+        Tuple of (contributions, bias).
+    """
+    from xgboost import DMatrix
+
+    booster = model.get_booster()
+    names = booster.feature_names
+    if names is not None and isinstance(X, pd.DataFrame):
+        X = X[names]
+    contribs = booster.predict(DMatrix(_as_matrix(X), feature_names=names), pred_contribs=True)
+    return contribs[:, :-1], contribs[:, -1]
+
+
+def _tree_path_operator(tree, n_features: int) -> Tuple[sparse.csr_matrix, float]:
+    """Sparse node-to-feature operator for Saabas-style path attribution.
+
+    Every node other than the root carries the change in node value caused by
+    the split of its parent, attributed to the parent's split feature.
+    Multiplying the decision-path indicator matrix by this operator yields
+    per-sample contributions in one sparse product.
+    """
+    tree_ = tree.tree_
+    values = tree_.value[:, 0, 0]
+    parents = np.full(tree_.node_count, -1)
+    for children in (tree_.children_left, tree_.children_right):
+        is_split = children >= 0
+        parents[children[is_split]] = np.nonzero(is_split)[0]
+
+    nodes = np.nonzero(parents >= 0)[0]
+    delta = values[nodes] - values[parents[nodes]]
+    features = tree_.feature[parents[nodes]]
+    operator = sparse.csr_matrix(
+        (delta, (nodes, features)), shape=(tree_.node_count, n_features)
+    )
+    return operator, float(values[0])
+
+
+def tree_contributions(model, X) -> Tuple[np.ndarray, np.ndarray]:
+    """Path-based contributions for sklearn decision trees and ensembles.
+
+    Supports ``DecisionTreeRegressor``, ``RandomForestRegressor`` (and other
+    averaging ensembles) and ``GradientBoostingRegressor``.
+
+    Args:
+        model: Fitted sklearn tree model.
+        X: Features.
+
+    Returns:
+        Tuple of (contributions, bias).
+    """
+    X = _as_matrix(X).astype(np.float32)
+    n_samples, n_features = X.shape
+
+    if hasattr(model, 'tree_'):
+        trees, scale = [model], 1.0
+        bias = np.zeros(n_samples)
+    elif hasattr(model, 'learning_rate') and hasattr(model, 'init_'):
+        trees, scale = list(np.ravel(model.estimators_)), model.learning_rate
+        if model.init_ == 'zero':
+            bias = np.zeros(n_samples)
+        else:
+            bias = np.asarray(model.init_.predict(X), dtype=float).ravel()
+    else:
+        trees, scale = list(model.estimators_), 1.0 / len(model.estimators_)
+        bias = np.zeros(n_samples)
+
+    contributions = np.zeros((n_samples, n_features))
+    for tree in trees:
+        operator, root_value = _tree_path_operator(tree, n_features)
+        path = tree.decision_path(X)
+        contributions += scale * np.asarray((path @ operator).todense())
+        bias += scale * root_value
+
+    return contributions, bias
+
+
+def _contribution_method(model) -> Optional[Callable]:
+    """Attribution function for a model type, or None if unsupported."""
+    if hasattr(model, 'get_booster'):
+        return xgboost_contributions
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return linear_contributions
+    if hasattr(model, 'tree_') or hasattr(model, 'estimators_'):
+        return tree_contributions
+    return None
+
+
+def supports_contributions(model) -> bool:
+    """Whether ``compute_contributions`` supports a fitted model.
+
+    Args:
+        model: Fitted estimator.
+
+    Returns:
+        True for XGBoost, linear and sklearn tree models.
+    """
+    return _contribution_method(model) is not None
+
+
+def compute_contributions(model, X) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute per-prediction feature contributions for a batch.
+
+    Contributions plus bias add up to the model prediction for every row.
+
+    Args:
+        model: Fitted estimator.
+        X: Features.
+
+    Returns:
+        Tuple of (contributions with shape ``(n_samples, n_features)``, bias).
+
+    Raises:
+        ValueError: If the model type is not supported.
+    """
+    method = _contribution_method(model)
+    if method is None:
+        raise ValueError(f"Contributions not supported for {type(model).__name__}")
+    return method(model, X)
+
+
+def group_matrix(feature_names: Sequence[str], groups: Sequence[str]) -> np.ndarray:
+    """Indicator matrix mapping encoded columns onto their source features.
+
+    A column belongs to the first group that equals its name or prefixes it
+    followed by ``_`` (e.g. ``key_5`` belongs to ``key``).
+
+    Args:
+        feature_names: Names of the encoded columns.
+        groups: Source feature names.
+
+    Returns:
+        Array with shape ``(len(feature_names), len(groups))``.
+    """
+    mapping = np.zeros((len(feature_names), len(groups)))
+    for i, name in enumerate(feature_names):
+        for j, group in enumerate(groups):
+            if name == group or name.startswith(f"{group}_"):
+                mapping[i, j] = 1.0
+                break
+    return mapping
+
+
+def group_contributions(
+    contributions: np.ndarray,
+    feature_names: Sequence[str],
+    groups: Sequence[str]
+) -> np.ndarray:
+    """Sum contributions of encoded columns back onto their source features.
+
+    Columns are assigned to groups as in ``group_matrix``.
+
+    Args:
+        contributions: Array with shape ``(n_samples, n_features)``.
+        feature_names: Names of the encoded columns.
+        groups: Source feature names.
+
+    Returns:
+        Array with shape ``(n_samples, len(groups))``.
+    """
+    return contributions @ group_matrix(feature_names, groups)
+
+
+def top_k_contributions(
+    contributions: np.ndarray,
+    feature_names: Sequence[str],
+    k: int = 3
+) -> List[Dict[str, float]]:
+    """Select the ``k`` largest contributions (by magnitude) for every row.
+
+    Args:
+        contributions: Array with shape ``(n_samples, n_features)``.
+        feature_names: Feature names.
+        k: Number of features to keep per row.
+
+    Returns:
+        List of ``{feature: contribution}`` dictionaries ordered by magnitude.
+    """
+    n_features = contributions.shape[1]
+    k = min(k, n_features)
+    if k == 0:
+        return [{} for _ in range(len(contributions))]
+
+    magnitude = np.abs(contributions)
+    top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    values = np.take_along_axis(contributions, top, axis=1)
+
+    names = np.asarray(feature_names, dtype=object)[top]
+    return [
+        dict(zip(row_names, row_values.tolist()))
+        for row_names, row_values in zip(names, values)
+    ]
+
+
+def explain_batch(
+    model,
+    X,
+    feature_names: Sequence[str],
+    k: int = 3,
+    groups: Optional[Sequence[str]] = None
+) -> List[Dict[str, float]]:
+    """Top-``k`` feature contributions for every row of a batch.
+
+    Args:
+        model: Fitted estimator.
+        X: Features.
+        feature_names: Names of the columns of ``X``.
+        k: Number of features to keep per row.
+        groups: Optional source feature names to aggregate encoded columns.
+
+    Returns:
+        List of ``{feature: contribution}`` dictionaries.
+    """
+    contributions, _ = compute_contributions(model, X)
+    if groups is not None:
+        contributions = group_contributions(contributions, feature_names, groups)
+        feature_names = groups
+    return top_k_contributions(contributions, feature_names, k)
@@ -0,0 +1,154 @@
+"""Out-of-core XGBoost training from chunked data sources."""
+
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+
+from spotify_analysis.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def iter_transformed_chunks(
+    loader,
+    preprocessor,
+    target_col: Optional[str] = None,
+    chunksize: Optional[int] = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield preprocessed ``(X, y)`` batches from a ``DataLoader``.
+
+    Rows with missing feature or target values are dropped per chunk.
+
+    Args:
+        loader: DataLoader over the source files.
+        preprocessor: Fitted DataPreprocessor.
+        target_col: Name of target column.
+        chunksize: Rows per chunk.
+
+    Yields:
+        Tuples of (transformed features, target).
+    """
+    target_col = target_col or config.target_variable
+    columns = (
+        list(preprocessor.numerical_features)
+        + list(preprocessor.categorical_features)
+        + [target_col]
+    )
+    for chunk in loader.iter_chunks(chunksize, usecols=columns):
+        chunk = chunk.dropna()
+        if chunk.empty:
+            continue
+        X = preprocessor.transform(chunk.drop(columns=[target_col]))
+        yield np.asarray(X, dtype=np.float32), chunk[target_col].to_numpy(dtype=np.float32)
+
+
+class ChunkDataIter(xgb.DataIter):
+    """XGBoost data iterator fed by chunked reads and a fitted preprocessor.
+
+    XGBoost pulls one chunk at a time and pages its quantised copy to
+    ``cache_prefix`` on disk, so the full feature matrix is never built.
+    """
+
+    def __init__(
+        self,
+        loader,
+        preprocessor,
+        cache_prefix: str,
+        target_col: Optional[str] = None,
+        chunksize: Optional[int] = None
+    ):
+        """Initialize ChunkDataIter.
+
+        Args:
+            loader: DataLoader over the source files.
+            preprocessor: Fitted DataPreprocessor.
+            cache_prefix: Path prefix for XGBoost's on-disk cache pages.
+            target_col: Name of target column.
+            chunksize: Rows per chunk.
+        """
+        self.loader = loader
+        self.preprocessor = preprocessor
+        self.target_col = target_col
+        self.chunksize = chunksize
+        self.n_batches = 0
+        self.n_rows = 0
+        self._batches: Optional[Iterator[Tuple[np.ndarray, np.ndarray]]] = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        """Pass the next chunk to XGBoost; return False when exhausted."""
+        if self._batches is None:
+            self.reset()
+        batch = next(self._batches, None)
+        if batch is None:
+            return False
+        X, y = batch
+        input_data(data=X, label=y)
+        self.n_batches += 1
+        self.n_rows += len(y)
+        return True
+
+    def reset(self):
+        """Restart iteration from the first chunk."""
+        self._batches = iter_transformed_chunks(
+            self.loader, self.preprocessor, self.target_col, self.chunksize
+        )
+        self.n_batches = 0
+        self.n_rows = 0
+
+
+def train_xgboost_external(
+    model: xgb.XGBRegressor,
+    loader,
+    preprocessor,
+    target_col: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    cache_dir: Optional[Path] = None
+) -> xgb.XGBRegressor:
+    """Train an ``XGBRegressor`` from chunked data using external memory.
+
+    Host memory is bounded by one chunk of ``chunksize`` rows plus XGBoost's
+    working set for a cache page; the quantised data lives in ``cache_dir``.
+
+    Args:
+        model: Unfitted XGBRegressor whose parameters are used for training.
+        loader: DataLoader over the source files.
+        preprocessor: Fitted DataPreprocessor.
+        target_col: Name of target column.
+        chunksize: Rows per chunk. If None, uses
+            ``config.external_memory_config['chunksize']``.
+        cache_dir: Directory for cache pages. If None, uses
+            ``config.external_memory_config['cache_dir']``.
+
+    Returns:
+        The fitted model.
+    """
+    external_config = config.external_memory_config
+    chunksize = chunksize or external_config['chunksize']
+    cache_dir = Path(cache_dir or external_config['cache_dir'])
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    params = model.get_xgb_params()
+    params['tree_method'] = 'hist'
+    num_boost_round = model.get_params()['n_estimators'] or 100
+
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_dir:
+        data_iter = ChunkDataIter(
+            loader, preprocessor, str(Path(tmp_dir) / 'cache'), target_col, chunksize
+        )
+        if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+            dtrain = xgb.ExtMemQuantileDMatrix(data_iter, max_bin=params.get('max_bin'))
+        else:
+            dtrain = xgb.DMatrix(data_iter)
+        logger.info(
+            f"External-memory DMatrix: {dtrain.num_row()} rows x {dtrain.num_col()} features"
+        )
+        booster = xgb.train(params, dtrain, num_boost_round=num_boost_round)
+        del dtrain
+
+    model.load_model(bytearray(booster.save_raw(raw_format='ubj')))
+    return model
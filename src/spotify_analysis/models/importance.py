@@ -0,0 +1,203 @@
+"""Permutation feature importance for any fitted regressor."""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+
+from spotify_analysis.config import config
+from spotify_analysis.utils.fingerprint import fingerprint_data, fingerprint_model
+
+logger = logging.getLogger(__name__)
+
+
+def _r2(y_true: np.ndarray, y_pred: np.ndarray, sst: float) -> float:
+    """R² against a precomputed total sum of squares."""
+    sse = float(np.sum((y_true - y_pred) ** 2))
+    if sst > 0:
+        return 1.0 - sse / sst
+    return 1.0 if sse == 0 else 0.0
+
+
+def _predict(model, X: np.ndarray, columns: Optional[List[str]]) -> np.ndarray:
+    """Predict, wrapping the buffer in a DataFrame if the model was fitted on one."""
+    if columns is not None:
+        X = pd.DataFrame(X, columns=columns, copy=False)
+    return np.asarray(model.predict(X), dtype=float)
+
+
+def _run_repeats(
+    model,
+    X: np.ndarray,
+    y: np.ndarray,
+    seeds: List[int],
+    baseline: float,
+    sst: float,
+    columns: Optional[List[str]]
+) -> np.ndarray:
+    """Score drops for a group of repeats, sharing one preallocated buffer.
+
+    Each column is shuffled in place, scored and restored, so the worker
+    holds exactly one copy of ``X`` regardless of the number of features.
+    """
+    buffer = np.array(X, dtype=float, order='C')
+    original = np.empty(buffer.shape[0], dtype=float)
+    drops = np.empty((len(seeds), buffer.shape[1]), dtype=float)
+
+    for i, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        for j in range(buffer.shape[1]):
+            column = buffer[:, j]
+            original[:] = column
+            rng.shuffle(column)
+            drops[i, j] = baseline - _r2(y, _predict(model, buffer, columns), sst)
+            column[:] = original
+
+    return drops
+
+
+def _cache_path(cache_dir: Path, model_key: str, key: str) -> Path:
+    """Path of a cached importance result."""
+    return Path(cache_dir) / 'importance' / f"{model_key}_{key}.json"
+
+
+def load_cached_importance(
+    model_key: str,
+    cache_dir: Optional[Path] = None
+) -> Optional[pd.DataFrame]:
+    """Load the most recent cached permutation importance for a model.
+
+    Args:
+        model_key: Stable model identity (e.g. ``ModelTrainer.model_key``).
+        cache_dir: Cache directory. If None, uses ``config.cache_dir``.
+
+    Returns:
+        DataFrame with feature importance or None if nothing is cached.
+    """
+    cache_dir = Path(cache_dir or config.cache_dir)
+    candidates = sorted(
+        (cache_dir / 'importance').glob(f"{model_key}_*.json"),
+        key=lambda path: path.stat().st_mtime
+    )
+    if not candidates:
+        return None
+
+    with open(candidates[-1]) as f:
+        return pd.DataFrame(json.load(f)['importance'])
+
+
+def permutation_importance(
+    model,
+    X,
+    y,
+    feature_names: Optional[List[str]] = None,
+    n_repeats: Optional[int] = None,
+    max_samples: Optional[int] = None,
+    n_jobs: Optional[int] = None,
+    random_state: Optional[int] = None,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    model_key: Optional[str] = None
+) -> pd.DataFrame:
+    """Compute permutation importance (drop in R²) for a fitted model.
+
+    Repeats are split across ``n_jobs`` threads; each thread permutes columns
+    in place on its own preallocated copy of the (optionally subsampled) data.
+    Results are cached on disk per model key and input fingerprint.
+
+    Args:
+        model: Fitted estimator with a ``predict`` method.
+        X: Features (array or DataFrame).
+        y: True target values.
+        feature_names: List of feature names.
+        n_repeats: Number of permutations per feature.
+        max_samples: Maximum number of rows to use; larger inputs are
+            subsampled without replacement.
+        n_jobs: Number of parallel workers (-1 for all cores).
+        random_state: Random seed for subsampling and permutations.
+        use_cache: Whether to read and write the on-disk cache.
+        cache_dir: Cache directory. If None, uses ``config.cache_dir``.
+        model_key: Stable model identity (e.g. ``ModelTrainer.model_key``)
+            used as the cache namespace. If None, uses ``fingerprint_model(model)``.
+
+    Returns:
+        DataFrame with ``feature``, ``importance`` and ``importance_std``
+        columns, sorted by importance.
+    """
+    importance_config = config.importance_config
+    n_repeats = n_repeats or importance_config['n_repeats']
+    max_samples = max_samples if max_samples is not None else importance_config['max_samples']
+    n_jobs = n_jobs or importance_config['n_jobs']
+    random_state = random_state if random_state is not None else importance_config['random_state']
+    cache_dir = Path(cache_dir or config.cache_dir)
+
+    columns = list(X.columns) if isinstance(X, pd.DataFrame) else None
+    if columns is not None and not hasattr(model, 'feature_names_in_'):
+        columns = None
+    X_values = X.to_numpy() if isinstance(X, pd.DataFrame) else np.asarray(X)
+    y_values = np.asarray(y, dtype=float).ravel()
+
+    if feature_names is None:
+        feature_names = (
+            list(X.columns) if isinstance(X, pd.DataFrame)
+            else [f"feature_{i}" for i in range(X_values.shape[1])]
+        )
+
+    cache_file = None
+    if use_cache:
+        model_key = model_key or fingerprint_model(model)
+        key = fingerprint_data(
+            X_values, y_values, [n_repeats, max_samples, random_state, feature_names]
+        )
+        cache_file = _cache_path(cache_dir, model_key, key)
+        if cache_file.exists():
+            logger.info(f"Loading cached permutation importance from {cache_file}")
+            with open(cache_file) as f:
+                return pd.DataFrame(json.load(f)['importance'])
+
+    rng = np.random.default_rng(random_state)
+    if max_samples and len(y_values) > max_samples:
+        rows = np.sort(rng.choice(len(y_values), size=max_samples, replace=False))
+        X_values = X_values[rows]
+        y_values = y_values[rows]
+
+    sst = float(np.sum((y_values - y_values.mean()) ** 2))
+    baseline = _r2(y_values, _predict(model, X_values, columns), sst)
+
+    seeds = rng.integers(0, 2**31 - 1, size=n_repeats).tolist()
+    n_workers = min(effective_n_jobs(n_jobs), n_repeats)
+    groups = [seeds[i::n_workers] for i in range(n_workers)]
+
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_workers, prefer='threads')(
+        delayed(_run_repeats)(model, X_values, y_values, group, baseline, sst, columns)
+        for group in groups
+    )
+    drops = np.vstack(results)
+    logger.info(
+        f"Permutation importance: {n_repeats} repeats x {X_values.shape[1]} features "
+        f"on {len(y_values)} rows in {time.perf_counter() - start:.2f}s"
+    )
+
+    importance_df = pd.DataFrame({
+        'feature': feature_names,
+        'importance': drops.mean(axis=0),
+        'importance_std': drops.std(axis=0)
+    }).sort_values('importance', ascending=False).reset_index(drop=True)
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w') as f:
+            json.dump({
+                'baseline_r2': baseline,
+                'n_repeats': n_repeats,
+                'n_samples': len(y_values),
+                'importance': importance_df.to_dict(orient='list')
+            }, f)
+
+    return importance_df
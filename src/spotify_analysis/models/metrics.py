@@ -0,0 +1,332 @@
+"""Single-pass, mergeable regression metrics."""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from spotify_analysis.config import config
+
+BOOTSTRAP_METRICS = ('mae', 'mse', 'rmse', 'r2')
+
+
+class StreamingRegressionMetrics:
+    """Accumulate regression metrics over prediction batches in one pass.
+
+    MAE, MSE, RMSE and R² are computed from running sums, and the target
+    variance is tracked with Chan's parallel update, so accumulators built on
+    different workers can be merged exactly. Quantiles of the absolute error
+    come from a fixed-width histogram (exact to within ``error_bin_width``),
+    and per-bucket errors are grouped by the true target value.
+    """
+
+    def __init__(
+        self,
+        quantiles: Optional[Sequence[float]] = None,
+        bucket_edges: Optional[Sequence[float]] = None,
+        bucket_labels: Optional[Sequence[str]] = None,
+        error_bin_width: float = 0.1,
+        max_error: float = 100.0
+    ):
+        """Initialize StreamingRegressionMetrics.
+
+        Args:
+            quantiles: Absolute-error quantiles to report (values in [0, 1]).
+            bucket_edges: Inner edges splitting the true target into buckets.
+            bucket_labels: Names for the ``len(bucket_edges) + 1`` buckets.
+            error_bin_width: Resolution of the absolute-error histogram.
+            max_error: Upper bound of the histogram; larger errors share the
+                last bin.
+        """
+        self.quantiles = list(quantiles) if quantiles is not None else []
+        if any(not 0 <= q <= 1 for q in self.quantiles):
+            raise ValueError("Quantiles must be between 0 and 1.")
+
+        self.bucket_edges = np.asarray(bucket_edges if bucket_edges is not None else [],
+                                       dtype=float)
+        n_buckets = len(self.bucket_edges) + 1 if bucket_edges is not None else 0
+        if bucket_labels is not None and len(bucket_labels) != n_buckets:
+            raise ValueError(f"Expected {n_buckets} bucket labels, got {len(bucket_labels)}")
+        self.bucket_labels: List[str] = (
+            list(bucket_labels) if bucket_labels is not None
+            else [f"bucket{i}" for i in range(n_buckets)]
+        )
+
+        self.error_bin_width = error_bin_width
+        self.max_error = max_error
+
+        self.n = 0
+        self.sum_abs_error = 0.0
+        self.sum_sq_error = 0.0
+        self.y_mean = 0.0
+        self.y_m2 = 0.0
+
+        n_bins = int(np.ceil(max_error / error_bin_width)) + 1 if self.quantiles else 0
+        self.error_hist = np.zeros(n_bins, dtype=np.int64)
+
+        self.bucket_n = np.zeros(n_buckets, dtype=np.int64)
+        self.bucket_abs_error = np.zeros(n_buckets, dtype=float)
+        self.bucket_sq_error = np.zeros(n_buckets, dtype=float)
+
+    def update(self, y_true, y_pred) -> 'StreamingRegressionMetrics':
+        """Add a batch of predictions.
+
+        Args:
+            y_true: True target values.
+            y_pred: Predicted values.
+
+        Returns:
+            Self for method chaining.
+        """
+        y_true = np.asarray(y_true, dtype=float).ravel()
+        y_pred = np.asarray(y_pred, dtype=float).ravel()
+        if y_true.shape != y_pred.shape:
+            raise ValueError(
+                f"Shape mismatch: y_true {y_true.shape} vs y_pred {y_pred.shape}"
+            )
+
+        n_batch = len(y_true)
+        if n_batch == 0:
+            return self
+
+        error = y_true - y_pred
+        abs_error = np.abs(error)
+        sq_error = error * error
+
+        self.sum_abs_error += abs_error.sum()
+        self.sum_sq_error += sq_error.sum()
+
+        batch_mean = y_true.mean()
+        batch_m2 = ((y_true - batch_mean) ** 2).sum()
+        self._combine_moments(n_batch, batch_mean, batch_m2)
+
+        if self.quantiles:
+            bins = np.minimum(
+                (abs_error / self.error_bin_width).astype(np.int64), len(self.error_hist) - 1
+            )
+            self.error_hist += np.bincount(bins, minlength=len(self.error_hist))
+
+        if len(self.bucket_n):
+            buckets = np.searchsorted(self.bucket_edges, y_true, side='right')
+            n_buckets = len(self.bucket_n)
+            self.bucket_n += np.bincount(buckets, minlength=n_buckets)
+            self.bucket_abs_error += np.bincount(buckets, weights=abs_error, minlength=n_buckets)
+            self.bucket_sq_error += np.bincount(buckets, weights=sq_error, minlength=n_buckets)
+
+        return self
+
+    def merge(self, other: 'StreamingRegressionMetrics') -> 'StreamingRegressionMetrics':
+        """Merge another accumulator with the same configuration into this one.
+
+        Args:
+            other: Accumulator built on a disjoint set of predictions.
+
+        Returns:
+            Self for method chaining.
+        """
+        if (
+            self.quantiles != other.quantiles
+            or not np.array_equal(self.bucket_edges, other.bucket_edges)
+            or len(self.error_hist) != len(other.error_hist)
+        ):
+            raise ValueError("Cannot merge accumulators with different configurations.")
+
+        if other.n == 0:
+            return self
+
+        self.sum_abs_error += other.sum_abs_error
+        self.sum_sq_error += other.sum_sq_error
+        self._combine_moments(other.n, other.y_mean, other.y_m2)
+        self.error_hist += other.error_hist
+        self.bucket_n += other.bucket_n
+        self.bucket_abs_error += other.bucket_abs_error
+        self.bucket_sq_error += other.bucket_sq_error
+        return self
+
+    def _combine_moments(self, n_other: int, mean_other: float, m2_other: float):
+        """Combine target mean/M2 with another partition (Chan et al.)."""
+        n_total = self.n + n_other
+        delta = mean_other - self.y_mean
+        self.y_mean += delta * n_other / n_total
+        self.y_m2 += m2_other + delta * delta * self.n * n_other / n_total
+        self.n = n_total
+
+    def _error_quantile(self, q: float) -> float:
+        """Interpolate an absolute-error quantile from the histogram."""
+        cumulative = np.cumsum(self.error_hist)
+        target = q * self.n
+        idx = int(np.searchsorted(cumulative, target, side='left'))
+        idx = min(idx, len(self.error_hist) - 1)
+        below = cumulative[idx - 1] if idx > 0 else 0
+        in_bin = self.error_hist[idx]
+        fraction = (target - below) / in_bin if in_bin else 0.0
+        return (idx + fraction) * self.error_bin_width
+
+    def compute(self, prefix: str = '') -> Dict[str, float]:
+        """Compute the accumulated metrics.
+
+        Args:
+            prefix: Prefix for metric names (e.g. ``'test'``).
+
+        Returns:
+            Dictionary of metrics.
+        """
+        if self.n == 0:
+            raise ValueError("No predictions accumulated. Call update() first.")
+
+        key = f"{prefix}_" if prefix else ''
+        mse = self.sum_sq_error / self.n
+        if self.y_m2 > 0:
+            r2 = 1.0 - self.sum_sq_error / self.y_m2
+        else:
+            # Same convention as sklearn.metrics.r2_score for a constant target
+            r2 = 1.0 if self.sum_sq_error == 0 else 0.0
+
+        metrics = {
+            f'{key}mae': float(self.sum_abs_error / self.n),
+            f'{key}mse': float(mse),
+            f'{key}rmse': float(np.sqrt(mse)),
+            f'{key}r2': float(r2)
+        }
+
+        for q in self.quantiles:
+            metrics[f'{key}ae_p{q * 100:g}'] = float(self._error_quantile(q))
+
+        for i, label in enumerate(self.bucket_labels):
+            count = self.bucket_n[i]
+            if count == 0:
+                continue
+            metrics[f'{key}mae_{label}'] = float(self.bucket_abs_error[i] / count)
+            metrics[f'{key}rmse_{label}'] = float(np.sqrt(self.bucket_sq_error[i] / count))
+
+        return metrics
+
+
+def iter_batches(
+    X,
+    y,
+    batch_size: Optional[int] = None
+) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+    """Yield aligned ``(X, y)`` slices of at most ``batch_size`` rows.
+
+    Args:
+        X: Features (array or DataFrame).
+        y: Target.
+        batch_size: Rows per batch. If None, yields the whole input once.
+    """
+    n = len(y)
+    if batch_size is None or batch_size >= n:
+        yield X, y
+        return
+
+    for start in range(0, n, batch_size):
+        stop = start + batch_size
+        X_batch = X.iloc[start:stop] if hasattr(X, 'iloc') else X[start:stop]
+        y_batch = y.iloc[start:stop] if hasattr(y, 'iloc') else y[start:stop]
+        yield X_batch, y_batch
+
+
+def _bootstrap_chunk(
+    y_true: np.ndarray,
+    predictions: np.ndarray,
+    n_replicates: int,
+    seed: np.random.SeedSequence
+) -> np.ndarray:
+    """Metrics of ``n_replicates`` bootstrap resamples for every model.
+
+    Args:
+        y_true: True values, shape ``(n_samples,)``.
+        predictions: Predictions, shape ``(n_samples, n_models)``.
+        n_replicates: Number of resamples in this chunk.
+        seed: Seed for the resampling indices.
+
+    Returns:
+        Array with shape ``(n_models, len(BOOTSTRAP_METRICS), n_replicates)``.
+    """
+    n_samples, n_models = predictions.shape
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, n_samples, size=(n_replicates, n_samples))
+
+    y_sample = y_true[indices]
+    sst = ((y_sample - y_sample.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+
+    out = np.empty((n_models, len(BOOTSTRAP_METRICS), n_replicates))
+    for j in range(n_models):
+        errors = predictions[:, j][indices] - y_sample
+        sse = np.einsum('ij,ij->i', errors, errors)
+        out[j, 0] = np.abs(errors).mean(axis=1)
+        out[j, 1] = sse / n_samples
+        out[j, 2] = np.sqrt(out[j, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[j, 3] = np.where(sst > 0, 1 - sse / sst, 0.0)
+    return out
+
+
+def bootstrap_confidence_intervals(
+    y_true: Sequence[float],
+    predictions: Dict[str, Sequence[float]],
+    prefix: str = 'test',
+    n_boot: Optional[int] = None,
+    confidence: Optional[float] = None,
+    n_jobs: Optional[int] = None,
+    random_state: Optional[int] = None
+) -> Dict[str, Dict[str, float]]:
+    """Percentile bootstrap intervals for MAE, MSE, RMSE and R².
+
+    Resampling indices are drawn as ``(replicates, n_samples)`` matrices and
+    every metric is reduced along rows, so there is no Python loop per
+    replicate. Replicates are split into chunks bounded by
+    ``config.bootstrap_config['max_elements']`` index entries; for test sets
+    of at least ``parallel_threshold`` rows the chunks run on parallel
+    threads. All models are scored on the same resamples (paired bootstrap),
+    so their intervals are directly comparable.
+
+    Args:
+        y_true: True target values.
+        predictions: Mapping of model name to stored predictions.
+        prefix: Prefix for metric names.
+        n_boot: Number of bootstrap replicates.
+        confidence: Confidence level of the intervals.
+        n_jobs: Parallel threads for large test sets.
+        random_state: Random seed for reproducibility.
+
+    Returns:
+        Dictionary mapping model name to ``{prefix}_{metric}_ci_low`` and
+        ``{prefix}_{metric}_ci_high`` values.
+    """
+    bootstrap_config = config.bootstrap_config
+    n_boot = n_boot or bootstrap_config['n_boot']
+    confidence = confidence or bootstrap_config['confidence']
+    n_jobs = n_jobs if n_jobs is not None else bootstrap_config['n_jobs']
+    if random_state is None:
+        random_state = bootstrap_config['random_state']
+
+    names = list(predictions)
+    y_true = np.asarray(y_true, dtype=float)
+    matrix = np.column_stack([np.asarray(predictions[name], dtype=float) for name in names])
+    if matrix.shape[0] != len(y_true):
+        raise ValueError("Predictions and y_true must have the same length.")
+
+    chunk_size = max(1, min(n_boot, bootstrap_config['max_elements'] // max(len(y_true), 1)))
+    sizes = [min(chunk_size, n_boot - start) for start in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+
+    if len(y_true) >= bootstrap_config['parallel_threshold'] and len(sizes) > 1:
+        chunks = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(_bootstrap_chunk)(y_true, matrix, size, seed)
+            for size, seed in zip(sizes, seeds)
+        )
+    else:
+        chunks = [_bootstrap_chunk(y_true, matrix, size, seed) for size, seed in zip(sizes, seeds)]
+
+    replicates = np.concatenate(chunks, axis=2)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(replicates, [alpha, 1 - alpha], axis=2)
+
+    intervals: Dict[str, Dict[str, float]] = {}
+    for j, name in enumerate(names):
+        intervals[name] = {}
+        for k, metric in enumerate(BOOTSTRAP_METRICS):
+            intervals[name][f'{prefix}_{metric}_ci_low'] = float(low[j, k])
+            intervals[name][f'{prefix}_{metric}_ci_high'] = float(high[j, k])
+    return intervals
@@ -0,0 +1,134 @@
+"""Quantise feature rows to a model's effective resolution for caching."""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _tree_splits(model) -> Optional[Tuple[np.ndarray, np.ndarray, str, type]]:
+    """Split columns and thresholds of every node of a tree model.
+
+    Returns:
+        Tuple of (column index per split, threshold per split, the
+        ``np.searchsorted`` side matching the model's comparison, dtype the
+        model compares values in), or None for unsupported models.
+    """
+    if hasattr(model, 'get_booster'):
+        booster = model.get_booster()
+        nodes = booster.trees_to_dataframe()
+        nodes = nodes[nodes['Feature'] != 'Leaf']
+        names = booster.feature_names
+        columns = np.array([
+            names.index(name) if names else int(name[1:]) for name in nodes['Feature']
+        ], dtype=int)
+        # XGBoost goes left when x < threshold, comparing in float32
+        return columns, nodes['Split'].to_numpy(dtype=np.float32), 'right', np.float32
+
+    if hasattr(model, '_predictors'):
+        nodes = np.concatenate([
+            predictor.nodes for iteration in model._predictors for predictor in iteration
+        ])
+        nodes = nodes[~nodes['is_leaf'].astype(bool) & ~nodes['is_categorical'].astype(bool)]
+        columns = nodes['feature_idx'].astype(int)
+        if getattr(model, '_preprocessor', None) is not None:
+            # With native categoricals the model moves them in front internally
+            is_categorical = np.asarray(model.is_categorical_, dtype=bool)
+            columns = np.concatenate([
+                np.flatnonzero(is_categorical), np.flatnonzero(~is_categorical)
+            ])[columns]
+        return columns, nodes['num_threshold'], 'left', np.float64
+
+    if hasattr(model, 'tree_'):
+        trees = [model]
+    elif hasattr(model, 'estimators_'):
+        trees = list(np.ravel(model.estimators_))
+    else:
+        return None
+    if not all(hasattr(tree, 'tree_') for tree in trees):
+        return None
+
+    columns = np.concatenate([tree.tree_.feature for tree in trees])
+    thresholds = np.concatenate([tree.tree_.threshold for tree in trees])
+    is_split = columns >= 0
+    # sklearn trees go left when x <= threshold, with x cast to float32
+    return columns[is_split], thresholds[is_split], 'left', np.float32
+
+
+class FeatureQuantizer:
+    """Map raw feature rows to cache keys at a model's effective resolution.
+
+    For tree models each numerical feature is replaced by the interval
+    between consecutive split thresholds it falls into, computed in the
+    model's input space (after standard scaling) with the model's own
+    comparison. Rows with equal keys then follow the same path through every
+    tree, so their predictions and path-based contributions are identical;
+    features the model never splits on drop out of the key. Categorical
+    features, and every feature of non-tree models, are rounded to
+    ``decimals``.
+    """
+
+    def __init__(self, trainer, features: Sequence[str], decimals: int = 4):
+        """Initialize FeatureQuantizer.
+
+        Args:
+            trainer: Fitted ModelTrainer (or any object with ``model`` and
+                optionally ``preprocessor``).
+            features: Raw feature columns that make up the key.
+            decimals: Rounding for features without split thresholds.
+        """
+        self.features = list(features)
+        self.decimals = decimals
+        self.side = 'left'
+        self.dtype: type = np.float64
+        self.bins: Dict[str, Tuple[float, float, np.ndarray]] = {}
+
+        splits = _tree_splits(getattr(trainer, 'model', trainer))
+        preprocessor = getattr(trainer, 'preprocessor', None)
+        if splits is None or preprocessor is None or preprocessor.preprocessor is None:
+            return
+        transformers = preprocessor.preprocessor.named_transformers_
+        if 'num' not in transformers:
+            return
+
+        columns, thresholds, self.side, self.dtype = splits
+        scaler = transformers['num'].named_steps['scaler']
+        for j, name in enumerate(preprocessor.numerical_features):
+            if name in self.features:
+                self.bins[name] = (
+                    float(scaler.mean_[j]),
+                    float(scaler.scale_[j]),
+                    np.unique(thresholds[columns == j]).astype(self.dtype)
+                )
+
+    def quantize(self, frame: pd.DataFrame) -> np.ndarray:
+        """Quantised feature matrix.
+
+        Args:
+            frame: Raw features with (at least) the key columns.
+
+        Returns:
+            Array with shape ``(n_rows, len(features))``.
+        """
+        codes = np.empty((len(frame), len(self.features)))
+        for i, name in enumerate(self.features):
+            values = frame[name].to_numpy(dtype=float)
+            if name in self.bins:
+                mean, scale, thresholds = self.bins[name]
+                scaled = ((values - mean) / scale).astype(self.dtype)
+                codes[:, i] = np.searchsorted(thresholds, scaled, side=self.side)
+            else:
+                codes[:, i] = np.round(values, self.decimals)
+        return codes
+
+    def keys(self, frame: pd.DataFrame) -> List[bytes]:
+        """One hashable key per row.
+
+        Args:
+            frame: Raw features with (at least) the key columns.
+
+        Returns:
+            List of byte strings.
+        """
+        codes = np.ascontiguousarray(self.quantize(frame))
+        return [row.tobytes() for row in codes]
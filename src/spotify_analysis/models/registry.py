@@ -0,0 +1,331 @@
+"""Versioned model registry with lazy loading and a memory-bounded LRU."""
+
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import joblib
+
+from spotify_analysis.config import config
+from spotify_analysis.models import ModelTrainer
+
+logger = logging.getLogger(__name__)
+
+_VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+
+class ModelRegistry:
+    """Index saved models on disk and load them on demand.
+
+    Each registered version is stored as ``<root>/<name>/v<version>.pkl``
+    (a ``ModelTrainer`` bundle) next to a ``v<version>.json`` metadata file.
+    The index is built from the metadata files only, so listing models never
+    unpickles them. Loaded models are kept in an LRU cache bounded by their
+    approximate memory footprint (the size of the pickle on disk). Legacy
+    ``<name>_model.pkl`` files written by ``ModelTrainer.save`` are indexed
+    as version 0.
+
+    Only versions bundled with their fitted preprocessor can score raw
+    features; they are marked ``servable`` and are the only ones returned
+    to callers that ask for ``servable=True`` (e.g. the API).
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        max_memory_mb: Optional[float] = None
+    ):
+        """Initialize ModelRegistry.
+
+        Args:
+            root: Registry directory. If None, uses ``config.models_dir``.
+            max_memory_mb: Memory budget for loaded models. If None, uses
+                ``config.registry_config['max_memory_mb']``.
+        """
+        self.root = Path(root or config.models_dir)
+        if max_memory_mb is None:
+            max_memory_mb = config.registry_config['max_memory_mb']
+        self.max_memory_bytes = int(max_memory_mb * 1024**2)
+        self._cache: 'OrderedDict[Tuple[str, int], Tuple[ModelTrainer, int]]' = OrderedDict()
+        self._cache_bytes = 0
+        self._index: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Tuple[str, int], threading.Lock] = {}
+
+    def _read_metadata(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Read one metadata file, skipping unreadable ones."""
+        try:
+            with open(path) as f:
+                metadata = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping invalid registry metadata {path}: {e}")
+            return None
+        metadata['path'] = str(path.with_suffix('.pkl'))
+        return metadata
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Rescan the registry directory and rebuild the index.
+
+        Returns:
+            List of metadata dictionaries sorted by name and version.
+        """
+        entries = []
+        if self.root.exists():
+            for metadata_path in self.root.glob('*/v*.json'):
+                if not _VERSION_PATTERN.match(metadata_path.stem):
+                    continue
+                metadata = self._read_metadata(metadata_path)
+                if metadata is not None:
+                    entries.append(metadata)
+
+            for legacy_path in self.root.glob('*_model.pkl'):
+                entries.append(self._legacy_entry(legacy_path))
+
+        with self._lock:
+            self._index = sorted(entries, key=lambda e: (e['name'], e['version']))
+            return list(self._index)
+
+    def list_models(
+        self,
+        name: Optional[str] = None,
+        refresh: bool = False,
+        servable: bool = False
+    ) -> List[Dict[str, Any]]:
+        """List registered model versions without loading them.
+
+        The directory is scanned once and the index is kept in memory;
+        pass ``refresh=True`` to pick up versions written by other processes.
+
+        Args:
+            name: Only list versions of this model.
+            refresh: Whether to rescan the registry directory.
+            servable: Only list versions that can score raw features.
+
+        Returns:
+            List of metadata dictionaries sorted by name and version.
+        """
+        index = self._index
+        if index is None or refresh:
+            index = self.refresh()
+        return [
+            e for e in index
+            if (name is None or e['name'] == name) and (not servable or self.is_servable(e))
+        ]
+
+    @staticmethod
+    def is_servable(entry: Dict[str, Any]) -> bool:
+        """Whether a registered version is bundled with its preprocessor.
+
+        Versions registered before the ``servable`` flag existed are servable
+        if they recorded the raw features they read.
+        """
+        return bool(entry.get('servable', entry.get('input_features')))
+
+    @staticmethod
+    def _legacy_entry(legacy_path: Path) -> Dict[str, Any]:
+        """Metadata for a model saved by ``ModelTrainer.save``."""
+        legacy_name = legacy_path.name[:-len('_model.pkl')]
+        return {
+            'name': legacy_name,
+            'version': 0,
+            'model_name': legacy_name,
+            'metrics': {},
+            'data_fingerprint': None,
+            'size_bytes': legacy_path.stat().st_size,
+            'path': str(legacy_path)
+        }
+
+    def get_entry(
+        self,
+        name: str,
+        version: Optional[int] = None,
+        servable: bool = False
+    ) -> Dict[str, Any]:
+        """Get the metadata of a registered model.
+
+        Args:
+            name: Model name.
+            version: Model version. If None, returns the latest version.
+            servable: Only consider versions that can score raw features.
+
+        Returns:
+            Metadata dictionary.
+
+        Raises:
+            KeyError: If no matching model is registered.
+        """
+        entries = self.list_models(name, servable=servable)
+        if version is not None:
+            entries = [e for e in entries if e['version'] == version]
+        if not entries:
+            kind = 'servable model' if servable else 'model'
+            suffix = f" version {version}" if version is not None else ''
+            raise KeyError(f"No registered {kind} '{name}'{suffix} in {self.root}")
+        return entries[-1]
+
+    def find(self, data_fingerprint: str, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find registered versions trained on data with a given fingerprint.
+
+        Args:
+            data_fingerprint: Fingerprint of the training data.
+            name: Only search versions of this model.
+
+        Returns:
+            List of matching metadata dictionaries.
+        """
+        return [
+            e for e in self.list_models(name)
+            if e.get('data_fingerprint') == data_fingerprint
+        ]
+
+    def register(
+        self,
+        trainer: ModelTrainer,
+        name: Optional[str] = None,
+        data_fingerprint: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Save a fitted trainer as a new version.
+
+        Args:
+            trainer: Fitted ModelTrainer (with optional preprocessor).
+            name: Registry name. If None, uses ``trainer.model_name``.
+            data_fingerprint: Fingerprint of the training data.
+            extra: Additional JSON-serialisable metadata.
+
+        Returns:
+            Metadata dictionary of the new version.
+        """
+        name = name or trainer.model_name
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            versions = [e['version'] for e in self.list_models(name, refresh=True)]
+            version = max(versions, default=0) + 1
+            model_path = model_dir / f"v{version}.pkl"
+            joblib.dump(trainer.to_bundle(), model_path)
+
+            metadata = {
+                'name': name,
+                'version': version,
+                'model_name': trainer.model_name,
+                'model_type': type(trainer.model).__name__,
+                'metrics': {k: float(v) for k, v in trainer.metrics.items()},
+                'data_fingerprint': data_fingerprint,
+                'feature_names': trainer.feature_names,
+                'input_features': trainer.input_features,
+                'servable': trainer.preprocessor is not None,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'size_bytes': model_path.stat().st_size,
+                **(extra or {})
+            }
+            with open(model_path.with_suffix('.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            metadata['path'] = str(model_path)
+            self._index = None
+
+        logger.info(f"Registered {name} v{version} at {model_path}")
+        return metadata
+
+    def load(
+        self,
+        name: Optional[str] = None,
+        version: Optional[int] = None,
+        servable: bool = False
+    ) -> ModelTrainer:
+        """Load a registered model, using the in-memory LRU when possible.
+
+        Args:
+            name: Model name. If None, uses ``config.registry_config['default_model']``.
+            version: Model version. If None, loads the latest version.
+            servable: Only consider versions that can score raw features.
+
+        Returns:
+            Fitted ModelTrainer.
+        """
+        name = name or config.registry_config['default_model']
+        entry = self.get_entry(name, version, servable=servable)
+        key = (entry['name'], entry['version'])
+
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        # Unpickle outside the registry lock so other models stay available;
+        # the per-version lock keeps concurrent callers from loading it twice
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            trainer = ModelTrainer.load(
+                Path(entry['path']), model_name=entry.get('model_name', name)
+            )
+            size = int(entry.get('size_bytes') or Path(entry['path']).stat().st_size)
+            with self._lock:
+                self._cache[key] = (trainer, size)
+                self._cache_bytes += size
+                self._evict()
+            return trainer
+
+    def _cached(self, key: Tuple[str, int]) -> Optional[ModelTrainer]:
+        """Return a loaded model and mark it as recently used, or None."""
+        with self._lock:
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key][0]
+
+    def _evict(self):
+        """Drop least recently used models until the memory budget is met."""
+        while self._cache_bytes > self.max_memory_bytes and len(self._cache) > 1:
+            (name, version), (_, size) = self._cache.popitem(last=False)
+            self._cache_bytes -= size
+            logger.info(f"Evicted {name} v{version} from model cache")
+
+    def resolve(self, spec: str, servable: bool = False) -> ModelTrainer:
+        """Load a model from a ``name``, ``name:version`` or file path spec.
+
+        Args:
+            spec: Model specification.
+            servable: Only resolve registered versions that can score raw
+                features (file paths are loaded as given).
+
+        Returns:
+            Fitted ModelTrainer.
+        """
+        path = Path(spec)
+        if path.suffix == '.pkl' and path.exists():
+            return ModelTrainer.load(path)
+
+        name, _, version = spec.partition(':')
+        return self.load(name, int(version) if version else None, servable=servable)
+
+    def loaded_models(self) -> List[Tuple[str, int]]:
+        """Return the keys of the models currently held in memory."""
+        with self._lock:
+            return list(self._cache.keys())
+
+    def clear_cache(self):
+        """Drop all loaded models from memory."""
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+
+_default_registry: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide registry over ``config.models_dir``."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
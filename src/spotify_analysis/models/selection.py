@@ -0,0 +1,203 @@
+"""Model-driven selection of raw input features."""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import lasso_path
+from sklearn.preprocessing import StandardScaler
+
+from spotify_analysis.config import config
+from spotify_analysis.models import ModelTrainer
+from spotify_analysis.models.contributions import group_matrix
+from spotify_analysis.models.metrics import StreamingRegressionMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureSelector:
+    """Choose the smallest set of raw features within an accuracy tolerance.
+
+    Raw features are ranked either by permutation importance of a reference
+    model (cached per fitted model, see ``permutation_importance``) or by
+    the order in which they enter the Lasso regularisation path. Encoded
+    columns are grouped back onto their raw feature, so the selection
+    shrinks what serving has to compute, not just the model input. The
+    smallest top-``k`` prefix of the ranking whose validation R² is within
+    ``tolerance`` of the full feature set is found by binary search.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        method: Optional[str] = None,
+        tolerance: Optional[float] = None,
+        min_features: Optional[int] = None,
+        cache_dir: Optional[Path] = None
+    ):
+        """Initialize FeatureSelector.
+
+        Args:
+            model_name: Model used to score candidate feature sets. If None,
+                uses ``config.feature_selection_config['model_name']``.
+            method: ``'importance'`` or ``'l1'``.
+            tolerance: Maximum allowed drop in validation R².
+            min_features: Smallest number of raw features to keep.
+            cache_dir: Cache directory for permutation importances.
+        """
+        selection_config = config.feature_selection_config
+        self.model_name = model_name or selection_config['model_name']
+        self.method = method or selection_config['method']
+        if self.method not in ('importance', 'l1'):
+            raise ValueError(
+                f"Unknown selection method: {self.method}. Choose from ['importance', 'l1']"
+            )
+        self.tolerance = tolerance if tolerance is not None else selection_config['tolerance']
+        self.min_features = min_features or selection_config['min_features']
+        self.cache_dir = cache_dir
+        self.features = config.numerical_features + config.categorical_features
+        self.ranking_: Optional[List[str]] = None
+        self.scores_: Dict[int, float] = {}
+        self.selected_features_: Optional[List[str]] = None
+
+    def _score(
+        self,
+        features: Sequence[str],
+        X_train: pd.DataFrame,
+        y_train: np.ndarray,
+        X_val: pd.DataFrame,
+        y_val: np.ndarray
+    ) -> float:
+        """Validation R² of the model trained on ``features`` only."""
+        trainer = ModelTrainer(self.model_name).fit_frame(
+            X_train, y_train, features=features, checkpoint=False
+        )
+        y_pred = trainer.predict(trainer.transform(X_val))
+        return StreamingRegressionMetrics().update(y_val, y_pred).compute('val')['val_r2']
+
+    def rank_by_importance(
+        self,
+        reference: ModelTrainer,
+        X_val: pd.DataFrame,
+        y_val: np.ndarray
+    ) -> List[str]:
+        """Rank raw features by the summed permutation importance of their columns.
+
+        Args:
+            reference: Trainer fitted with ``fit_frame`` on all features.
+            X_val: Raw validation features.
+            y_val: Validation target.
+
+        Returns:
+            Raw feature names, most important first.
+        """
+        importance = reference.get_feature_importance(
+            reference.feature_names, reference.transform(X_val), y_val,
+            method='permutation', cache_dir=self.cache_dir
+        ).set_index('feature').loc[reference.feature_names, 'importance'].to_numpy()
+        grouped = importance @ group_matrix(reference.feature_names, self.features)
+        return [self.features[i] for i in np.argsort(-grouped, kind='stable')]
+
+    def rank_by_l1_path(self, X_train: pd.DataFrame, y_train: np.ndarray) -> List[str]:
+        """Rank raw features by how early any of their columns enters the Lasso path.
+
+        Args:
+            X_train: Raw training features.
+            y_train: Training target.
+
+        Returns:
+            Raw feature names, earliest (strongest) first.
+        """
+        preprocessor = ModelTrainer('lasso').create_preprocessor()
+        X = StandardScaler().fit_transform(preprocessor.fit_transform(X_train))
+        y = np.asarray(y_train, dtype=float)
+        _, coefs, _ = lasso_path(X, y - y.mean())
+
+        active = coefs != 0
+        n_alphas = coefs.shape[1]
+        entry = np.where(active.any(axis=1), active.argmax(axis=1), n_alphas).astype(float)
+        # Among columns entering at the same alpha, prefer larger final coefficients
+        final = np.abs(coefs[:, -1])
+        entry -= 0.5 * final / (final.max() + 1e-12)
+
+        # A raw feature enters with the earliest of its encoded columns
+        mapping = group_matrix(preprocessor.get_feature_names(), self.features).astype(bool)
+        earliest = np.array([
+            entry[mapping[:, j]].min() if mapping[:, j].any() else n_alphas + 1
+            for j in range(len(self.features))
+        ])
+        return [self.features[i] for i in np.argsort(earliest, kind='stable')]
+
+    def fit(
+        self,
+        X_train: pd.DataFrame,
+        y_train: np.ndarray,
+        X_val: pd.DataFrame,
+        y_val: np.ndarray,
+        reference: Optional[ModelTrainer] = None
+    ) -> 'FeatureSelector':
+        """Rank features and select the smallest set within the tolerance.
+
+        Args:
+            X_train: Raw training features.
+            y_train: Training target.
+            X_val: Raw validation features.
+            y_val: Validation target.
+            reference: Trainer already fitted with ``fit_frame`` on all
+                features, reused for importances and the baseline score.
+
+        Returns:
+            Self for method chaining.
+        """
+        y_train, y_val = np.asarray(y_train), np.asarray(y_val)
+        n_features = len(self.features)
+
+        if reference is None:
+            reference = ModelTrainer(self.model_name).fit_frame(X_train, y_train, checkpoint=False)
+        y_pred = reference.predict(reference.transform(X_val))
+        baseline = StreamingRegressionMetrics().update(y_val, y_pred).compute('val')['val_r2']
+        self.scores_ = {n_features: baseline}
+
+        if self.method == 'importance':
+            self.ranking_ = self.rank_by_importance(reference, X_val, y_val)
+        else:
+            self.ranking_ = self.rank_by_l1_path(X_train, y_train)
+
+        low, high = min(self.min_features, n_features), n_features
+        while low < high:
+            k = (low + high) // 2
+            if k not in self.scores_:
+                self.scores_[k] = self._score(self.ranking_[:k], X_train, y_train, X_val, y_val)
+            if baseline - self.scores_[k] <= self.tolerance:
+                high = k
+            else:
+                low = k + 1
+
+        self.selected_features_ = self.ranking_[:low]
+        logger.info(
+            f"Selected {low}/{n_features} features (R² {self.scores_[low]:.4f} vs "
+            f"{baseline:.4f} with all): {self.selected_features_}"
+        )
+        return self
+
+    def fit_trainer(self, X: pd.DataFrame, y: np.ndarray, **kwargs) -> ModelTrainer:
+        """Train the selector's model on the selected features only.
+
+        The returned trainer's bundle records the selected features and its
+        preprocessor reads only those columns.
+
+        Args:
+            X: Raw training features.
+            y: Training target.
+            **kwargs: Extra arguments for ``ModelTrainer.fit``.
+
+        Returns:
+            Fitted ModelTrainer.
+        """
+        if self.selected_features_ is None:
+            raise ValueError("Selector not fitted. Call fit() first.")
+        return ModelTrainer(self.model_name).fit_frame(
+            X, y, features=self.selected_features_, **kwargs
+        )
@@ -0,0 +1,251 @@
+"""Stacking ensemble over cached out-of-fold base-model predictions."""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, cross_val_predict
+
+from spotify_analysis.config import config
+from spotify_analysis.models import ModelComparison, ModelTrainer
+from spotify_analysis.models.metrics import StreamingRegressionMetrics
+from spotify_analysis.utils.fingerprint import fingerprint_data
+
+logger = logging.getLogger(__name__)
+
+
+class StackingEnsemble:
+    """Stack base-model predictions with a swappable meta-learner.
+
+    Out-of-fold (OOF) predictions of every base model are computed once and
+    persisted under ``cache_dir`` keyed by a fingerprint of the training data,
+    the base-model configurations and the CV settings, together with the base
+    models refitted on the full data. The meta-learner is trained on the OOF
+    matrix, so it can be retrained or replaced without touching the base
+    models.
+    """
+
+    def __init__(
+        self,
+        base_models: Optional[List[str]] = None,
+        meta_model: Any = None,
+        cv: Optional[Dict[str, Any]] = None,
+        cache_dir: Optional[Path] = None,
+        n_jobs: int = -1
+    ):
+        """Initialize StackingEnsemble.
+
+        Args:
+            base_models: Names of base models. If None, uses all configured models.
+            meta_model: Meta-learner estimator or configured model name. If None,
+                uses a non-negative linear blend.
+            cv: K-fold settings. If None, uses ``config.cv_config``.
+            cache_dir: Directory for cached OOF predictions and base models.
+            n_jobs: Parallel jobs for the CV folds.
+        """
+        self.base_models = list(base_models or config.model_configs.keys())
+        self.meta_model = self._make_meta(meta_model)
+        self.cv = dict(cv or config.cv_config)
+        self.cache_dir = Path(cache_dir or config.cache_dir) / 'stacking'
+        self.n_jobs = n_jobs
+        self.trainers: Dict[str, ModelTrainer] = {}
+        self.oof_predictions: Optional[np.ndarray] = None
+        self.y_train: Optional[np.ndarray] = None
+        self.fingerprint: Optional[str] = None
+        self.is_fitted = False
+
+    @staticmethod
+    def _make_meta(meta_model: Any):
+        """Resolve a meta-learner specification to an unfitted estimator."""
+        if meta_model is None:
+            return LinearRegression(positive=True)
+        if isinstance(meta_model, str):
+            return ModelTrainer(meta_model).model
+        return clone(meta_model)
+
+    def _fingerprint(self, X: np.ndarray, y: np.ndarray) -> str:
+        """Fingerprint of everything the OOF predictions depend on."""
+        configs = {name: config.get_model_config(name) for name in self.base_models}
+        return fingerprint_data(X, y, self.base_models, configs, self.cv)
+
+    def _cache_file(self) -> Path:
+        """Path of the cached base-model state."""
+        return self.cache_dir / f"{self.fingerprint}.pkl"
+
+    def fit_base_models(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        fitted: Optional[Dict[str, ModelTrainer]] = None,
+        use_cache: bool = True
+    ) -> 'StackingEnsemble':
+        """Compute OOF predictions and full-data fits for every base model.
+
+        Args:
+            X: Training features.
+            y: Training target.
+            fitted: Base models already fitted on ``(X, y)`` (e.g. from a
+                ModelComparison), reused instead of refitting on the full data.
+            use_cache: Whether to load and save the cached state.
+
+        Returns:
+            Self for method chaining.
+        """
+        y = np.asarray(y, dtype=float)
+        self.fingerprint = self._fingerprint(X, y)
+        cache_file = self._cache_file()
+
+        if use_cache and cache_file.exists():
+            logger.info(f"Loading cached OOF predictions from {cache_file}")
+            state = joblib.load(cache_file)
+            self.oof_predictions = state['oof_predictions']
+            self.trainers = {
+                name: ModelTrainer.from_bundle(bundle) for name, bundle in state['bundles'].items()
+            }
+            self.y_train = y
+            return self
+
+        fitted = fitted or {}
+        folds = KFold(**self.cv)
+        self.oof_predictions = np.empty((len(y), len(self.base_models)))
+
+        for i, name in enumerate(self.base_models):
+            logger.info(f"Computing out-of-fold predictions for {name}")
+            self.oof_predictions[:, i] = cross_val_predict(
+                ModelTrainer(name).model, X, y, cv=folds, n_jobs=self.n_jobs
+            )
+            trainer = fitted.get(name)
+            if trainer is None or not trainer.is_fitted:
+                trainer = ModelTrainer(name).fit(X, y)
+            self.trainers[name] = trainer
+
+        self.y_train = y
+
+        if use_cache:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            joblib.dump({
+                'base_models': self.base_models,
+                'oof_predictions': self.oof_predictions,
+                'bundles': {name: t.to_bundle() for name, t in self.trainers.items()}
+            }, cache_file)
+            logger.info(f"Cached OOF predictions to {cache_file}")
+
+        return self
+
+    def fit_meta(self, meta_model: Any = None) -> 'StackingEnsemble':
+        """(Re)train the meta-learner on the cached OOF predictions.
+
+        Args:
+            meta_model: Optional replacement meta-learner (estimator or name).
+
+        Returns:
+            Self for method chaining.
+        """
+        if self.oof_predictions is None:
+            raise ValueError("Base models not fitted. Call fit_base_models() first.")
+
+        if meta_model is not None:
+            self.meta_model = self._make_meta(meta_model)
+        self.meta_model.fit(self.oof_predictions, self.y_train)
+        self.is_fitted = True
+        return self
+
+    def fit(self, X: np.ndarray, y: np.ndarray, **kwargs) -> 'StackingEnsemble':
+        """Fit base models (or load them from cache) and the meta-learner.
+
+        Args:
+            X: Training features.
+            y: Training target.
+            **kwargs: Extra arguments for ``fit_base_models``.
+
+        Returns:
+            Self for method chaining.
+        """
+        return self.fit_base_models(X, y, **kwargs).fit_meta()
+
+    @classmethod
+    def from_comparison(
+        cls,
+        comparison: ModelComparison,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        **kwargs
+    ) -> 'StackingEnsemble':
+        """Build an ensemble over the models of a trained ModelComparison.
+
+        The comparison's fitted models are reused as the full-data base
+        models; only the OOF predictions are computed.
+
+        Args:
+            comparison: ModelComparison trained on ``(X_train, y_train)``.
+            X_train: Training features.
+            y_train: Training target.
+            **kwargs: Extra arguments for the constructor.
+
+        Returns:
+            Fitted StackingEnsemble.
+        """
+        ensemble = cls(base_models=comparison.model_names, **kwargs)
+        return ensemble.fit(X_train, y_train, fitted=comparison.trainers)
+
+    def base_predictions(self, X: np.ndarray) -> np.ndarray:
+        """Predict with every base model into one ``(n_samples, n_models)`` matrix.
+
+        Args:
+            X: Features.
+
+        Returns:
+            Matrix of base-model predictions.
+        """
+        if not self.trainers:
+            raise ValueError("Base models not fitted. Call fit_base_models() first.")
+
+        predictions = np.empty((len(X), len(self.base_models)))
+        for i, name in enumerate(self.base_models):
+            predictions[:, i] = self.trainers[name].predict(X)
+        return predictions
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict with the stacked ensemble.
+
+        Args:
+            X: Features.
+
+        Returns:
+            Predictions array.
+        """
+        if not self.is_fitted:
+            raise ValueError("Ensemble not fitted. Call fit() first.")
+        return self.meta_model.predict(self.base_predictions(X))
+
+    def evaluate(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        dataset_name: str = 'test'
+    ) -> Dict[str, float]:
+        """Evaluate the ensemble.
+
+        Args:
+            X: Features.
+            y: True target values.
+            dataset_name: Name of the dataset (prefix for metric names).
+
+        Returns:
+            Dictionary of metrics.
+        """
+        return StreamingRegressionMetrics().update(y, self.predict(X)).compute(dataset_name)
+
+    def get_weights(self) -> Dict[str, float]:
+        """Meta-learner coefficients per base model, if it is linear.
+
+        Returns:
+            Dictionary mapping base model name to its weight.
+        """
+        if not hasattr(self.meta_model, 'coef_'):
+            return {}
+        return dict(zip(self.base_models, np.ravel(self.meta_model.coef_).tolist()))
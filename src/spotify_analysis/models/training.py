@@ -0,0 +1,388 @@
+"""Iterative fitting with time budgets and resumable checkpoints."""
+
+import copy
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+import sklearn
+import xgboost as xgb
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from xgboost import XGBRegressor
+from xgboost.callback import TrainingCallback
+
+from spotify_analysis.config import config
+from spotify_analysis.utils.fingerprint import fingerprint_data
+
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """Wall-clock deadline that can also be cancelled explicitly.
+
+    A deadline may be nested in a parent (e.g. a per-model budget inside a
+    global one); it then expires at the earlier of the two.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional['Deadline'] = None):
+        """Initialize Deadline.
+
+        Args:
+            seconds: Time budget from now. None for no own limit.
+            parent: Enclosing deadline whose expiry and cancellation also apply.
+        """
+        expiries = []
+        if seconds is not None:
+            expiries.append(time.monotonic() + seconds)
+        if parent is not None and parent.expires_at is not None:
+            expiries.append(parent.expires_at)
+        self.expires_at = min(expiries) if expiries else None
+        self.parent = parent
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if unlimited."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cancel(self):
+        """Expire the deadline immediately."""
+        self._cancelled.set()
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed or was cancelled."""
+        if self._cancelled.is_set() or (self.parent is not None and self.parent.expired):
+            return True
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class Checkpointer:
+    """Periodically persist the partial state of an iterative fit.
+
+    Checkpoints are written atomically (temporary file plus rename), so a
+    process killed mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, path: Path, interval_s: Optional[float] = None):
+        """Initialize Checkpointer.
+
+        Args:
+            path: Checkpoint file.
+            interval_s: Minimum seconds between checkpoints. If None, uses
+                ``config.training_config['checkpoint_interval_s']``.
+        """
+        self.path = Path(path)
+        if interval_s is None:
+            interval_s = config.training_config['checkpoint_interval_s']
+        self.interval_s = interval_s
+        self.resumed_from: Optional[int] = None
+        self._last_save = time.monotonic()
+
+    @classmethod
+    def for_fit(
+        cls,
+        model_name: str,
+        model: Any,
+        X: np.ndarray,
+        y: np.ndarray,
+        checkpoint_dir: Optional[Path] = None,
+        interval_s: Optional[float] = None
+    ) -> 'Checkpointer':
+        """Checkpointer keyed by the estimator, library versions and training data.
+
+        The key uses the estimator's actual parameters (``get_params``), so
+        parameters changed after construction, e.g. ``categorical_features``,
+        never resume a checkpoint written for different ones.
+
+        Args:
+            model_name: Name of the model, used in the file name.
+            model: Estimator about to be fitted.
+            X: Training features.
+            y: Training target.
+            checkpoint_dir: Directory for checkpoints. If None, uses
+                ``config.training_config['checkpoint_dir']``.
+            interval_s: Minimum seconds between checkpoints.
+
+        Returns:
+            Checkpointer for this fit.
+        """
+        checkpoint_dir = Path(checkpoint_dir or config.training_config['checkpoint_dir'])
+        key = fingerprint_data(
+            X, y, type(model).__name__, model.get_params(deep=False),
+            {'sklearn': sklearn.__version__, 'xgboost': xgb.__version__}
+        )
+        return cls(checkpoint_dir / f"{model_name}_{key}.ckpt", interval_s)
+
+    def due(self) -> bool:
+        """Whether the checkpoint interval has elapsed."""
+        return time.monotonic() - self._last_save >= self.interval_s
+
+    def save(self, state: Any, n_iterations: int):
+        """Write a checkpoint.
+
+        Args:
+            state: Picklable partial model state.
+            n_iterations: Number of rounds or trees in ``state``.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        joblib.dump({'n_iterations': n_iterations, 'state': state}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+        logger.debug(f"Checkpointed {n_iterations} iterations to {self.path}")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Read the checkpoint, or None if there is none."""
+        if not self.path.exists():
+            return None
+        return joblib.load(self.path)
+
+    def clear(self):
+        """Remove the checkpoint after a completed fit."""
+        self.path.unlink(missing_ok=True)
+
+
+class _IterationCallback(TrainingCallback):
+    """XGBoost callback that hands the booster to ``on_round`` after each round."""
+
+    def __init__(self, on_round: Callable[[xgb.Booster], bool]):
+        super().__init__()
+        self.on_round = on_round
+
+    def after_iteration(self, model, epoch: int, evals_log) -> bool:
+        return bool(self.on_round(model))
+
+
+def is_iterative(model: Any) -> bool:
+    """Whether ``model`` can be fitted incrementally and stopped early."""
+    return isinstance(model, (GradientBoostingRegressor, XGBRegressor, RandomForestRegressor))
+
+
+def target_iterations(model: Any) -> Optional[int]:
+    """Number of boosting rounds or trees a complete fit produces."""
+    if not is_iterative(model):
+        return None
+    return model.get_params()['n_estimators'] or 100
+
+
+def fitted_iterations(model: Any) -> Optional[int]:
+    """Number of boosting rounds or trees currently fitted."""
+    if isinstance(model, GradientBoostingRegressor):
+        return getattr(model, 'n_estimators_', 0)
+    if isinstance(model, XGBRegressor):
+        try:
+            return model.get_booster().num_boosted_rounds()
+        except Exception:
+            return 0
+    if isinstance(model, RandomForestRegressor):
+        return len(getattr(model, 'estimators_', []))
+    return None
+
+
+def _gradient_boosting_snapshot(model: GradientBoostingRegressor, n_stages: int):
+    """Copy of a gradient boosting model truncated to its first ``n_stages``."""
+    snapshot = copy.copy(model)
+    snapshot.estimators_ = model.estimators_[:n_stages]
+    snapshot.train_score_ = model.train_score_[:n_stages]
+    if hasattr(model, 'oob_improvement_'):
+        snapshot.oob_improvement_ = model.oob_improvement_[:n_stages]
+        snapshot.oob_scores_ = model.oob_scores_[:n_stages]
+        snapshot.oob_score_ = snapshot.oob_scores_[-1]
+    snapshot.n_estimators_ = n_stages
+    return snapshot
+
+
+def _restore_state(model: Any, state: Any) -> Optional[xgb.Booster]:
+    """Load checkpointed state into ``model``; XGBoost returns the booster instead."""
+    if isinstance(model, XGBRegressor):
+        booster = xgb.Booster()
+        booster.load_model(bytearray(state))
+        return booster
+    params = model.get_params(deep=False)
+    for name, value in vars(state).items():
+        if name not in params:
+            setattr(model, name, value)
+    return None
+
+
+def iterative_fit(
+    model: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    should_stop: Callable[[int], bool],
+    forest_step: Optional[int] = None,
+    checkpointer: Optional[Checkpointer] = None
+) -> Any:
+    """Fit ``model``, asking ``should_stop`` after every increment.
+
+    Gradient boosting and XGBoost are checked after each boosting round,
+    random forests after every ``forest_step`` trees (grown with
+    ``warm_start``). When ``should_stop(n_done)`` returns True, fitting ends
+    and the model keeps the rounds or trees fitted so far. Other estimators
+    are fitted in one call.
+
+    With a ``checkpointer``, the partial model is saved whenever the
+    checkpoint interval has elapsed and when fitting is stopped early, and
+    an existing checkpoint is resumed instead of starting over. The
+    checkpoint is removed once the fit completes.
+
+    Args:
+        model: Estimator to fit in place.
+        X: Training features.
+        y: Training target.
+        should_stop: Callable receiving the number of fitted iterations.
+        forest_step: Trees added per random forest increment. If None, uses
+            ``config.training_config['forest_step']``.
+        checkpointer: Checkpointer for periodic saves and resumption.
+
+    Returns:
+        The fitted model.
+    """
+    if not is_iterative(model):
+        return model.fit(X, y)
+
+    target = target_iterations(model)
+    resumed = None
+    checkpoint = checkpointer.load() if checkpointer is not None else None
+    if checkpoint is not None and checkpoint['n_iterations'] < target:
+        resumed = _restore_state(model, checkpoint['state'])
+        checkpointer.resumed_from = checkpoint['n_iterations']
+        logger.info(
+            f"Resuming {type(model).__name__} from checkpoint at "
+            f"{checkpoint['n_iterations']}/{target} iterations"
+        )
+
+    def step(n_done: int, snapshot: Callable[[], Any]) -> bool:
+        stop = bool(should_stop(n_done))
+        if checkpointer is not None and n_done < target and (stop or checkpointer.due()):
+            checkpointer.save(snapshot(), n_done)
+        return stop
+
+    if isinstance(model, GradientBoostingRegressor):
+        warm_start = model.warm_start
+        if checkpointer is not None and checkpointer.resumed_from is not None:
+            model.set_params(warm_start=True)
+        try:
+            model.fit(X, y, monitor=lambda i, est, local_vars: step(
+                i + 1, lambda: _gradient_boosting_snapshot(est, i + 1)
+            ))
+        finally:
+            model.set_params(warm_start=warm_start)
+
+    elif isinstance(model, XGBRegressor):
+        n_rounds = target - (resumed.num_boosted_rounds() if resumed is not None else 0)
+        model.set_params(
+            n_estimators=n_rounds,
+            callbacks=[_IterationCallback(lambda booster: step(
+                booster.num_boosted_rounds(), lambda: bytes(booster.save_raw(raw_format='ubj'))
+            ))]
+        )
+        try:
+            model.fit(X, y, xgb_model=resumed)
+        finally:
+            # Callbacks hold the deadline and must not be pickled with the model
+            model.set_params(n_estimators=target, callbacks=None)
+
+    else:
+        step_size = forest_step or config.training_config['forest_step']
+        warm_start = model.warm_start
+        resumed = checkpointer is not None and checkpointer.resumed_from is not None
+        keep_trees = warm_start or resumed
+        n_trees = len(getattr(model, 'estimators_', [])) if keep_trees else 0
+        model.set_params(warm_start=True)
+        try:
+            if n_trees == 0 and hasattr(model, 'estimators_'):
+                del model.estimators_
+            while n_trees < target:
+                n_trees = min(target, n_trees + step_size)
+                model.set_params(n_estimators=n_trees)
+                model.fit(X, y)
+                if step(n_trees, lambda: model):
+                    break
+        finally:
+            model.set_params(n_estimators=target, warm_start=warm_start)
+
+    if checkpointer is not None and fitted_iterations(model) >= target:
+        checkpointer.clear()
+    return model
+
+
+def fit_with_budget(
+    model: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    deadline: Deadline,
+    grace: Optional[float] = None,
+    forest_step: Optional[int] = None,
+    checkpointer: Optional[Checkpointer] = None
+) -> Tuple[Any, bool]:
+    """Fit ``model`` in a worker thread that is stopped at ``deadline``.
+
+    Iterative models stop cooperatively at the next round/tree increment
+    after the deadline and keep their partial state. A worker that does not
+    stop within ``grace`` seconds of the deadline (e.g. a linear model in a
+    single long solver call) is abandoned, since Python threads cannot be
+    killed; the caller must discard ``model`` in that case.
+
+    Args:
+        model: Estimator to fit in place.
+        X: Training features.
+        y: Training target.
+        deadline: Deadline for the fit.
+        grace: Seconds to wait for the worker to stop after the deadline.
+            If None, uses ``config.training_config['cancel_grace_s']``.
+        forest_step: Trees added per random forest increment.
+        checkpointer: Checkpointer for periodic saves and resumption; a fit
+            cut short by the deadline leaves a checkpoint to resume from.
+
+    Returns:
+        Tuple of (fitted model, whether the fit was cut short).
+
+    Raises:
+        TimeoutError: If the deadline passed before a usable model existed.
+    """
+    grace = config.training_config['cancel_grace_s'] if grace is None else grace
+    outcome = {}
+
+    def should_stop(n_done: int) -> bool:
+        if deadline.expired:
+            outcome['stopped_at'] = n_done
+            return True
+        return False
+
+    def work():
+        try:
+            iterative_fit(
+                model, X, y, should_stop, forest_step=forest_step, checkpointer=checkpointer
+            )
+        except BaseException as e:  # re-raised in the calling thread
+            outcome['error'] = e
+
+    worker = threading.Thread(target=work, name=f"fit-{type(model).__name__}", daemon=True)
+    worker.start()
+    worker.join(deadline.remaining())
+    if worker.is_alive():
+        deadline.cancel()
+        worker.join(grace)
+    if worker.is_alive():
+        raise TimeoutError(
+            f"{type(model).__name__} did not finish or stop within its time budget"
+        )
+    if 'error' in outcome:
+        raise outcome['error']
+
+    target = target_iterations(model)
+    timed_out = 'stopped_at' in outcome and (target is None or outcome['stopped_at'] < target)
+    if timed_out:
+        logger.warning(
+            f"{type(model).__name__} stopped at the time budget after "
+            f"{fitted_iterations(model)}/{target} iterations"
+        )
+    return model, timed_out
@@ -0,0 +1,352 @@
+"""Repeated and nested cross-validation with cached fold preprocessing."""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import KFold, ParameterGrid, RepeatedKFold
+
+from spotify_analysis.config import config
+from spotify_analysis.data import DataPreprocessor
+from spotify_analysis.models.metrics import StreamingRegressionMetrics
+from spotify_analysis.utils.fingerprint import fingerprint_data
+
+logger = logging.getLogger(__name__)
+
+LOWER_IS_BETTER = ('mae', 'mse', 'rmse')
+
+Fold = Union[Path, Dict[str, Any]]
+
+
+def transform_fold(
+    X: Union[pd.DataFrame, np.ndarray],
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    val_idx: np.ndarray,
+    categorical_encoding: str = 'onehot'
+) -> Dict[str, Any]:
+    """Fit the fold preprocessor on the training rows and transform both parts.
+
+    Args:
+        X: Raw features DataFrame, or an already transformed matrix.
+        y: Target.
+        train_idx: Training row indices.
+        val_idx: Validation row indices.
+        categorical_encoding: Encoding for the fold preprocessor.
+
+    Returns:
+        Fold dictionary with matrices, targets and the fitted preprocessor.
+    """
+    if not isinstance(X, pd.DataFrame):
+        return {
+            'X_train': X[train_idx], 'X_val': X[val_idx],
+            'y_train': y[train_idx], 'y_val': y[val_idx],
+            'preprocessor': None, 'categorical_mask': None
+        }
+
+    preprocessor = DataPreprocessor(categorical_encoding=categorical_encoding)
+    return {
+        'X_train': preprocessor.fit_transform(X.iloc[train_idx]),
+        'X_val': preprocessor.transform(X.iloc[val_idx]),
+        'y_train': y[train_idx],
+        'y_val': y[val_idx],
+        'preprocessor': preprocessor,
+        'categorical_mask': preprocessor.get_categorical_mask()
+    }
+
+
+class FoldCache:
+    """Fit and cache one preprocessor and transformed matrices per fold.
+
+    Folds are keyed by the data, the row indices and the categorical
+    encoding, so every model sharing an encoding, every parameter candidate
+    and every re-run reuses the same fold. Cached folds are written
+    uncompressed and loaded memory-mapped, so worker processes share them
+    without copying.
+    """
+
+    def __init__(
+        self,
+        X: Union[pd.DataFrame, np.ndarray],
+        y: np.ndarray,
+        categorical_encoding: str = 'onehot',
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True
+    ):
+        """Initialize FoldCache.
+
+        Args:
+            X: Raw features DataFrame, or an already transformed matrix.
+            y: Target.
+            categorical_encoding: Encoding for the fold preprocessors.
+            cache_dir: Base cache directory. If None, uses ``config.cache_dir``.
+            use_cache: Whether to persist folds on disk.
+        """
+        self.X = X
+        self.y = np.asarray(y)
+        self.categorical_encoding = categorical_encoding
+        self.cache_dir = Path(cache_dir or config.cache_dir) / 'folds'
+        self.use_cache = use_cache and isinstance(X, pd.DataFrame)
+        self.data_fingerprint = (
+            fingerprint_data(X, self.y, config.numerical_features, config.categorical_features)
+            if self.use_cache else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, train_idx: np.ndarray, val_idx: np.ndarray) -> Fold:
+        """Get a fold, preprocessing it only if it is not cached.
+
+        Args:
+            train_idx: Training row indices.
+            val_idx: Validation row indices.
+
+        Returns:
+            Path of the cached fold or, when not caching, the row indices
+            (with references to the data) that ``load_fold`` turns into the
+            fold. Uncached folds are thus built one at a time in the worker
+            that scores them rather than all upfront in the calling process.
+        """
+        if not self.use_cache:
+            return {
+                'X': self.X, 'y': self.y, 'train_idx': train_idx, 'val_idx': val_idx,
+                'categorical_encoding': self.categorical_encoding
+            }
+
+        key = fingerprint_data(
+            self.data_fingerprint, train_idx, val_idx, self.categorical_encoding
+        )
+        path = self.cache_dir / f"{key}.joblib"
+        if path.exists():
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(
+            transform_fold(self.X, self.y, train_idx, val_idx, self.categorical_encoding), path
+        )
+        return path
+
+
+def load_fold(fold: Fold) -> Dict[str, Any]:
+    """Load a fold prepared by ``FoldCache.prepare``.
+
+    Args:
+        fold: Path of a cached fold or the indices of an uncached one.
+
+    Returns:
+        Fold dictionary with matrices, targets and the fitted preprocessor.
+    """
+    if isinstance(fold, Path):
+        return joblib.load(fold, mmap_mode='r')
+    if 'train_idx' in fold:
+        return transform_fold(
+            fold['X'], fold['y'], fold['train_idx'], fold['val_idx'],
+            fold['categorical_encoding']
+        )
+    return fold
+
+
+def fit_and_score(
+    estimator: Any,
+    fold: Fold,
+    params: Optional[Dict[str, Any]] = None,
+    n_jobs: Optional[int] = None
+) -> Dict[str, float]:
+    """Fit a clone of ``estimator`` on a fold and score it on the validation rows.
+
+    Args:
+        estimator: Unfitted estimator template.
+        fold: Fold from ``FoldCache.prepare``.
+        params: Parameters set on the clone before fitting.
+        n_jobs: Threads for the estimator itself, if it has ``n_jobs``
+            (1 when folds are already fitted in parallel). If None, keeps
+            the estimator's setting.
+
+    Returns:
+        Dictionary with ``cv_mae``, ``cv_mse``, ``cv_rmse`` and ``cv_r2``.
+    """
+    data = load_fold(fold)
+    model = clone(estimator).set_params(**(params or {}))
+    if n_jobs is not None and 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    mask = data['categorical_mask']
+    if mask is not None and any(mask) and 'categorical_features' in model.get_params():
+        model.set_params(categorical_features=list(mask))
+    model.fit(data['X_train'], data['y_train'])
+    y_pred = model.predict(data['X_val'])
+    return StreamingRegressionMetrics().update(data['y_val'], y_pred).compute('cv')
+
+
+def summarize_folds(fold_scores: Sequence[Dict[str, float]]) -> Dict[str, float]:
+    """Mean and standard deviation of every metric over folds.
+
+    Args:
+        fold_scores: Metrics per fold.
+
+    Returns:
+        Dictionary with ``<metric>_mean`` and ``<metric>_std`` entries.
+    """
+    frame = pd.DataFrame(list(fold_scores))
+    summary = {}
+    for metric in frame.columns:
+        summary[f'{metric}_mean'] = float(frame[metric].mean())
+        summary[f'{metric}_std'] = float(frame[metric].std(ddof=0))
+    return summary
+
+
+def run_repeated_cv(
+    estimator: Any,
+    X: Union[pd.DataFrame, np.ndarray],
+    y: np.ndarray,
+    n_splits: Optional[int] = None,
+    n_repeats: int = 3,
+    categorical_encoding: str = 'onehot',
+    n_jobs: int = -1,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    random_state: Optional[int] = None
+) -> Dict[str, Any]:
+    """Repeated K-fold cross-validation with cached fold preprocessing.
+
+    Each fold's preprocessor is fitted on its training rows only. Cached
+    folds are prepared in the calling process; uncached ones are built from
+    their indices by the worker that fits them. The model fits are scheduled
+    on worker processes, each estimator limited to one thread.
+
+    Args:
+        estimator: Unfitted estimator template.
+        X: Raw features DataFrame, or an already transformed matrix.
+        y: Target.
+        n_splits: Folds per repeat. If None, uses ``config.cv_config['n_splits']``.
+        n_repeats: Number of repeats with different shuffles.
+        categorical_encoding: Encoding for the fold preprocessors.
+        n_jobs: Worker processes for the fits.
+        use_cache: Whether to cache fold preprocessing on disk.
+        cache_dir: Base cache directory.
+        random_state: Random seed for the fold shuffles.
+
+    Returns:
+        Dictionary with ``cv_<metric>_mean``/``_std`` and the per-fold
+        scores under ``'folds'``.
+    """
+    n_splits = n_splits or config.cv_config['n_splits']
+    if random_state is None:
+        random_state = config.cv_config['random_state']
+
+    cache = FoldCache(X, y, categorical_encoding, cache_dir, use_cache)
+    splitter = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    model_jobs = 1 if n_jobs != 1 else None
+
+    fold_scores = Parallel(n_jobs=n_jobs)(
+        delayed(fit_and_score)(estimator, cache.prepare(train_idx, val_idx), n_jobs=model_jobs)
+        for train_idx, val_idx in splitter.split(X)
+    )
+    logger.info(
+        f"Repeated CV: {len(fold_scores)} folds "
+        f"({cache.hits} cached, {cache.misses} preprocessed)"
+    )
+    return {**summarize_folds(fold_scores), 'folds': fold_scores}
+
+
+def _is_better(score: float, best: Optional[float], scoring: str) -> bool:
+    """Whether ``score`` improves on ``best`` for the given metric."""
+    if best is None:
+        return True
+    return score < best if scoring in LOWER_IS_BETTER else score > best
+
+
+def run_nested_cv(
+    estimator: Any,
+    X: Union[pd.DataFrame, np.ndarray],
+    y: np.ndarray,
+    param_grid: Union[Dict[str, Sequence], List[Dict[str, Sequence]]],
+    n_splits: Optional[int] = None,
+    inner_splits: int = 3,
+    n_repeats: int = 1,
+    scoring: str = 'r2',
+    categorical_encoding: str = 'onehot',
+    n_jobs: int = -1,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    random_state: Optional[int] = None
+) -> Dict[str, Any]:
+    """Nested cross-validation: grid search in inner folds, evaluation in outer folds.
+
+    Inner folds are drawn from each outer training set and, when caching,
+    preprocessed once and shared by every parameter candidate (uncached
+    folds are rebuilt by each worker from their indices). All inner fits of all outer
+    folds are scheduled in one parallel batch, followed by the outer refits.
+
+    Args:
+        estimator: Unfitted estimator template.
+        X: Raw features DataFrame, or an already transformed matrix.
+        y: Target.
+        param_grid: Parameter grid for the inner search.
+        n_splits: Outer folds per repeat. If None, uses ``config.cv_config['n_splits']``.
+        inner_splits: Inner folds.
+        n_repeats: Number of outer repeats.
+        scoring: Metric used to select parameters (``'mae'``, ``'mse'``,
+            ``'rmse'`` or ``'r2'``).
+        categorical_encoding: Encoding for the fold preprocessors.
+        n_jobs: Worker processes for the fits.
+        use_cache: Whether to cache fold preprocessing on disk.
+        cache_dir: Base cache directory.
+        random_state: Random seed for the fold shuffles.
+
+    Returns:
+        Dictionary with outer ``cv_<metric>_mean``/``_std``, the selected
+        parameters per outer fold under ``'best_params'`` and the outer
+        scores under ``'folds'``.
+    """
+    if scoring not in LOWER_IS_BETTER + ('r2',):
+        raise ValueError(f"Unknown scoring metric: {scoring}")
+    n_splits = n_splits or config.cv_config['n_splits']
+    if random_state is None:
+        random_state = config.cv_config['random_state']
+
+    cache = FoldCache(X, y, categorical_encoding, cache_dir, use_cache)
+    candidates = list(ParameterGrid(param_grid))
+    outer = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    outer_splits: List[Tuple[np.ndarray, np.ndarray]] = list(outer.split(X))
+    model_jobs = 1 if n_jobs != 1 else None
+
+    inner_tasks = []
+    for o, (outer_train, _) in enumerate(outer_splits):
+        inner = KFold(n_splits=inner_splits, shuffle=True, random_state=random_state)
+        for inner_train, inner_val in inner.split(outer_train):
+            fold = cache.prepare(outer_train[inner_train], outer_train[inner_val])
+            inner_tasks.extend((o, c, fold) for c in range(len(candidates)))
+
+    inner_scores = Parallel(n_jobs=n_jobs)(
+        delayed(fit_and_score)(estimator, fold, candidates[c], model_jobs)
+        for _, c, fold in inner_tasks
+    )
+
+    totals = np.zeros((len(outer_splits), len(candidates)))
+    for (o, c, _), scores in zip(inner_tasks, inner_scores):
+        totals[o, c] += scores[f'cv_{scoring}']
+
+    best_params = []
+    for o in range(len(outer_splits)):
+        best_c, best_score = 0, None
+        for c, score in enumerate(totals[o]):
+            if _is_better(score, best_score, scoring):
+                best_c, best_score = c, score
+        best_params.append(candidates[best_c])
+
+    fold_scores = Parallel(n_jobs=n_jobs)(
+        delayed(fit_and_score)(estimator, cache.prepare(train_idx, val_idx), params, model_jobs)
+        for (train_idx, val_idx), params in zip(outer_splits, best_params)
+    )
+    logger.info(
+        f"Nested CV: {len(outer_splits)} outer folds x {len(candidates)} candidates "
+        f"({cache.hits} cached, {cache.misses} preprocessed folds)"
+    )
+    return {**summarize_folds(fold_scores), 'best_params': best_params, 'folds': fold_scores}
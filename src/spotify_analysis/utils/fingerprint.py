@@ -0,0 +1,111 @@
+"""Content fingerprints for data, configurations and fitted models."""
+
+import hashlib
+import json
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def _update_with_data(hasher, data: Any):
+    """Feed one array-like or JSON-serialisable object into a hasher."""
+    if isinstance(data, pd.DataFrame):
+        hasher.update(json.dumps(list(map(str, data.columns))).encode())
+        hasher.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif isinstance(data, pd.Series):
+        hasher.update(str(data.name).encode())
+        hasher.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        array = np.ascontiguousarray(data)
+        hasher.update(f"{array.dtype.str}{array.shape}".encode())
+        hasher.update(array.tobytes())
+    else:
+        hasher.update(json.dumps(data, sort_keys=True, default=str).encode())
+
+
+def fingerprint_data(*items: Any, length: int = 16) -> str:
+    """Compute a stable fingerprint of arrays, DataFrames or plain objects.
+
+    Args:
+        *items: Arrays, DataFrames, Series or JSON-serialisable objects.
+        length: Number of hex characters to keep.
+
+    Returns:
+        Hex digest identifying the content of ``items``.
+    """
+    hasher = hashlib.sha256()
+    for item in items:
+        _update_with_data(hasher, item)
+    return hasher.hexdigest()[:length]
+
+
+_MAX_STATE_DEPTH = 32
+
+
+def _update_with_state(hasher, value: Any, depth: int = 0):
+    """Feed the state of a (fitted) object into a hasher.
+
+    Attributes, containers and arrays are walked in a fixed order, so the
+    digest does not depend on object identity the way pickled bytes do.
+    Structured arrays are hashed field by field (their padding bytes are
+    undefined) and XGBoost boosters through their serialised model.
+    """
+    if depth > _MAX_STATE_DEPTH:
+        hasher.update(type(value).__name__.encode())
+    elif isinstance(value, np.ndarray):
+        if value.dtype.names:
+            for name in value.dtype.names:
+                _update_with_data(hasher, value[name])
+        elif value.dtype == object:
+            hasher.update(f"object{value.shape}".encode())
+            for item in value.ravel():
+                _update_with_state(hasher, item, depth + 1)
+        else:
+            _update_with_data(hasher, value)
+    elif isinstance(value, np.generic):
+        hasher.update(repr(value.item()).encode())
+    elif value is None or isinstance(value, (bool, int, float, str, bytes)):
+        hasher.update(repr(value).encode())
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_with_state(hasher, item, depth + 1)
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            hasher.update(str(key).encode())
+            _update_with_state(hasher, value[key], depth + 1)
+    elif hasattr(value, 'save_raw'):
+        hasher.update(bytes(value.save_raw('ubj')))
+    else:
+        hasher.update(type(value).__name__.encode())
+        try:
+            state = value.__getstate__()
+        except Exception:
+            state = None
+        if state is not None and state is not value:
+            _update_with_state(hasher, state, depth + 1)
+
+
+def fingerprint_model(model: Any, *identity: Any, length: int = 16) -> str:
+    """Compute a stable fingerprint of a fitted model.
+
+    Hashes the estimator class and its state (hyperparameters and learned
+    attributes such as coefficients, tree nodes or the XGBoost booster), plus
+    ``identity`` items. Unlike the pickled bytes, the result survives a
+    save/load round trip and is the same in every process. Nothing about the
+    training data is hashed, so the cost is paid only when a key is needed.
+
+    Args:
+        model: Fitted estimator.
+        *identity: Extra JSON-serialisable items identifying the model.
+        length: Number of hex characters to keep.
+
+    Returns:
+        Hex digest identifying the fitted model.
+    """
+    hasher = hashlib.sha256()
+    for item in (type(model).__name__, *identity):
+        _update_with_data(hasher, item)
+    _update_with_state(hasher, model)
+    return hasher.hexdigest()[:length]
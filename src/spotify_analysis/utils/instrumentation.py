@@ -0,0 +1,246 @@
+"""Lightweight per-stage timing and memory instrumentation."""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from spotify_analysis.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _max_rss_mb() -> Optional[float]:
+    """Peak resident set size of the process so far, in MB."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024**2 if sys.platform == 'darwin' else 1024
+    return max_rss / divisor
+
+
+class RunProfiler:
+    """Collect wall time, CPU time and memory peaks for named stages.
+
+    When disabled, ``stage`` and functions decorated with ``instrument`` skip
+    all measurement, so instrumentation can stay in place permanently.
+    Memory peaks come from ``tracemalloc`` (Python allocations, including
+    NumPy buffers) when ``trace_memory`` is enabled, plus the process peak RSS.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = True):
+        """Initialize RunProfiler.
+
+        Args:
+            enabled: Whether to record stages.
+            trace_memory: Whether to track allocation peaks with tracemalloc.
+        """
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+        self.started_at: Optional[str] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def enable(self, trace_memory: Optional[bool] = None) -> 'RunProfiler':
+        """Start recording stages.
+
+        Args:
+            trace_memory: Override whether to track allocation peaks.
+
+        Returns:
+            Self for method chaining.
+        """
+        if trace_memory is not None:
+            self.trace_memory = trace_memory
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.started_at = self.started_at or datetime.now(timezone.utc).isoformat()
+        self.enabled = True
+        return self
+
+    def disable(self) -> 'RunProfiler':
+        """Stop recording stages (already recorded stages are kept).
+
+        Returns:
+            Self for method chaining.
+        """
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return self
+
+    def reset(self):
+        """Discard all recorded stages."""
+        with self._lock:
+            self.records = []
+            self.started_at = None
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        """Stack of open stages for the current thread."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def stage(self, name: str, **tags: Any) -> Iterator[None]:
+        """Measure a block of code as a named stage.
+
+        Args:
+            name: Stage name.
+            **tags: Extra JSON-serialisable values stored with the record.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        frame = {'name': name, 'peak': 0, 'start_mem': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            frame['start_mem'] = current
+        stack.append(frame)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            stack.pop()
+
+            record = {
+                'stage': name,
+                'parent': stack[-1]['name'] if stack else None,
+                'depth': len(stack),
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'max_rss_mb': _max_rss_mb(),
+                **tags
+            }
+            if tracing:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_alloc_mb'] = (peak - frame['start_mem']) / 1024**2
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+
+            with self._lock:
+                self.records.append(record)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate recorded stages by name.
+
+        Returns:
+            Dictionary mapping stage name to calls, total/max wall time,
+            total CPU time and the largest allocation peak.
+        """
+        summary: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            entry = summary.setdefault(record['stage'], {
+                'calls': 0, 'wall_s': 0.0, 'max_wall_s': 0.0, 'cpu_s': 0.0
+            })
+            entry['calls'] += 1
+            entry['wall_s'] += record['wall_s']
+            entry['max_wall_s'] = max(entry['max_wall_s'], record['wall_s'])
+            entry['cpu_s'] += record['cpu_s']
+            if 'peak_alloc_mb' in record:
+                entry['peak_alloc_mb'] = max(
+                    entry.get('peak_alloc_mb', 0.0), record['peak_alloc_mb']
+                )
+        return summary
+
+    def report(self) -> Dict[str, Any]:
+        """Build a structured run report.
+
+        Returns:
+            Dictionary with run metadata, per-stage summary and raw records.
+        """
+        top_level = [r for r in self.records if r['depth'] == 0]
+        return {
+            'started_at': self.started_at,
+            'pid': os.getpid(),
+            'trace_memory': self.trace_memory,
+            'total_wall_s': sum(r['wall_s'] for r in top_level),
+            'max_rss_mb': _max_rss_mb(),
+            'summary': self.summary(),
+            'stages': list(self.records)
+        }
+
+    def save_report(self, filepath: Optional[Union[str, Path]] = None) -> Path:
+        """Write the run report as JSON.
+
+        Args:
+            filepath: Output path. If None, writes to the logs directory.
+
+        Returns:
+            Path of the written report.
+        """
+        if filepath is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filepath = config.logs_dir / f"run_report_{timestamp}.json"
+
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        logger.info(f"Run report saved to {filepath}")
+        return filepath
+
+
+# Global profiler; set SPOTIFY_PROFILE=1 to enable it at import time
+profiler = RunProfiler(enabled=os.environ.get('SPOTIFY_PROFILE', '') not in ('', '0'))
+if profiler.enabled:
+    profiler.enable()
+
+
+def instrument(name: Optional[str] = None) -> Callable:
+    """Decorate a function so each call is recorded as a profiler stage.
+
+    The name may reference the bound instance, e.g.
+    ``'ModelTrainer.fit[{self.model_name}]'``; it is only formatted while
+    the profiler is enabled.
+
+    Args:
+        name: Stage name. If None, uses the function's qualified name.
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__qualname__
+        needs_format = '{' in stage_name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            label = stage_name.format(self=args[0]) if needs_format and args else stage_name
+            with profiler.stage(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
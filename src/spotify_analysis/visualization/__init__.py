@@ -320,3 +320,53 @@ def plot_residuals(
 
 # Initialize plot style when module is imported
 setup_plot_style()
+
+
+def plot_scaling_benchmark(
+    results: pd.DataFrame,
+    title: str = "Model Scaling Benchmark",
+    save_path: Optional[Path] = None
+) -> plt.Figure:
+    """Plot fit time, predict throughput, peak memory and R² against data size.
+    
+    Args:
+        results: DataFrame from ``benchmarks.results_frame`` with one row per
+            (model, size) run.
+        title: Plot title.
+        save_path: Path to save the figure.
+        
+    Returns:
+        Matplotlib figure.
+    """
+    panels = [
+        ('fit_time_s', 'Fit time (s)', True),
+        ('predict_rows_per_s', 'Predict throughput (rows/s)', True),
+        ('fit_peak_mb', 'Peak allocation during fit (MB)', True),
+        ('test_r2', 'Test R²', False)
+    ]
+    if results['fit_peak_mb'].isna().all():
+        # Allocation peaks are only recorded with trace_memory
+        panels[2] = ('max_rss_mb', 'Peak RSS (MB)', True)
+    
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    
+    for ax, (column, label, log_y) in zip(axes.ravel(), panels):
+        for model_name, group in results.groupby('model'):
+            group = group.sort_values('n_samples')
+            ax.plot(group['n_samples'], group[column], marker='o', linewidth=2, label=model_name)
+        ax.set_xscale('log')
+        if log_y:
+            ax.set_yscale('log')
+        ax.set_xlabel('Samples', fontsize=12)
+        ax.set_ylabel(label, fontsize=12)
+        ax.grid(True, alpha=0.3, which='both')
+    
+    axes[0, 0].legend()
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+    plt.tight_layout()
+    
+    if save_path:
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        logger.info(f"Plot saved to {save_path}")
+    
+    return fig
@@ -4,5 +4,14 @@ import pytest
 import sys
 from pathlib import Path
 
-# Add src to path
+# Add src and the project root (api.py) to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    """Keep training checkpoints out of the project's models directory."""
+    from spotify_analysis.config import config
+    monkeypatch.setitem(config.training_config, 'checkpoint_dir', tmp_path / 'checkpoints')
+    return tmp_path / 'checkpoints'
@@ -0,0 +1,455 @@
+"""Tests for the prediction API."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from spotify_analysis.benchmarks import make_synthetic_data
+from spotify_analysis.config import config
+from spotify_analysis.models import ModelComparison, ModelTrainer
+from spotify_analysis.models.registry import ModelRegistry
+
+EXAMPLE_TRACK = api.TrackFeatures.model_config['json_schema_extra']['example']
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Empty model registry used by the API."""
+    registry = ModelRegistry(tmp_path / 'registry')
+    monkeypatch.setattr(api, 'registry', registry)
+    return registry
+
+
+@pytest.fixture
+def client(registry):
+    """API client serving the demo model."""
+    with TestClient(api.app) as client:
+        yield client
+
+
+def metric(text: str, series: str) -> float:
+    """Value of one series in a Prometheus text exposition (0 if absent)."""
+    for line in text.splitlines():
+        name, _, value = line.rpartition(' ')
+        if name == series:
+            return float(value)
+    return 0.0
+
+
+async def submit_all(explain_flags):
+    """Submit concurrent single predictions to the running micro-batcher."""
+    return await asyncio.gather(
+        *(api.batcher.submit(api.TrackFeatures(**EXAMPLE_TRACK), flag) for flag in explain_flags),
+        return_exceptions=True
+    )
+
+
+class TestModelLoading:
+    """Tests for loading the served model from the registry."""
+    
+    def test_comparison_models_are_not_served(self, registry):
+        """Test that models registered without a preprocessor are never served."""
+        df = make_synthetic_data(300, random_state=0)
+        y = df[config.target_variable].to_numpy()
+        trainer = ModelTrainer('xgboost').fit_frame(df, y)
+        registry.register(trainer)
+        
+        X = trainer.transform(df)
+        comparison = ModelComparison(['xgboost'], registry=registry)
+        comparison.train_all(X[:200], y[:200], X[200:], y[200:], skip_unchanged=True)
+        registry.register(comparison.trainers['xgboost'], name='xgboost')
+        
+        with TestClient(api.app) as client:
+            ready = client.get('/health/ready')
+            response = client.post('/predict', json=EXAMPLE_TRACK)
+        
+        assert ready.status_code == 200
+        assert ready.json()['model'] == 'xgboost v1'
+        assert response.status_code == 200
+        assert [e['name'] for e in registry.list_models()] == [
+            'comparison-xgboost', 'xgboost', 'xgboost'
+        ]
+    
+    def test_model_without_contributions(self, registry):
+        """Test that explained predictions degrade to null top_features."""
+        df = make_synthetic_data(300, random_state=0)
+        trainer = ModelTrainer('hist_gradient_boosting')
+        registry.register(trainer.fit_frame(df, df[config.target_variable]), name='xgboost')
+        
+        with TestClient(api.app) as client:
+            ready = client.get('/health/ready')
+            first = client.post('/predict', json=EXAMPLE_TRACK)
+            hits = api.cache.hits
+            second = client.post('/predict', json=EXAMPLE_TRACK)
+        
+        assert ready.status_code == 200
+        assert first.status_code == 200
+        assert first.json()['top_features'] is None
+        assert second.json() == first.json()
+        assert api.cache.hits == hits + 1
+    
+    def test_warm_up_failure_fails_readiness(self, registry, monkeypatch):
+        """Test that an error while warming up keeps the worker unready."""
+        def broken(active, X):
+            raise ValueError("broken contributions")
+        
+        monkeypatch.setattr(api, 'top_contributions', broken)
+        
+        with TestClient(api.app) as client:
+            ready = client.get('/health/ready')
+            response = client.post('/predict', json=EXAMPLE_TRACK)
+        
+        assert ready.status_code == 503
+        assert ready.json()['error'] == "ValueError: broken contributions"
+        assert response.status_code == 503
+    
+    def test_readiness_after_warm_up(self, client):
+        """Test that the worker reports ready with its load and warm-up times."""
+        ready = client.get('/health/ready')
+        live = client.get('/health/live')
+        
+        assert ready.status_code == 200
+        assert ready.json()['model'] == 'demo'
+        assert ready.json()['load_time_s'] is not None
+        assert ready.json()['warmup_latency_s'] > 0
+        assert live.json() == {'status': 'alive'}
+
+
+class TestMicroBatching:
+    """Tests for coalescing concurrent /predict calls."""
+    
+    def test_concurrent_requests_are_coalesced(self, client):
+        """Test that concurrent predictions are scored as one micro-batch."""
+        batches, items = api.batcher.batches, api.batcher.items
+        
+        results = client.portal.call(submit_all, [True, False, True, True])
+        
+        assert api.batcher.batches == batches + 1
+        assert api.batcher.items == items + 4
+        assert [r['top_features'] is not None for r in results] == [True, False, True, True]
+    
+    def test_cancelled_requests_are_not_scored(self, client):
+        """Test that requests cancelled while queued are dropped from the batch."""
+        async def scenario():
+            track = api.TrackFeatures(**EXAMPLE_TRACK)
+            tasks = [asyncio.create_task(api.batcher.submit(track, False)) for _ in range(3)]
+            await asyncio.sleep(0)
+            tasks[1].cancel()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        
+        items = api.batcher.items
+        first, cancelled, last = client.portal.call(scenario)
+        
+        assert isinstance(cancelled, asyncio.CancelledError)
+        assert first['predicted_popularity'] == last['predicted_popularity']
+        assert api.batcher.items == items + 2
+    
+    def test_explain_failure_is_isolated(self, client, monkeypatch):
+        """Test that a failing explanation only fails the requests that asked for it."""
+        def broken(active, X):
+            raise ValueError("broken contributions")
+        
+        monkeypatch.setattr(api, 'top_contributions', broken)
+        batches = api.batcher.batches
+        plain, explained, other = client.portal.call(submit_all, [False, True, False])
+        
+        assert api.batcher.batches == batches + 1
+        assert plain['top_features'] is None
+        assert other['predicted_popularity'] == plain['predicted_popularity']
+        assert isinstance(explained, ValueError)
+    
+    def test_batches_are_scored_concurrently(self, client, monkeypatch):
+        """Test that up to max_in_flight micro-batches are scored at once."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+        
+        def slow(tracks, explain):
+            with lock:
+                running.append(None)
+                peak.append(len(running))
+            time.sleep(0.1)
+            with lock:
+                running.pop()
+            return [{"top_features": None}] * len(tracks)
+        
+        async def scenario():
+            batcher = api.MicroBatcher(1, 1.0, 100, max_in_flight=2)
+            batcher.start()
+            try:
+                tracks = [api.TrackFeatures(**EXAMPLE_TRACK)] * 4
+                return await asyncio.gather(*(batcher.submit(t, False) for t in tracks))
+            finally:
+                await batcher.stop()
+        
+        monkeypatch.setattr(api, 'score_micro_batch', slow)
+        results = client.portal.call(scenario)
+        
+        assert len(results) == 4
+        assert max(peak) == 2
+
+
+class TestStreaming:
+    """Tests for /predict/stream."""
+    
+    def test_chunks_and_error_rows(self, client, monkeypatch):
+        """Test that rows are numbered across chunks and invalid rows get errors."""
+        monkeypatch.setitem(config.api_config, 'stream_chunk_rows', 2)
+        lines = [
+            json.dumps(EXAMPLE_TRACK),
+            '{"energy": ',
+            json.dumps(EXAMPLE_TRACK),
+            json.dumps({**EXAMPLE_TRACK, 'energy': 2.0}),
+            json.dumps(EXAMPLE_TRACK)
+        ]
+        
+        response = client.post(
+            '/predict/stream', content="\n".join(lines),
+            headers={'content-type': 'application/x-ndjson', 'accept': 'text/csv'}
+        )
+        
+        rows = response.text.splitlines()
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/csv')
+        assert rows[0] == ",".join(api.STREAM_CSV_COLUMNS)
+        assert [row.split(',')[0] for row in rows[1:]] == ['0', '1', '2', '3', '4']
+        assert [row.endswith(',') for row in rows[1:]] == [True, False, True, False, True]
+        assert "linha JSON inválida" in rows[2]
+        assert "'energy'" in rows[4]
+    
+    def test_malformed_csv_line_only_fails_its_row(self, client):
+        """Test that one bad CSV line does not invalidate the rest of its chunk."""
+        columns = list(EXAMPLE_TRACK)
+        row = ",".join(str(EXAMPLE_TRACK[c]) for c in columns)
+        body = "\n".join([",".join(columns), row, '0.5,"bad"quote', row, row + ",1"])
+        
+        response = client.post(
+            '/predict/stream', content=body,
+            headers={'content-type': 'text/csv', 'accept': 'application/x-ndjson'}
+        )
+        
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert response.status_code == 200
+        assert [r['row'] for r in rows] == [0, 1, 2, 3]
+        assert [bool(r.get('error')) for r in rows] == [False, True, False, True]
+        assert rows[2]['predicted_popularity'] == rows[0]['predicted_popularity']
+    
+    def test_quoted_newline_stays_in_its_row(self, client, monkeypatch):
+        """Test that a quoted field spanning lines is not split across chunks."""
+        monkeypatch.setitem(config.api_config, 'stream_chunk_rows', 1)
+        columns = ['track_name', *EXAMPLE_TRACK]
+        values = ",".join(str(v) for v in EXAMPLE_TRACK.values())
+        body = "\n".join([
+            ",".join(columns), f'"Line one\nLine ""two""\n\nend",{values}', f'plain,{values}'
+        ])
+        
+        response = client.post(
+            '/predict/stream', content=body,
+            headers={'content-type': 'text/csv', 'accept': 'application/x-ndjson'}
+        )
+        
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert response.status_code == 200
+        assert [r['row'] for r in rows] == [0, 1]
+        assert not any(r.get('error') for r in rows)
+        assert rows[0]['predicted_popularity'] == rows[1]['predicted_popularity']
+
+
+class TestBackpressure:
+    """Tests for rejecting work beyond the inference queue bounds."""
+    
+    def test_full_executor_rejects_with_retry_after(self, client, monkeypatch):
+        """Test that a full inference pool answers 503 with Retry-After."""
+        monkeypatch.setattr(api.executor, 'queue_depth', -api.executor.workers)
+        rejected = api.executor.rejected
+        
+        response = client.post('/predict/batch', json=[EXAMPLE_TRACK])
+        
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == '1'
+        assert api.executor.rejected == rejected + 1
+    
+    def test_full_micro_batch_queue_rejects(self, client, monkeypatch):
+        """Test that /predict is rejected once the micro-batch queue is full."""
+        monkeypatch.setattr(api.batcher, 'max_pending', 0)
+        
+        response = client.post('/predict', json=EXAMPLE_TRACK)
+        
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == '1'
+
+    
+    def test_oversized_batch_is_rejected_before_validation(self, client, monkeypatch):
+        """Test 413 on Content-Length and 400 on row count, without building tracks."""
+        monkeypatch.setitem(config.api_config, 'max_batch_size', 2)
+        monkeypatch.setitem(config.api_config, 'max_batch_bytes', 10_000)
+        monkeypatch.setattr(api, 'TRACK_LIST', None)
+        
+        too_large = client.post('/predict/batch', content=b'[' + b' ' * 10_000 + b']')
+        too_many = client.post('/predict/batch', json=[EXAMPLE_TRACK] * 3)
+        
+        assert too_large.status_code == 413
+        assert too_many.status_code == 400
+
+class TestPredictionCache:
+    """Tests for the per-worker prediction cache."""
+    
+    def test_hits_misses_and_reload(self, client):
+        """Test cache hits for repeated tracks and invalidation on model reload."""
+        url = '/predict/batch?explain=false'
+        other = {**EXAMPLE_TRACK, 'energy': 0.1}
+        
+        client.post(url, json=[EXAMPLE_TRACK])
+        stats = api.cache.stats()
+        client.post(url, json=[EXAMPLE_TRACK, other])
+        after = api.cache.stats()
+        
+        assert after['hits'] == stats['hits'] + 1
+        assert after['misses'] == stats['misses'] + 1
+        assert after['entries'] == 2
+        
+        api.load_model()
+        assert api.cache.stats()['entries'] == 0
+        client.post(url, json=[EXAMPLE_TRACK])
+        assert api.cache.stats()['misses'] == after['misses'] + 1
+    
+    def test_explained_request_skips_unexplained_entry(self, client):
+        """Test that entries without contributions do not answer explained requests."""
+        client.post('/predict/batch?explain=false', json=[EXAMPLE_TRACK])
+        misses = api.cache.stats()['misses']
+        
+        response = client.post('/predict/batch', json=[EXAMPLE_TRACK])
+        
+        assert api.cache.stats()['misses'] == misses + 1
+        assert response.json()['predictions'][0]['top_features']
+
+
+class TestBatchFormats:
+    """Tests for columnar /predict/batch payloads."""
+    
+    def test_arrow_round_trip(self, client):
+        """Test Arrow IPC request decoding and response encoding."""
+        pa = pytest.importorskip('pyarrow')
+        table = pa.table({name: [value] * 3 for name, value in EXAMPLE_TRACK.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        
+        response = client.post(
+            '/predict/batch', content=sink.getvalue().to_pybytes(),
+            headers={'content-type': 'application/vnd.apache.arrow.stream'}
+        )
+        result = pa.ipc.open_stream(response.content).read_all()
+        
+        assert response.status_code == 200
+        assert result.num_rows == 3
+        assert result.column_names == [
+            'predicted_popularity', 'category', 'confidence', 'top_features'
+        ]
+    
+    def test_msgpack_request_with_json_response(self, client):
+        """Test msgpack decoding with the response format taken from Accept."""
+        msgpack = pytest.importorskip('msgpack')
+        body = msgpack.packb({name: [value] * 2 for name, value in EXAMPLE_TRACK.items()})
+        
+        response = client.post(
+            '/predict/batch?explain=false', content=body,
+            headers={'content-type': 'application/msgpack', 'accept': 'application/json'}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+    
+    def test_invalid_columnar_payloads(self, client):
+        """Test 400 for undecodable payloads and 422 with row errors for bad values."""
+        msgpack = pytest.importorskip('msgpack')
+        columns = {name: [value] * 2 for name, value in EXAMPLE_TRACK.items()}
+        columns['energy'] = [0.5, 3.0]
+        headers = {'content-type': 'application/msgpack'}
+        
+        garbage = client.post('/predict/batch', content=b'\xc1', headers=headers)
+        invalid = client.post(
+            '/predict/batch', content=msgpack.packb(columns), headers=headers
+        )
+        
+        assert garbage.status_code == 400
+        assert invalid.status_code == 422
+        assert [error['row'] for error in invalid.json()['detail']] == [1]
+    
+    def test_unsupported_content_type(self, client):
+        """Test 415 for unknown request formats."""
+        response = client.post(
+            '/predict/batch', content=b'a', headers={'content-type': 'text/plain'}
+        )
+        
+        assert response.status_code == 415
+
+
+class TestObservability:
+    """Tests for /metrics and per-stage timings."""
+    
+    def test_metrics_output(self, client):
+        """Test request, stage and model series in the Prometheus output."""
+        client.post('/predict/batch', json=[EXAMPLE_TRACK])
+        
+        response = client.get('/metrics')
+        text = response.text
+        
+        assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+        assert metric(
+            text, 'spotify_api_requests_total{route="/predict/batch",method="POST",status="200"}'
+        ) >= 1
+        stage = 'spotify_api_stage_duration_seconds_count{route="/predict/batch",stage="predict"}'
+        assert metric(text, stage) >= 1
+        assert metric(text, 'spotify_api_model_ready') == 1
+        assert metric(text, 'spotify_api_model_info{model="demo",version=""}') == 1
+    
+    def test_server_timing_header(self, client):
+        """Test the Server-Timing header and the debug timings field."""
+        response = client.post('/predict?debug=true', json=EXAMPLE_TRACK)
+        
+        stages = dict(
+            entry.strip().split(';dur=') for entry in response.headers['server-timing'].split(',')
+        )
+        assert response.status_code == 200
+        assert {'parse', 'queue', 'preprocess', 'predict', 'serialize'} <= set(stages)
+        assert all(float(duration) >= 0 for duration in stages.values())
+        assert {'parse', 'predict'} <= set(response.json()['timings'])
+        assert 'server-timing' not in client.get('/health').headers
+    
+    def test_timings_only_with_debug(self, client):
+        """Test that the timings field is left out unless requested."""
+        response = client.post('/predict', json=EXAMPLE_TRACK)
+        
+        assert 'timings' not in response.json()
+        assert 'server-timing' in response.headers
+
+
+class TestFastJSON:
+    """Tests for orjson-encoded responses."""
+    
+    def test_matches_default_encoding(self, client, monkeypatch):
+        """Test that fast_json responses carry the same payload and headers."""
+        pytest.importorskip('orjson')
+        tracks = [EXAMPLE_TRACK, {**EXAMPLE_TRACK, 'energy': 0.2}]
+        url = '/predict/batch?debug=true'
+        default = client.post(url, json=tracks)
+        
+        monkeypatch.setattr(api, 'FAST_JSON', True)
+        fast = client.post(url, json=tracks)
+        single = client.post('/predict', json=EXAMPLE_TRACK)
+        
+        assert fast.status_code == single.status_code == 200
+        assert fast.headers['content-type'] == 'application/json'
+        assert 'x-queue-wait-ms' in fast.headers
+        assert 'server-timing' in fast.headers
+        assert set(fast.json()) == set(default.json())
+        for ours, theirs in zip(fast.json()['predictions'], default.json()['predictions']):
+            assert ours['predicted_popularity'] == theirs['predicted_popularity']
+            assert ours['top_features'] == pytest.approx(theirs['top_features'])
+        assert 'timings' not in single.json()
@@ -0,0 +1,93 @@
+"""Tests for the scaling benchmarks."""
+
+import json
+
+import pandas as pd
+
+from spotify_analysis.benchmarks import (
+    geometric_sizes,
+    make_synthetic_data,
+    results_frame,
+    run_scaling_benchmark,
+    save_report,
+)
+from spotify_analysis.config import config
+
+
+class TestScalingBenchmark:
+    """Tests for run_scaling_benchmark."""
+    
+    def test_geometric_sizes(self):
+        """Test geometric size spacing."""
+        assert geometric_sizes(10_000, 1_000_000, 3) == [10_000, 100_000, 1_000_000]
+    
+    def test_synthetic_data_schema(self):
+        """Test that synthetic data matches the configured schema."""
+        df = make_synthetic_data(200, random_state=0)
+        
+        expected = config.numerical_features + config.categorical_features
+        assert set(expected) <= set(df.columns)
+        assert df[config.target_variable].between(0, 100).all()
+    
+    def test_run_and_save_report(self, tmp_path):
+        """Test that every model/size pair is recorded and serialised."""
+        report = run_scaling_benchmark(['ridge', 'xgboost'], sizes=[200, 400])
+        path = save_report(report, tmp_path / 'benchmark.json')
+        
+        df = results_frame(report)
+        with open(path) as f:
+            saved = json.load(f)
+        
+        assert isinstance(df, pd.DataFrame)
+        assert len(df) == 4
+        assert {'fit_time_s', 'predict_rows_per_s', 'fit_peak_mb', 'test_r2'} <= set(df.columns)
+        assert len(saved['results']) == 4
+    
+    def test_native_categorical_models_skip_onehot(self):
+        """Test that each model is benchmarked on the encoding it expects."""
+        report = run_scaling_benchmark(['gradient_boosting', 'hist_gradient_boosting'], sizes=[300])
+        
+        df = results_frame(report).set_index('model')
+        
+        assert df.loc['gradient_boosting', 'categorical_encoding'] == 'onehot'
+        assert df.loc['hist_gradient_boosting', 'categorical_encoding'] == 'ordinal'
+        n_features = df['n_features']
+        assert n_features['hist_gradient_boosting'] < n_features['gradient_boosting']
+    
+    def test_memory_is_traced_in_a_separate_pass(self, monkeypatch):
+        """Test that timed fits run without tracemalloc and peaks are opt-in."""
+        import tracemalloc
+        from spotify_analysis.models import ModelTrainer
+        
+        tracing = []
+        fit = ModelTrainer.fit
+        
+        def spy(self, *args, **kwargs):
+            tracing.append(tracemalloc.is_tracing())
+            return fit(self, *args, **kwargs)
+        
+        monkeypatch.setattr(ModelTrainer, 'fit', spy)
+        untraced = results_frame(run_scaling_benchmark(['ridge'], sizes=[200]))
+        traced = results_frame(run_scaling_benchmark(['ridge'], sizes=[200], trace_memory=True))
+        
+        assert tracing == [False, False, True]
+        assert untraced['fit_peak_mb'].isna().all()
+        assert (traced['fit_peak_mb'] > 0).all()
+    
+    def test_fits_do_not_checkpoint(self, monkeypatch):
+        """Test that benchmark fits neither write nor resume checkpoints."""
+        from spotify_analysis.models import training
+        
+        calls = []
+        monkeypatch.setattr(
+            training.Checkpointer, 'for_fit', classmethod(lambda cls, *args: calls.append(args))
+        )
+        run_scaling_benchmark(['gradient_boosting'], sizes=[200])
+        
+        assert calls == []
+    
+    def test_slow_models_are_dropped(self):
+        """Test that models over the fit-time limit skip larger sizes."""
+        report = run_scaling_benchmark(['ridge'], sizes=[200, 400], max_fit_seconds=0)
+        
+        assert [r['n_samples'] for r in report['results']] == [200]
@@ -70,6 +70,25 @@ class TestDataPreprocessor:
         assert feature_names is not None
         assert len(feature_names) > 0
         assert all(isinstance(name, str) for name in feature_names)
+    
+    def test_ordinal_encoding(self, sample_data):
+        """Test that ordinal encoding keeps one column per categorical feature."""
+        preprocessor = DataPreprocessor(categorical_encoding='ordinal')
+        
+        X = sample_data.drop(columns=['track_popularity'])
+        X_transformed = preprocessor.fit_transform(X)
+        mask = preprocessor.get_categorical_mask()
+        
+        n_features = len(preprocessor.numerical_features) + len(preprocessor.categorical_features)
+        assert X_transformed.shape[1] == n_features
+        assert sum(mask) == len(preprocessor.categorical_features)
+        assert (X_transformed[:, mask] >= 0).all()
+        assert np.allclose(X_transformed[:, mask], np.round(X_transformed[:, mask]))
+    
+    def test_invalid_encoding(self):
+        """Test that an unknown categorical encoding is rejected."""
+        with pytest.raises(ValueError):
+            DataPreprocessor(categorical_encoding='hash')
 
 
 class TestSplitData:
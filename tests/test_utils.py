@@ -0,0 +1,97 @@
+"""Tests for utility functions."""
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from spotify_analysis.models import ModelTrainer
+from spotify_analysis.utils.fingerprint import fingerprint_data, fingerprint_model
+from spotify_analysis.utils.instrumentation import RunProfiler, instrument, profiler
+
+
+@pytest.fixture
+def enabled_profiler():
+    """Enable the global profiler for one test."""
+    profiler.reset()
+    profiler.enable()
+    yield profiler
+    profiler.disable()
+    profiler.reset()
+
+
+class TestRunProfiler:
+    """Tests for RunProfiler and the instrument decorator."""
+    
+    def test_disabled_records_nothing(self):
+        """Test that a disabled profiler records no stages."""
+        local = RunProfiler(enabled=False)
+        
+        with local.stage('noop'):
+            pass
+        
+        assert local.records == []
+    
+    def test_nested_stages(self):
+        """Test nested stages record wall time, CPU time and parents."""
+        local = RunProfiler().enable()
+        
+        with local.stage('outer'):
+            with local.stage('inner'):
+                np.ones((1000, 100))
+        local.disable()
+        
+        inner, outer = local.records
+        assert inner['parent'] == 'outer' and inner['depth'] == 1
+        assert outer['wall_s'] >= inner['wall_s']
+        assert outer['peak_alloc_mb'] >= inner['peak_alloc_mb'] > 0.5
+        assert local.summary()['inner']['calls'] == 1
+    
+    def test_instrumented_training_report(self, enabled_profiler, tmp_path):
+        """Test that training stages are aggregated into a JSON report."""
+        X = np.random.randn(50, 3)
+        y = np.random.randn(50)
+        
+        ModelTrainer('ridge').fit(X, y).evaluate(X, y)
+        path = enabled_profiler.save_report(tmp_path / 'report.json')
+        
+        with open(path) as f:
+            report = json.load(f)
+        
+        assert 'ModelTrainer.fit[ridge]' in report['summary']
+        assert report['summary']['ModelTrainer.predict[ridge]']['calls'] == 1
+        assert report['total_wall_s'] > 0
+    
+    def test_instrument_preserves_function(self):
+        """Test that the decorator keeps the function's behaviour and metadata."""
+        @instrument()
+        def add(a, b):
+            """Add two numbers."""
+            return a + b
+        
+        assert add(1, 2) == 3
+        assert add.__doc__ == "Add two numbers."
+
+
+class TestFingerprint:
+    """Tests for content fingerprints."""
+    
+    def test_fingerprint_is_content_based(self):
+        """Test that equal content gives equal fingerprints."""
+        a = np.arange(10.0)
+        
+        assert fingerprint_data(a) == fingerprint_data(a.copy())
+        assert fingerprint_data(a) != fingerprint_data(a + 1)
+        assert fingerprint_data({'x': 1}) == fingerprint_data({'x': 1})
+    
+    def test_fingerprint_model_uses_fitted_state(self):
+        """Test that model fingerprints follow the fitted state, not the object."""
+        from sklearn.linear_model import LinearRegression
+        
+        X = np.arange(20.0).reshape(10, 2)
+        first = LinearRegression().fit(X, X[:, 0])
+        second = LinearRegression().fit(X, X[:, 1])
+        
+        assert fingerprint_model(first) == fingerprint_model(pickle.loads(pickle.dumps(first)))
+        assert fingerprint_model(first) != fingerprint_model(second)